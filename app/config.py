@@ -10,11 +10,87 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     
+    # Storage backend behind DatabaseService: "supabase" or "memory" (in-process, for tests and benchmarks)
+    DATABASE_BACKEND: str = os.getenv("DATABASE_BACKEND", "supabase")
+
     # JWT Configuration
     JWT_SECRET: str = os.getenv("JWT_SECRET", "your-secret-key")
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Bulk import Configuration
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+    IMPORT_MAX_CHUNK_SIZE: int = 5000
+
+    # Project overview Configuration
+    PROJECT_OVERVIEW_RECENT_ENTRIES: int = 10
+
+    # Calendar view Configuration
+    CALENDAR_MAX_DAYS: int = 62
+
+    # List endpoints: pages are only limited when the client asks, up to LIST_MAX_LIMIT rows
+    LIST_MAX_LIMIT: int = int(os.getenv("LIST_MAX_LIMIT", "500"))
+
+    # include= expansion on client and project reads: nesting depth and rows per included list
+    INCLUDE_MAX_DEPTH: int = int(os.getenv("INCLUDE_MAX_DEPTH", "3"))
+    INCLUDE_MAX_ROWS: int = int(os.getenv("INCLUDE_MAX_ROWS", "100"))
+
+    # Most sub-requests accepted by one /api/batch call
+    BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+
+    # Identical report requests share one computation, results are served fresh then stale while refreshing
+    REPORT_CACHE_FRESH_SECONDS: float = float(os.getenv("REPORT_CACHE_FRESH_SECONDS", "10"))
+    REPORT_CACHE_STALE_SECONDS: float = float(os.getenv("REPORT_CACHE_STALE_SECONDS", "60"))
+
+    # Preset time range reports requested within the retention window are precomputed daily at this UTC hour
+    REPORT_PRECOMPUTE_HOUR: int = int(os.getenv("REPORT_PRECOMPUTE_HOUR", "3"))
+    REPORT_PRESET_RETENTION_DAYS: int = int(os.getenv("REPORT_PRESET_RETENTION_DAYS", "35"))
+    # Stored preset results are recomputed once this old even when nothing they read changed;
+    # long enough for the off-peak results to serve the morning
+    REPORT_PRESET_MAX_AGE_SECONDS: float = float(os.getenv("REPORT_PRESET_MAX_AGE_SECONDS", "21600"))
+    # Most preset reports kept, the least recently requested are dropped first
+    REPORT_PRESET_MAX_REPORTS: int = int(os.getenv("REPORT_PRESET_MAX_REPORTS", "1000"))
+
+    # Background report jobs: worker pool size and jobs queued or running per user
+    REPORT_JOB_WORKERS: int = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+    REPORT_JOB_MAX_PER_USER: int = int(os.getenv("REPORT_JOB_MAX_PER_USER", "2"))
+
+    # Incremental sync re-sends changes this close to the cursor, covering writes committed out of order
+    SYNC_OVERLAP_SECONDS: float = float(os.getenv("SYNC_OVERLAP_SECONDS", "5"))
+
+    # Timer Configuration
+    TIMER_CHECKPOINT_SECONDS: int = int(os.getenv("TIMER_CHECKPOINT_SECONDS", "300"))
+    TIMER_HEARTBEAT_TIMEOUT_SECONDS: int = int(os.getenv("TIMER_HEARTBEAT_TIMEOUT_SECONDS", "900"))
+
+    # Interval of the job that repairs drift in task/project time counters
+    TIME_COUNTER_RECONCILE_SECONDS: int = int(os.getenv("TIME_COUNTER_RECONCILE_SECONDS", "3600"))
+
+    # Query debugging: log backend calls per request and flag repeated query shapes (N+1)
+    QUERY_DEBUG: bool = os.getenv("QUERY_DEBUG", "false").lower() == "true"
+    QUERY_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+
+    # Tracing: TRACING_EXPORTER is "none", "jsonl" (spans appended to TRACING_JSONL_PATH) or "otlp"
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "none")
+    TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "0.1"))
+    TRACING_JSONL_PATH: str = os.getenv("TRACING_JSONL_PATH", "traces.jsonl")
+    TRACING_EXPORT_INTERVAL_SECONDS: float = float(os.getenv("TRACING_EXPORT_INTERVAL_SECONDS", "5"))
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "work-tracker-api")
+    OTLP_ENDPOINT: str = os.getenv("OTLP_ENDPOINT", "http://localhost:4318")
+
+    # Event loop watchdog: lag sampling interval and the stall that triggers a stack dump
+    LOOP_WATCHDOG_ENABLED: bool = os.getenv("LOOP_WATCHDOG_ENABLED", "true").lower() == "true"
+    LOOP_WATCHDOG_INTERVAL_SECONDS: float = float(os.getenv("LOOP_WATCHDOG_INTERVAL_SECONDS", "0.5"))
+    LOOP_WATCHDOG_THRESHOLD_SECONDS: float = float(os.getenv("LOOP_WATCHDOG_THRESHOLD_SECONDS", "0.2"))
+
+    # Response compression (br needs the optional brotli package, gzip is always available)
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "4"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    # Serialize DatabaseService rows for list endpoints without re-validating them;
+    # set to false to validate through cached TypeAdapters instead
+    TRUSTED_SERIALIZATION: bool = os.getenv("TRUSTED_SERIALIZATION", "true").lower() == "true"
+
     # CORS Configuration
     CORS_ORIGINS: list = ["http://localhost:8080"]  # Frontend URL
     
@@ -99,4 +99,238 @@ CREATE INDEX IF NOT EXISTS idx_tasks_project_id ON tasks(project_id);
 CREATE INDEX IF NOT EXISTS idx_time_entries_task_id ON time_entries(task_id);
 CREATE INDEX IF NOT EXISTS idx_time_entries_user_id ON time_entries(user_id);
 CREATE INDEX IF NOT EXISTS idx_team_members_project_id ON team_members(project_id);
-CREATE INDEX IF NOT EXISTS idx_notifications_user_id ON notifications(user_id); 
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_notifications_user_id ON notifications(user_id);
+
+-- Timer and calendar columns on time entries
+ALTER TABLE time_entries ADD COLUMN IF NOT EXISTS start_time TIMESTAMP WITH TIME ZONE;
+ALTER TABLE time_entries ADD COLUMN IF NOT EXISTS end_time TIMESTAMP WITH TIME ZONE;
+
+-- Serves the calendar view: one user's entries in a start_time window
+CREATE INDEX IF NOT EXISTS idx_time_entries_user_start_time ON time_entries(user_id, start_time);
+
+-- Denormalized time counters, kept in step by DatabaseService time entry writes
+ALTER TABLE time_entries ADD COLUMN IF NOT EXISTS is_billable BOOLEAN DEFAULT TRUE;
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS tracked_minutes NUMERIC(12,2) NOT NULL DEFAULT 0;
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS billable_minutes NUMERIC(12,2) NOT NULL DEFAULT 0;
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS tracked_minutes NUMERIC(12,2) NOT NULL DEFAULT 0;
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS billable_minutes NUMERIC(12,2) NOT NULL DEFAULT 0;
+
+-- Atomically adds [{"task_id", "minutes", "billable_minutes"}] deltas to tasks and their projects
+CREATE OR REPLACE FUNCTION apply_time_entry_deltas(deltas JSONB) RETURNS VOID AS $$
+BEGIN
+    WITH d AS (
+        SELECT (x->>'task_id')::UUID AS task_id,
+               SUM((x->>'minutes')::NUMERIC) AS minutes,
+               SUM((x->>'billable_minutes')::NUMERIC) AS billable_minutes
+        FROM jsonb_array_elements(deltas) AS x
+        GROUP BY 1
+    ), t AS (
+        UPDATE tasks
+        SET tracked_minutes = tasks.tracked_minutes + d.minutes,
+            billable_minutes = tasks.billable_minutes + d.billable_minutes
+        FROM d
+        WHERE tasks.id = d.task_id
+        RETURNING tasks.project_id, d.minutes, d.billable_minutes
+    )
+    UPDATE projects
+    SET tracked_minutes = projects.tracked_minutes + p.minutes,
+        billable_minutes = projects.billable_minutes + p.billable_minutes
+    FROM (
+        SELECT project_id, SUM(minutes) AS minutes, SUM(billable_minutes) AS billable_minutes
+        FROM t
+        GROUP BY project_id
+    ) p
+    WHERE projects.id = p.project_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recomputes the counters from time_entries and returns the number of rows that had drifted
+CREATE OR REPLACE FUNCTION reconcile_time_counters() RETURNS INTEGER AS $$
+DECLARE
+    repaired_tasks INTEGER;
+    repaired_projects INTEGER;
+BEGIN
+    WITH totals AS (
+        SELECT t.id,
+               COALESCE(SUM(e.duration), 0) AS minutes,
+               COALESCE(SUM(e.duration) FILTER (WHERE e.is_billable), 0) AS billable_minutes
+        FROM tasks t
+        LEFT JOIN time_entries e ON e.task_id = t.id
+        GROUP BY t.id
+    )
+    UPDATE tasks
+    SET tracked_minutes = totals.minutes, billable_minutes = totals.billable_minutes
+    FROM totals
+    WHERE tasks.id = totals.id
+      AND (tasks.tracked_minutes, tasks.billable_minutes) IS DISTINCT FROM (totals.minutes, totals.billable_minutes);
+    GET DIAGNOSTICS repaired_tasks = ROW_COUNT;
+
+    WITH totals AS (
+        SELECT p.id,
+               COALESCE(SUM(t.tracked_minutes), 0) AS minutes,
+               COALESCE(SUM(t.billable_minutes), 0) AS billable_minutes
+        FROM projects p
+        LEFT JOIN tasks t ON t.project_id = p.id
+        GROUP BY p.id
+    )
+    UPDATE projects
+    SET tracked_minutes = totals.minutes, billable_minutes = totals.billable_minutes
+    FROM totals
+    WHERE projects.id = totals.id
+      AND (projects.tracked_minutes, projects.billable_minutes) IS DISTINCT FROM (totals.minutes, totals.billable_minutes);
+    GET DIAGNOSTICS repaired_projects = ROW_COUNT;
+
+    RETURN repaired_tasks + repaired_projects;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keyset pagination of list endpoints: each index matches an order by (sort, id) within the
+-- filtered owner, so the next page is an index range scan instead of a sort of every row
+CREATE INDEX IF NOT EXISTS idx_projects_user_created ON projects(user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_projects_user_name ON projects(user_id, name, id);
+CREATE INDEX IF NOT EXISTS idx_projects_user_status ON projects(user_id, status);
+CREATE INDEX IF NOT EXISTS idx_tasks_project_created ON tasks(project_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_project_due_date ON tasks(project_id, due_date, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_project_status_priority ON tasks(project_id, status, priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_assigned_to ON tasks(assigned_to);
+CREATE INDEX IF NOT EXISTS idx_clients_user_created ON clients(user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_clients_user_name ON clients(user_id, name, id);
+CREATE INDEX IF NOT EXISTS idx_categories_user_name ON categories(user_id, name, id);
+
+-- Incremental sync: updated_at tracks every change and deletes leave a tombstone
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TABLE IF NOT EXISTS deleted_records (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    table_name VARCHAR(50) NOT NULL,
+    record_id UUID NOT NULL,
+    user_id UUID NOT NULL REFERENCES auth.users(id),
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT clock_timestamp()
+);
+CREATE INDEX IF NOT EXISTS idx_deleted_records_user_deleted_at ON deleted_records(user_id, deleted_at);
+
+-- Tasks belong to the user owning their project, the other synced tables have a user_id
+CREATE OR REPLACE FUNCTION record_deletion() RETURNS TRIGGER AS $$
+DECLARE
+    owner UUID;
+BEGIN
+    IF TG_TABLE_NAME = 'tasks' THEN
+        SELECT user_id INTO owner FROM projects WHERE id = OLD.project_id;
+    ELSE
+        owner := OLD.user_id;
+    END IF;
+    IF owner IS NOT NULL THEN
+        INSERT INTO deleted_records (table_name, record_id, user_id) VALUES (TG_TABLE_NAME, OLD.id, owner);
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    synced TEXT;
+BEGIN
+    FOREACH synced IN ARRAY ARRAY['projects', 'tasks', 'clients', 'categories'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I_set_updated_at ON %I', synced, synced);
+        EXECUTE format('CREATE TRIGGER %I_set_updated_at BEFORE UPDATE ON %I '
+                       'FOR EACH ROW EXECUTE FUNCTION set_updated_at()', synced, synced);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I_record_deletion ON %I', synced, synced);
+        EXECUTE format('CREATE TRIGGER %I_record_deletion AFTER DELETE ON %I '
+                       'FOR EACH ROW EXECUTE FUNCTION record_deletion()', synced, synced);
+    END LOOP;
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_projects_user_updated_at ON projects(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_project_updated_at ON tasks(project_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_clients_user_updated_at ON clients(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_categories_user_updated_at ON categories(user_id, updated_at);
+
+-- Saved reports, also the rows of background report jobs whose result goes to data
+CREATE TABLE IF NOT EXISTS reports (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id),
+    name VARCHAR(255) NOT NULL,
+    type VARCHAR(50) NOT NULL,
+    time_range VARCHAR(50) NOT NULL,
+    start_date DATE,
+    end_date DATE,
+    project_ids UUID[],
+    team_member_ids UUID[],
+    client_ids UUID[],
+    include_inactive BOOLEAN DEFAULT FALSE,
+    group_by VARCHAR(50),
+    sort_by VARCHAR(50),
+    sort_order VARCHAR(10) DEFAULT 'desc',
+    last_generated TIMESTAMP WITH TIME ZONE,
+    data JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS status VARCHAR(20);
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS error TEXT;
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS compare_to VARCHAR(20);
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS compare_start_date DATE;
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS compare_end_date DATE;
+CREATE INDEX IF NOT EXISTS idx_reports_user_id ON reports(user_id);
+
+-- Per-user versions of the tables behind list ETags and report cache keys. Triggers bump the
+-- version of the user owning every written row, so writes made by any API process, or outside
+-- the API, change them
+CREATE TABLE IF NOT EXISTS collection_versions (
+    table_name VARCHAR(50) NOT NULL,
+    user_id UUID NOT NULL REFERENCES auth.users(id),
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, table_name)
+);
+
+-- Versions of one user's time entries per entry date, so preset reports see writes to their range
+CREATE TABLE IF NOT EXISTS time_entry_day_versions (
+    user_id UUID NOT NULL REFERENCES auth.users(id),
+    day DATE NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+
+-- Tasks belong to the user owning their project, the other versioned tables have a user_id
+CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS TRIGGER AS $$
+DECLARE
+    changed JSONB;
+    owner UUID;
+BEGIN
+    FOREACH changed IN ARRAY ARRAY[to_jsonb(NEW), to_jsonb(OLD)] LOOP
+        CONTINUE WHEN changed IS NULL;
+        IF TG_TABLE_NAME = 'tasks' THEN
+            SELECT user_id INTO owner FROM projects WHERE id = (changed->>'project_id')::UUID;
+        ELSE
+            owner := (changed->>'user_id')::UUID;
+        END IF;
+        IF owner IS NOT NULL THEN
+            INSERT INTO collection_versions (table_name, user_id, version) VALUES (TG_TABLE_NAME, owner, 1)
+            ON CONFLICT (user_id, table_name) DO UPDATE SET version = collection_versions.version + 1;
+            IF TG_TABLE_NAME = 'time_entries' THEN
+                INSERT INTO time_entry_day_versions (user_id, day, version) VALUES (owner, (changed->>'date')::DATE, 1)
+                ON CONFLICT (user_id, day) DO UPDATE SET version = time_entry_day_versions.version + 1;
+            END IF;
+        END IF;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    versioned TEXT;
+BEGIN
+    FOREACH versioned IN ARRAY ARRAY['clients', 'projects', 'tasks', 'time_entries', 'team_members'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I_bump_collection_version ON %I', versioned, versioned);
+        EXECUTE format('CREATE TRIGGER %I_bump_collection_version AFTER INSERT OR UPDATE OR DELETE ON %I '
+                       'FOR EACH ROW EXECUTE FUNCTION bump_collection_version()', versioned, versioned);
+    END LOOP;
+END;
+$$;
@@ -1,13 +1,28 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
-from .routes import auth, projects, tasks, time_entries, categories, clients, team_members, reports, notifications, time_entry_files
+from .routes import auth, projects, tasks, time_entries, categories, clients, team_members, reports, notifications, time_entry_files, timers, sync, batch, metrics as metrics_routes
 from app.routes import client_files
+from .services.timers import timer_registry
+from .services.report_jobs import report_jobs
+from .services.report_presets import report_presets
+from .services.counters import run_counter_reconciliation
+from .services.compression import CompressionMiddleware
+from .services.database import db
+from .services.metrics import MetricsMiddleware, metrics
+from .services.pagination import NEXT_CURSOR_HEADER
+from .services.includes import TRUNCATED_HEADER
+from .services.query_log import QueryLogMiddleware, record_query
+from .services.loop_watchdog import loop_watchdog
+from .services.tracing import TracingMiddleware, instrument_response_serialization, tracer
 
 app = FastAPI(
     title="Work Tracker API",
     description="API for the Work Tracker application",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -21,8 +36,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TRUNCATED_HEADER],
 )
 
+# Negotiated br/gzip compression of large JSON responses
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Per-route latency and backend call metrics, served on /metrics
+app.add_middleware(MetricsMiddleware)
+db.add_query_hook(metrics.record_query)
+
+# Backend call log used by QUERY_DEBUG and the query budget tests
+db.add_query_hook(record_query)
+if settings.QUERY_DEBUG:
+    app.add_middleware(QueryLogMiddleware, repeat_threshold=settings.QUERY_REPEAT_THRESHOLD)
+
+# Sampled request traces with spans for auth, DatabaseService calls and serialization
+app.add_middleware(TracingMiddleware, tracer=tracer)
+db.add_query_hook(tracer.record_query)
+instrument_response_serialization()
+
+background_tasks = []
+
+@app.on_event("startup")
+async def start_background_tasks():
+    background_tasks.append(asyncio.create_task(timer_registry.run()))
+    background_tasks.append(asyncio.create_task(run_counter_reconciliation(settings.TIME_COUNTER_RECONCILE_SECONDS)))
+    background_tasks.append(asyncio.create_task(report_jobs.run()))
+    background_tasks.append(asyncio.create_task(report_presets.run()))
+    if settings.LOOP_WATCHDOG_ENABLED:
+        background_tasks.append(asyncio.create_task(loop_watchdog.run()))
+    if tracer.enabled:
+        background_tasks.append(asyncio.create_task(tracer.run(settings.TRACING_EXPORT_INTERVAL_SECONDS)))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    await timer_registry.flush_all()
+    if tracer.enabled:
+        await tracer.flush()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Work Tracker API"}
@@ -32,6 +91,7 @@ app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(projects.router, prefix="/api/projects", tags=["Projects"])
 app.include_router(tasks.router, prefix="/api/tasks", tags=["Tasks"])
 app.include_router(time_entries.router, prefix="/api/time-entries", tags=["Time Entries"])
+app.include_router(timers.router, prefix="/api/timers", tags=["Timers"])
 app.include_router(categories.router, prefix="/api/categories", tags=["Categories"])
 app.include_router(clients.router, prefix="/api/clients", tags=["Clients"])
 app.include_router(team_members.router, prefix="/api/team-members", tags=["Team Members"])
@@ -39,6 +99,9 @@ app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
 app.include_router(notifications.router, prefix="/api/notifications", tags=["Notifications"])
 app.include_router(client_files.router, prefix="/api", tags=["client-files"])
 app.include_router(time_entry_files.router, prefix="/api", tags=["time-entry-files"])
+app.include_router(sync.router, prefix="/api/sync", tags=["Sync"])
+app.include_router(batch.router, prefix="/api/batch", tags=["Batch"])
+app.include_router(metrics_routes.router, tags=["Metrics"])
 
 # TODO: Add other routers as they are implemented
 # app.include_router(team_members.router, prefix="/api/team-members", tags=["Team Members"])
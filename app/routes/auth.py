@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import timedelta
 from typing import Any
 from ..schemas.user import UserCreate, User, Token
 from ..services.auth import verify_password, get_password_hash, create_access_token
 from ..services.database import db
+from ..services.tracing import tracer
 from ..config import settings
 
 router = APIRouter()
@@ -18,15 +20,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    token_data = verify_token(token)
-    if token_data is None:
-        raise credentials_exception
-    
-    user = await db.get_user_by_email(token_data.email)
-    if user is None:
-        raise credentials_exception
-    
-    return User(**user)
+    with tracer.span("auth.get_current_user"):
+        with tracer.span("auth.verify_token"):
+            token_data = verify_token(token)
+        if token_data is None:
+            raise credentials_exception
+        
+        user = await db.get_user_by_email(token_data.email)
+        if user is None:
+            raise credentials_exception
+        
+        return User(**user)
 
 async def get_current_user_and_token(token: str = Depends(oauth2_scheme)) -> tuple[User, str]:
     from ..services.auth import verify_token
@@ -57,7 +61,8 @@ async def register(user_data: UserCreate) -> Any:
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    # bcrypt is deliberately slow, keep it off the event loop
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
     user_dict = user_data.dict()
     user_dict.pop("password")
     user_dict["hashed_password"] = hashed_password
@@ -68,7 +73,7 @@ async def register(user_data: UserCreate) -> Any:
 @router.post("/token", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Any:
     user = await db.get_user_by_email(form_data.username)
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    if not user or not await run_in_threadpool(verify_password, form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -0,0 +1,127 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from starlette.middleware.exceptions import ExceptionMiddleware
+from ..config import settings
+from ..schemas.batch import BatchRequest, BatchRequestItem, BatchResponse
+from ..services.request_cache import request_cache
+from .auth import get_current_user, oauth2_scheme
+
+router = APIRouter()
+
+SAFE_METHODS = {"GET", "HEAD"}
+# Sub-request headers passed back to the client
+RESPONSE_HEADERS = ("content-type", "etag", "x-next-cursor", "location")
+
+def _dispatcher(app) -> ExceptionMiddleware:
+    """The app's router behind its exception handlers.
+
+    The middleware stack is left out, the batch request already went through it.
+    """
+    handlers = {key: handler for key, handler in app.exception_handlers.items() if key not in (500, Exception)}
+    return ExceptionMiddleware(app.router, handlers=handlers)
+
+async def run_subrequest(request: Request, dispatch, item: BatchRequestItem) -> Dict[str, Any]:
+    url = urlsplit(item.path)
+    body = b"" if item.body is None else orjson.dumps(item.body)
+    headers = [(b"authorization", request.headers["authorization"].encode("latin-1"))]
+    headers += [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in item.headers.items()
+                if name.lower() not in ("authorization", "content-length", "accept-encoding")]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": "1.1",
+        "method": item.method.upper(),
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "app": request.app,
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    response: Dict[str, Any] = {"status": 500, "headers": [], "body": []}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    try:
+        await dispatch(scope, receive, send)
+    except Exception as e:
+        print(f"Batch sub-request {item.method} {item.path} failed: {e}")
+        return {"id": item.id, "status": 500, "headers": {}, "body": {"detail": "Internal Server Error"}}
+
+    response_headers = {}
+    for name, value in response["headers"]:
+        name = name.decode("latin-1").lower()
+        if name in RESPONSE_HEADERS:
+            response_headers[name] = value.decode("latin-1")
+    content = b"".join(response["body"])
+    if not content:
+        body_value = None
+    elif response_headers.get("content-type", "").startswith("application/json"):
+        body_value = orjson.loads(content)
+    else:
+        body_value = content.decode("utf-8", "replace")
+    return {"id": item.id, "status": response["status"], "headers": response_headers, "body": body_value}
+
+@router.post("", response_model=BatchResponse)
+async def batch(
+    batch_request: BatchRequest,
+    request: Request,
+    token: str = Depends(oauth2_scheme)
+) -> Any:
+    """Run several API requests in one round trip.
+
+    Reads run concurrently. A write waits for the requests before it and the
+    requests after it wait for the write, so requests apply in list order.
+    All sub-requests share one user lookup and one request-scoped cache of
+    backend reads.
+    """
+    items = batch_request.requests
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch cannot have more than {settings.BATCH_MAX_REQUESTS} requests"
+        )
+    for item in items:
+        if not item.path.startswith("/") or urlsplit(item.path).path.rstrip("/") == request.url.path.rstrip("/"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid batch request path: {item.path}"
+            )
+
+    dispatch = _dispatcher(request.app)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+
+    async def run(index: int) -> None:
+        results[index] = await run_subrequest(request, dispatch, items[index])
+
+    with request_cache():
+        # Resolves the user into the cache, the sub-requests' auth reuses it
+        await get_current_user(token)
+        reads = []
+        for index, item in enumerate(items):
+            if item.method.upper() in SAFE_METHODS:
+                reads.append(asyncio.ensure_future(run(index)))
+                continue
+            await asyncio.gather(*reads)
+            reads = []
+            await run(index)
+        await asyncio.gather(*reads)
+
+    return Response(orjson.dumps({"responses": results}), media_type="application/json")
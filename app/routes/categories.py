@@ -1,16 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Any
+from typing import List, Any, Optional, Tuple
 from ..schemas.category import Category, CategoryCreate, CategoryUpdate
 from ..schemas.user import User
 from ..services.database import db
+from ..services.pagination import Page, page_query, paged_response
+from ..services.serialization import fields_query, trusted_response
 from .auth import get_current_user
 
 router = APIRouter()
 
+SORT_FIELDS = ("created_at", "updated_at", "name")
+
 @router.get("/", response_model=List[Category])
-async def get_categories(current_user: User = Depends(get_current_user)) -> Any:
-    categories = await db.get_categories(str(current_user.id))
-    return categories
+async def get_categories(
+    page: Page = Depends(page_query(SORT_FIELDS)),
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(Category)),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    categories = await db.get_categories(str(current_user.id), page.columns(fields), page=page)
+    categories, cursor = page.split(categories)
+    return paged_response(trusted_response(Category, categories, fields=fields), cursor)
 
 @router.post("/", response_model=Category)
 async def create_category(
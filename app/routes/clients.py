@@ -1,16 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Any
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from typing import List, Any, Optional, Tuple
 from ..schemas.client import Client, ClientCreate, ClientUpdate, ClientWithProjects
 from ..schemas.user import User
 from ..services.database import db
+from ..services.etag import collection_etag, not_modified, with_etag
+from ..services.includes import IncludeTree, include_query, included_response
+from ..services.pagination import Page, page_query, paged_response
+from ..services.serialization import fields_query, trusted_response
 from .auth import get_current_user
 
 router = APIRouter()
 
+SORT_FIELDS = ("created_at", "updated_at", "name", "company")
+
 @router.get("/", response_model=List[Client])
-async def get_clients(current_user: User = Depends(get_current_user)) -> Any:
-    clients = await db.get_clients(str(current_user.id))
-    return clients
+async def get_clients(
+    request: Request,
+    page: Page = Depends(page_query(SORT_FIELDS)),
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(Client)),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    etag = await collection_etag(request, str(current_user.id), ("clients",))
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    clients = await db.get_clients(str(current_user.id), page.columns(fields), page=page)
+    clients, cursor = page.split(clients)
+    return with_etag(paged_response(trusted_response(Client, clients, fields=fields), cursor), etag)
 
 @router.post("/", response_model=Client)
 async def create_client(
@@ -24,9 +40,10 @@ async def create_client(
 @router.get("/{client_id}", response_model=Client)
 async def get_client(
     client_id: str,
+    include: Optional[IncludeTree] = Depends(include_query("clients")),
     current_user: User = Depends(get_current_user)
 ) -> Any:
-    client = await db.get_client(client_id)
+    client = await db.get_client(client_id, include)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -37,6 +54,8 @@ async def get_client(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
+    if include:
+        return included_response("clients", client, include)
     return client
 
 @router.get("/{client_id}/projects", response_model=ClientWithProjects)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Any, Optional
+from typing import List, Any, Optional, Tuple
 from ..schemas.notification import (
     Notification, NotificationCreate, NotificationUpdate,
     NotificationPreference, NotificationPreferenceCreate,
@@ -7,6 +7,7 @@ from ..schemas.notification import (
 )
 from ..schemas.user import User
 from ..services.database import db
+from ..services.serialization import fields_query, trusted_response
 from .auth import get_current_user
 
 router = APIRouter()
@@ -17,15 +18,18 @@ async def get_notifications(
     is_archived: Optional[bool] = None,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(Notification)),
     current_user: User = Depends(get_current_user)
 ) -> Any:
-    return await db.get_user_notifications(
+    notifications = await db.get_user_notifications(
         str(current_user.id),
         is_read=is_read,
         is_archived=is_archived,
         limit=limit,
-        offset=offset
+        offset=offset,
+        columns=fields
     )
+    return trusted_response(Notification, notifications, fields=fields)
 
 @router.post("/", response_model=Notification)
 async def create_notification(
@@ -1,26 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Any
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Any, Optional, Tuple
 from ..schemas.project import Project, ProjectCreate, ProjectUpdate
+from ..schemas.project_overview import ProjectOverview
 from ..schemas.user import User
 from ..services.database import db
+from ..services.etag import collection_etag, not_modified, with_etag
+from ..services.includes import IncludeTree, include_query, included_response
+from ..services.pagination import Page, page_query, paged_response
+from ..services.serialization import fields_query, trusted_response
+from ..config import settings
 from .auth import get_current_user
 from postgrest.exceptions import APIError
-from datetime import datetime
 
 router = APIRouter()
 
+SORT_FIELDS = ("created_at", "updated_at", "name", "status", "start_date", "end_date")
+
 @router.get("/", response_model=List[Project])
-async def get_projects(current_user: User = Depends(get_current_user)) -> Any:
-    projects = await db.get_projects(str(current_user.id))
-    
-    # Ensure datetime fields are returned as datetime objects
-    for project in projects:
-        if 'start_date' in project and isinstance(project['start_date'], str):
-            project['start_date'] = datetime.fromisoformat(project['start_date'])
-        if 'end_date' in project and isinstance(project['end_date'], str):
-            project['end_date'] = datetime.fromisoformat(project['end_date'])
-    
-    return projects
+async def get_projects(
+    request: Request,
+    project_status: Optional[str] = Query(None, alias="status"),
+    client_id: Optional[str] = None,
+    page: Page = Depends(page_query(SORT_FIELDS)),
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(Project)),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    # Projects embed their client's name
+    etag = await collection_etag(request, str(current_user.id), ("projects", "clients"))
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    projects = await db.get_projects(
+        str(current_user.id),
+        page.columns(fields),
+        status=project_status,
+        client_id=client_id,
+        page=page
+    )
+    projects, cursor = page.split(projects)
+    return with_etag(paged_response(trusted_response(Project, projects, fields=fields), cursor), etag)
 
 @router.post("/", response_model=Project)
 async def create_project(
@@ -34,9 +53,10 @@ async def create_project(
 @router.get("/{project_id}", response_model=Project)
 async def get_project(
     project_id: str,
+    include: Optional[IncludeTree] = Depends(include_query("projects")),
     current_user: User = Depends(get_current_user)
 ) -> Any:
-    project = await db.get_project(project_id)
+    project = await db.get_project(project_id, include)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -47,8 +67,45 @@ async def get_project(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
+    if include:
+        return included_response("projects", project, include)
     return project
 
+@router.get("/{project_id}/overview", response_model=ProjectOverview)
+async def get_project_overview(
+    project_id: str,
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """Get a project with its tasks, team, time totals and recent entries in one call"""
+    project = await db.get_project(project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    if project["user_id"] != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    # The rest of the overview only loads once the project is authorized
+    tasks, team_members, recent_entries = await asyncio.gather(
+        db.get_project_tasks(project_id),
+        db.get_project_team_members(project_id),
+        db.get_project_recent_time_entries(project_id, settings.PROJECT_OVERVIEW_RECENT_ENTRIES)
+    )
+
+    return {
+        "project": project,
+        "tasks": tasks,
+        "team_members": team_members,
+        "total_duration": project.get("tracked_minutes") or 0,
+        "billable_duration": project.get("billable_minutes") or 0,
+        "task_durations": {task["id"]: task.get("tracked_minutes") or 0 for task in tasks},
+        "recent_time_entries": recent_entries
+    }
+
 @router.put("/{project_id}", response_model=Project)
 async def update_project(
     project_id: str,
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Any, Dict, Optional, Union
 from datetime import datetime, date, timedelta
+from functools import partial
+from operator import itemgetter
+import orjson
 from ..schemas.report import (
     Report, ReportCreate, ReportUpdate,
-    TimeTrackingReport, ProjectStatsReport,
+    TimeTrackingReport, NormalizedTimeTrackingReport, ProjectStatsReport,
     TeamProductivityReport, ClientBillingReport,
-    TimeRange
+    ComparisonPeriod, ReportFormat, ReportJob, ReportJobStatus, ReportType, TimeRange
 )
 from ..schemas.user import User
 from ..services.database import db
+from ..services.report_aggregation import EntryColumns, compare_periods, group_summary
+from ..services.report_cache import report_cache, report_key
+from ..services.report_jobs import report_jobs
+from ..services.report_presets import preset_key, preset_versions, report_presets
+from ..services.serialization import trusted_json
 from .auth import get_current_user
 
 router = APIRouter()
@@ -128,59 +136,160 @@ def get_date_range(time_range: TimeRange, start_date: Optional[date] = None, end
 #         )
 #     await db.delete_report(report_id)
 
-@router.post("/generate/time-tracking", response_model=TimeTrackingReport)
-async def generate_time_tracking_report(
-    report: ReportCreate,
-    current_user: User = Depends(get_current_user)
-) -> Any:
+def _months_before(day: date, months: int) -> date:
+    """First day of the month months before day's month"""
+    index = day.year * 12 + day.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+def _year_before(day: date) -> date:
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:  # February 29th
+        return day.replace(year=day.year - 1, day=28)
+
+def get_comparison_range(report: ReportCreate, start_date: date, end_date: date) -> Optional[tuple[date, date]]:
+    """The period a report is compared to, None without compare_to"""
+    if report.compare_to is None:
+        return None
+    if report.compare_to == ComparisonPeriod.CUSTOM:
+        if not report.compare_start_date or not report.compare_end_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Compare start date and compare end date are required for a custom comparison"
+            )
+        compare_start, compare_end = report.compare_start_date, report.compare_end_date
+    elif report.compare_to == ComparisonPeriod.PREVIOUS_YEAR:
+        compare_start, compare_end = _year_before(start_date), _year_before(end_date)
+    elif start_date.day == 1 and (end_date + timedelta(days=1)).day == 1:
+        # Whole months compare to the months before them, this month to last month
+        months = (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+        compare_start, compare_end = _months_before(start_date, months), start_date - timedelta(days=1)
+    else:
+        length = end_date - start_date + timedelta(days=1)
+        compare_start, compare_end = start_date - length, start_date - timedelta(days=1)
+    if compare_start > compare_end or (compare_start <= end_date and compare_end >= start_date):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The comparison period must be a date range outside the report period"
+        )
+    return compare_start, compare_end
+
+def reject_comparison(report: ReportCreate) -> None:
+    """Only time tracking reports compare periods, the other types would silently ignore compare_to"""
+    if report.compare_to is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Comparison periods are only supported for time tracking reports"
+        )
+
+def normalize_time_entries(columns: EntryColumns) -> Dict[str, Any]:
+    """Split report rows into light entry rows and entity dictionaries keyed by id"""
+    # Aggregated first, the dimensions read the embeds popped below
+    total_hours, billable_hours = columns.totals()
+    summary = group_summary(columns.groups(), lambda rows: ("entry_ids", list(map(itemgetter("id"), rows))))
+
+    tasks, projects, clients, users = {}, {}, {}, {}
+    entries = []
+    for row in columns.rows:
+        task = dict(row.pop("tasks"))
+        project = dict(task.pop("projects"))
+        client = project.pop("clients", None)
+        user = row.pop("users", None)
+        tasks.setdefault(task["id"], task)
+        projects.setdefault(project["id"], project)
+        if client:
+            clients.setdefault(client["id"], client)
+        if user:
+            users.setdefault(user["id"], user)
+        entries.append(row)
+
+    return {
+        "total_hours": total_hours,
+        "billable_hours": billable_hours,
+        "non_billable_hours": total_hours - billable_hours,
+        "entries": entries,
+        "tasks": tasks,
+        "projects": projects,
+        "clients": clients,
+        "users": users,
+        "summary": summary
+    }
+
+async def time_tracking_report(report: ReportCreate, response_format: ReportFormat) -> Any:
+    """Time tracking report content, serialized up front in the normalized format.
+
+    With a comparison period both windows come from one fetch, which is
+    bucketed by period before aggregating.
+    """
     start_date, end_date = get_date_range(report.time_range, report.start_date, report.end_date)
-    
-    time_entries = await db.get_time_entries_for_report(
+    comparison_range = get_comparison_range(report, start_date, end_date)
+    comparison_period = (
+        (comparison_range[0].isoformat(), comparison_range[1].isoformat()) if comparison_range else None
+    )
+    fetch = (
+        db.get_report_time_entry_rows if response_format == ReportFormat.NORMALIZED
+        else db.get_time_entries_for_report
+    )
+    rows = await fetch(
         start_date.isoformat(),
         end_date.isoformat(),
         [str(pid) for pid in report.project_ids] if report.project_ids else None,
         [str(tid) for tid in report.team_member_ids] if report.team_member_ids else None,
-        [str(cid) for cid in report.client_ids] if report.client_ids else None
+        [str(cid) for cid in report.client_ids] if report.client_ids else None,
+        comparison_period=comparison_period
     )
-    
-    total_hours = sum(entry["duration"] for entry in time_entries)
-    billable_hours = sum(entry["duration"] for entry in time_entries if entry["is_billable"])
+
+    columns = EntryColumns.for_report(rows, report.group_by)
+    comparison = None
+    if comparison_period:
+        columns, previous = columns.split(start_date.isoformat(), end_date.isoformat())
+        comparison = compare_periods(columns, previous, *comparison_period)
+
+    if response_format == ReportFormat.NORMALIZED:
+        return trusted_json(NormalizedTimeTrackingReport, {**normalize_time_entries(columns), "comparison": comparison})
+
+    total_hours, billable_hours = columns.totals()
     non_billable_hours = total_hours - billable_hours
-    
-    # Group entries by the specified field
-    summary = {}
-    if report.group_by:
-        grouped_entries = {}
-        for entry in time_entries:
-            key = str(entry.get(report.group_by, {}).get("id", "unknown"))
-            if key not in grouped_entries:
-                grouped_entries[key] = {
-                    "total_hours": 0,
-                    "billable_hours": 0,
-                    "non_billable_hours": 0,
-                    "entries": []
-                }
-            grouped_entries[key]["total_hours"] += entry["duration"]
-            if entry["is_billable"]:
-                grouped_entries[key]["billable_hours"] += entry["duration"]
-            else:
-                grouped_entries[key]["non_billable_hours"] += entry["duration"]
-            grouped_entries[key]["entries"].append(entry)
-        summary = grouped_entries
+    summary = group_summary(columns.groups(), lambda rows: ("entries", rows))
     
     return TimeTrackingReport(
         total_hours=total_hours,
         billable_hours=billable_hours,
         non_billable_hours=non_billable_hours,
-        entries=time_entries,
-        summary=summary
+        entries=columns.rows,
+        summary=summary,
+        comparison=comparison
     )
 
-@router.post("/generate/project-stats", response_model=ProjectStatsReport)
-async def generate_project_stats_report(
+async def cached_time_tracking_report(report: ReportCreate, response_format: ReportFormat, user_id: str) -> Any:
+    """Preset ranges come from the precomputed reports, custom ranges from the report cache"""
+    compute = partial(time_tracking_report, report, response_format)
+    if report.time_range == TimeRange.CUSTOM:
+        key = await report_key("time-tracking", user_id, report, response_format.value)
+        return await report_cache.get(key, compute)
+
+    def covered() -> tuple[str, str]:
+        # Entries of the comparison period change the report too
+        start_date, end_date = get_date_range(report.time_range)
+        comparison_range = get_comparison_range(report, start_date, end_date)
+        if comparison_range:
+            start_date, end_date = min(start_date, comparison_range[0]), max(end_date, comparison_range[1])
+        return start_date.isoformat(), end_date.isoformat()
+    key = preset_key("time-tracking", user_id, report, response_format.value)
+    return await report_presets.get(key, covered, compute, partial(preset_versions, user_id))
+
+@router.post("/generate/time-tracking", response_model=Union[TimeTrackingReport, NormalizedTimeTrackingReport])
+async def generate_time_tracking_report(
     report: ReportCreate,
+    response_format: ReportFormat = Query(ReportFormat.NESTED, alias="format"),
     current_user: User = Depends(get_current_user)
 ) -> Any:
+    result = await cached_time_tracking_report(report, response_format, str(current_user.id))
+    if response_format == ReportFormat.NORMALIZED:
+        return Response(result, media_type="application/json")
+    return result
+
+async def project_stats_report(report: ReportCreate) -> ProjectStatsReport:
     projects = await db.get_projects_for_report(
         [str(pid) for pid in report.project_ids] if report.project_ids else None,
         [str(cid) for cid in report.client_ids] if report.client_ids else None,
@@ -216,11 +325,16 @@ async def generate_project_stats_report(
         projects=projects
     )
 
-@router.post("/generate/team-productivity", response_model=TeamProductivityReport)
-async def generate_team_productivity_report(
+@router.post("/generate/project-stats", response_model=ProjectStatsReport)
+async def generate_project_stats_report(
     report: ReportCreate,
     current_user: User = Depends(get_current_user)
 ) -> Any:
+    reject_comparison(report)
+    key = await report_key("project-stats", str(current_user.id), report)
+    return await report_cache.get(key, lambda: project_stats_report(report))
+
+async def team_productivity_report(report: ReportCreate) -> TeamProductivityReport:
     team_members = await db.get_team_members_for_report(
         [str(pid) for pid in report.project_ids] if report.project_ids else None,
         [str(tid) for tid in report.team_member_ids] if report.team_member_ids else None,
@@ -248,11 +362,16 @@ async def generate_team_productivity_report(
         members=team_members
     )
 
-@router.post("/generate/client-billing", response_model=ClientBillingReport)
-async def generate_client_billing_report(
+@router.post("/generate/team-productivity", response_model=TeamProductivityReport)
+async def generate_team_productivity_report(
     report: ReportCreate,
     current_user: User = Depends(get_current_user)
 ) -> Any:
+    reject_comparison(report)
+    key = await report_key("team-productivity", str(current_user.id), report)
+    return await report_cache.get(key, lambda: team_productivity_report(report))
+
+async def client_billing_report(report: ReportCreate) -> ClientBillingReport:
     clients = await db.get_clients_for_report(
         [str(cid) for cid in report.client_ids] if report.client_ids else None,
         report.include_inactive
@@ -283,6 +402,92 @@ async def generate_client_billing_report(
         clients=clients
     )
 
+@router.post("/generate/client-billing", response_model=ClientBillingReport)
+async def generate_client_billing_report(
+    report: ReportCreate,
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    reject_comparison(report)
+    key = await report_key("client-billing", str(current_user.id), report)
+    return await report_cache.get(key, lambda: client_billing_report(report))
+
+# Generators of the other report types, with their report cache kind
+REPORT_GENERATORS = {
+    ReportType.PROJECT_STATS: ("project-stats", project_stats_report),
+    ReportType.TEAM_PRODUCTIVITY: ("team-productivity", team_productivity_report),
+    ReportType.CLIENT_BILLING: ("client-billing", client_billing_report),
+}
+
+JOB_COLUMNS = ("id", "user_id", "type", "status", "error", "created_at", "last_generated")
+
+async def report_job_data(report: ReportCreate, response_format: ReportFormat, user_id: str) -> Dict[str, Any]:
+    """Result of a report job, shared with identical synchronous requests"""
+    if report.type == ReportType.TIME_TRACKING:
+        result = await cached_time_tracking_report(report, response_format, user_id)
+    else:
+        kind, generate = REPORT_GENERATORS[report.type]
+        result = await report_cache.get(await report_key(kind, user_id, report), lambda: generate(report))
+    if isinstance(result, bytes):
+        return orjson.loads(result)
+    return result.model_dump(mode="json")
+
+async def get_report_job_row(job_id: str, current_user: User, columns: tuple = JOB_COLUMNS) -> Dict[str, Any]:
+    job = await db.get_report(job_id, columns)
+    if not job or not job.get("status"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    if job["user_id"] != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return job
+
+@router.post("/jobs", response_model=ReportJob, status_code=status.HTTP_202_ACCEPTED)
+async def submit_report_job(
+    report: ReportCreate,
+    response_format: ReportFormat = Query(ReportFormat.NESTED, alias="format"),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """Queue a report to be computed in the background, poll the job until it completes"""
+    start_date, end_date = get_date_range(report.time_range, report.start_date, report.end_date)
+    if report.type == ReportType.TIME_TRACKING:
+        get_comparison_range(report, start_date, end_date)
+    else:
+        reject_comparison(report)
+    user_id = str(current_user.id)
+    try:
+        return await report_jobs.submit(
+            user_id,
+            report.model_dump(mode="json"),
+            lambda: report_job_data(report, response_format, user_id)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=ReportJob)
+async def get_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    return await get_report_job_row(job_id, current_user)
+
+@router.get("/jobs/{job_id}/result")
+async def get_report_job_result(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """The report computed by a completed job"""
+    job = await get_report_job_row(job_id, current_user, JOB_COLUMNS + ("data",))
+    if job["status"] != ReportJobStatus.COMPLETED:
+        detail = f"Report job is {job['status']}"
+        if job.get("error"):
+            detail = f"{detail}: {job['error']}"
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+    return Response(orjson.dumps(job["data"]), media_type="application/json")
+
 @router.get("/clients-full-report", response_model=List[dict])
 async def get_clients_full_report(current_user: User = Depends(get_current_user)) -> Any:
     clients = await db.get_clients(str(current_user.id))
@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Any, Dict, List, Optional
+from ..config import settings
+from ..schemas.category import Category
+from ..schemas.client import Client
+from ..schemas.project import Project
+from ..schemas.sync import SyncChanges
+from ..schemas.task import Task
+from ..schemas.user import User
+from ..services.database import db
+from ..services.serialization import project_rows, trusted_response
+from .auth import get_current_user
+
+router = APIRouter()
+
+COLLECTIONS = {
+    "projects": (Project, db.get_projects),
+    "tasks": (Task, db.get_user_tasks),
+    "clients": (Client, db.get_clients),
+    "categories": (Category, db.get_categories),
+}
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+@router.get("/", response_model=SyncChanges)
+async def sync(
+    since: Optional[str] = Query(None, description="cursor of the previous sync, omit for a full sync"),
+    collections: str = Query(",".join(COLLECTIONS)),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """Rows of the current user's collections created, updated or deleted since a cursor.
+
+    The cursor is the latest updated_at/deleted_at the client has seen, so it
+    follows the database clock. Changes from the last SYNC_OVERLAP_SECONDS
+    before it are sent again to cover writes that committed out of order;
+    applying them is idempotent for clients that upsert by id.
+    """
+    names = [name.strip() for name in collections.split(",") if name.strip()]
+    unknown = [name for name in names if name not in COLLECTIONS]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown collections: {', '.join(unknown)}, expected {', '.join(COLLECTIONS)}"
+        )
+
+    cursor = None
+    changed_since = None
+    if since:
+        try:
+            cursor = parse_timestamp(since)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync cursor")
+        changed_since = (cursor - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)).isoformat()
+
+    user_id = str(current_user.id)
+    queries = [COLLECTIONS[name][1](user_id, updated_since=changed_since) for name in names]
+    if since:
+        # A full sync replaces the client's collections, so it needs no tombstones
+        queries.append(db.get_deleted_records(user_id, names, changed_since))
+    results = await asyncio.gather(*queries)
+
+    seen = [cursor] if cursor else []
+    changes: Dict[str, Dict[str, List[Any]]] = {}
+    for name, rows in zip(names, results):
+        changes[name] = {"upserted": project_rows(COLLECTIONS[name][0], rows), "deleted": []}
+        seen.extend(parse_timestamp(row["updated_at"]) for row in rows if row.get("updated_at"))
+    tombstones = results[len(names)] if since else []
+    for tombstone in tombstones:
+        changes[tombstone["table_name"]]["deleted"].append(tombstone["record_id"])
+        seen.append(parse_timestamp(tombstone["deleted_at"]))
+
+    return trusted_response(SyncChanges, {
+        "cursor": max(seen).isoformat() if seen else None,
+        "full": not since,
+        "collections": changes
+    })
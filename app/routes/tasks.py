@@ -1,29 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Optional, Tuple
+from datetime import date, timedelta
 from ..schemas.task import Task, TaskCreate, TaskUpdate
 from ..services.database import db
+from ..services.etag import collection_etag, not_modified, with_etag
+from ..services.pagination import Page, page_query, paged_response
+from ..services.serialization import fields_query, trusted_response
 from .auth import get_current_user
 from ..schemas.user import User
 from postgrest.exceptions import APIError
-from datetime import datetime
 
 router = APIRouter(tags=["tasks"])
 
+SORT_FIELDS = ("created_at", "updated_at", "title", "status", "priority", "due_date")
+
 @router.get("/project/{project_id}", response_model=List[Task])
 async def get_project_tasks(
     project_id: str,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    page: Page = Depends(page_query(SORT_FIELDS)),
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(Task)),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all tasks for a specific project"""
+    """Get the tasks of a project, optionally filtered, sorted and paginated (due dates are inclusive)"""
     try:
-        tasks = await db.get_project_tasks(project_id)
-        
-        # Ensure due_date is returned as a datetime object
-        for task in tasks:
-            if 'due_date' in task and isinstance(task['due_date'], str):
-                task['due_date'] = datetime.fromisoformat(task['due_date'])
-        
-        return tasks
+        tasks = await db.get_project_tasks(
+            project_id,
+            page.columns(fields),
+            status=status,
+            priority=priority,
+            assigned_to=assigned_to,
+            due_from=due_from.isoformat() if due_from else None,
+            due_before=(due_to + timedelta(days=1)).isoformat() if due_to else None,
+            page=page
+        )
+        tasks, cursor = page.split(tasks)
+        return paged_response(trusted_response(Task, tasks, fields=fields), cursor)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -56,21 +72,23 @@ async def create_task(
         raise HTTPException(status_code=400, detail=str(e))
     
 @router.get("/active", response_model=List[Task])
-async def get_active_tasks(current_user: User = Depends(get_current_user)):
+async def get_active_tasks(
+    request: Request,
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(Task)),
+    current_user: User = Depends(get_current_user)
+):
     """Get all active tasks for all projects of the current user"""
+    etag = await collection_etag(request, str(current_user.id), ("tasks", "projects"))
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
     print(f"Getting active tasks for user: {current_user.id}")
     projects = await db.get_projects(str(current_user.id))
     project_ids = [p['id'] for p in projects]
     if not project_ids:
-        return []
-    active_tasks = await db.get_active_tasks_for_projects(project_ids)
-    
-    # Ensure due_date is returned as a datetime object
-    for task in active_tasks:
-        if 'due_date' in task and isinstance(task['due_date'], str):
-            task['due_date'] = datetime.fromisoformat(task['due_date'])
-    
-    return active_tasks
+        return with_etag(trusted_response(Task, []), etag)
+    active_tasks = await db.get_active_tasks_for_projects(project_ids, fields)
+    return with_etag(trusted_response(Task, active_tasks, fields=fields), etag)
 
 @router.get("/{task_id}", response_model=Task)
 async def get_task(
@@ -1,16 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Any
-from ..schemas.time_entry import TimeEntry, TimeEntryCreate, TimeEntryUpdate
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Any, Optional, Tuple
+from ..schemas.time_entry import TimeEntry, TimeEntryCreate, TimeEntryUpdate, CalendarTimeEntry
 from ..schemas.user import User
 from ..services.database import db
+from ..services.etag import conditional_response
+from ..services.serialization import fields_query, trusted_json, trusted_response
+from ..services.time_entry_import import SUPPORTED_FORMATS, detect_format, import_time_entries
+from ..config import settings
 from .auth import get_current_user
-from datetime import datetime
+from datetime import datetime, date, timedelta
+import json
 
 router = APIRouter()
 
+@router.get("/", response_model=List[CalendarTimeEntry])
+async def get_calendar_time_entries(
+    request: Request,
+    start_date: date,
+    end_date: date,
+    current_user: User = Depends(get_current_user)
+) -> Response:
+    """Get all of the current user's time entries between two dates (inclusive)"""
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    if (end_date - start_date).days >= settings.CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {settings.CALENDAR_MAX_DAYS} days"
+        )
+
+    time_entries = await db.get_user_time_entries(
+        str(current_user.id),
+        start_date.isoformat(),
+        (end_date + timedelta(days=1)).isoformat()
+    )
+    return conditional_response(request, trusted_json(CalendarTimeEntry, time_entries))
+
 @router.get("/task/{task_id}", response_model=List[TimeEntry])
 async def get_time_entries(
     task_id: str,
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(TimeEntry)),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     # Verify task exists and user has access
@@ -29,8 +62,8 @@ async def get_time_entries(
             detail="Not enough permissions"
         )
     
-    time_entries = await db.get_task_time_entries(task_id)
-    return time_entries
+    time_entries = await db.get_task_time_entries(task_id, fields)
+    return trusted_response(TimeEntry, time_entries, fields=fields)
 
 @router.post("/task/{task_id}", response_model=TimeEntry)
 async def create_time_entry(
@@ -139,4 +172,25 @@ async def delete_time_entry(
             detail="Not enough permissions"
         )
     
-    await db.delete_time_entry(time_entry_id) 
\ No newline at end of file
+    await db.delete_time_entry(time_entry_id) 
+
+@router.post("/import")
+async def import_time_entries_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; detected from the file name if omitted"),
+    chunk_size: int = Query(settings.IMPORT_CHUNK_SIZE, ge=1, le=settings.IMPORT_MAX_CHUNK_SIZE),
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    """Import time entries from a CSV or NDJSON file, streaming progress as NDJSON"""
+    fmt = format or detect_format(file.filename, file.content_type)
+    if fmt not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported import format. Expected csv or ndjson"
+        )
+
+    async def progress():
+        async for event in import_time_entries(file.file, fmt, str(current_user.id), chunk_size):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
@@ -43,7 +43,7 @@ async def upload_time_entry_file(
         "uploaded_at": datetime.datetime.utcnow().isoformat(),
         "user_id": str(current_user.id),
     }
-    db.supabase.table("time_entry_files").insert(file_record).execute()
+    await db.create_time_entry_file(file_record)
     return file_record
 
 @router.get("/time-entries/{time_entry_id}/files")
@@ -52,8 +52,7 @@ async def list_time_entry_files(
     user_and_token: tuple = Depends(get_current_user_and_token)
 ):
     # Only allow access if user owns the time entry (optional: add check)
-    files = db.supabase.table("time_entry_files").select("*").eq("time_entry_id", str(time_entry_id)).order("uploaded_at", desc=True).execute()
-    return files.data
+    return await db.get_time_entry_files(str(time_entry_id))
 
 @router.delete("/time-entries/{time_entry_id}/files/{file_id}")
 async def delete_time_entry_file(
@@ -64,8 +63,7 @@ async def delete_time_entry_file(
     current_user, token = user_and_token
 
     # Get file record
-    files = db.supabase.table("time_entry_files").select("*").eq("id", str(file_id)).execute()
-    file_record = files.data[0] if files.data else None
+    file_record = await db.get_time_entry_file(str(file_id))
     if not file_record:
         raise HTTPException(status_code=404, detail="File not found")
 
@@ -78,5 +76,5 @@ async def delete_time_entry_file(
         raise HTTPException(status_code=500, detail=f"Failed to delete file from storage: {res}")
 
     # Delete from DB
-    db.supabase.table("time_entry_files").delete().eq("id", str(file_id)).execute()
+    await db.delete_time_entry_file(str(file_id))
     return {"message": "File deleted"} 
\ No newline at end of file
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any
+from ..schemas.timer import Timer, TimerStart
+from ..schemas.time_entry import TimeEntry
+from ..schemas.user import User
+from ..services.database import db
+from ..services.timers import timer_registry
+from .auth import get_current_user
+
+router = APIRouter()
+
+@router.get("/current", response_model=Timer)
+async def get_current_timer(current_user: User = Depends(get_current_user)) -> Any:
+    timer = timer_registry.get(str(current_user.id))
+    if not timer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No timer is running"
+        )
+    return timer.to_dict()
+
+@router.post("/start", response_model=Timer)
+async def start_timer(
+    timer: TimerStart,
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    # Verify task exists and user has access
+    task = await db.get_task(str(timer.task_id))
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+
+    # Verify project access
+    project = await db.get_project(task["project_id"])
+    if project["user_id"] != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    try:
+        active_timer = timer_registry.start(str(current_user.id), str(timer.task_id), timer.description)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return active_timer.to_dict()
+
+@router.post("/heartbeat", response_model=Timer)
+async def heartbeat_timer(current_user: User = Depends(get_current_user)) -> Any:
+    timer = timer_registry.heartbeat(str(current_user.id))
+    if not timer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No timer is running"
+        )
+    return timer.to_dict()
+
+@router.post("/stop", response_model=TimeEntry)
+async def stop_timer(current_user: User = Depends(get_current_user)) -> Any:
+    time_entry = await timer_registry.stop(str(current_user.id))
+    if not time_entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No timer is running"
+        )
+    return time_entry
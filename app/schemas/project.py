@@ -40,6 +40,8 @@ class ProjectUpdate(BaseModel, DateValidatorMixin):
 
 class Project(ProjectBase, BaseSchema):
     client_name: Optional[str] = None
+    tracked_minutes: float = 0
+    billable_minutes: float = 0
 
 class ProjectWithTasks(Project):
     tasks: List["Task"] = [] 
\ No newline at end of file
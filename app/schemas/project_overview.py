@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+from datetime import datetime
+from uuid import UUID
+from .project import Project
+from .task import Task
+from .team_member import TeamMember
+
+class RecentTimeEntry(BaseModel):
+    id: str
+    task_id: UUID
+    task_title: Optional[str] = None
+    user_id: UUID
+    description: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    duration: Optional[float] = None
+
+class ProjectOverview(BaseModel):
+    project: Project
+    tasks: List[Task]
+    team_members: List[TeamMember]
+    total_duration: float
+    billable_duration: float
+    task_durations: Dict[str, float]  # task_id -> minutes logged
+    recent_time_entries: List[RecentTimeEntry]
@@ -20,6 +20,21 @@ class TimeRange(str, Enum):
     LAST_MONTH = "last_month"
     CUSTOM = "custom"
 
+class ReportFormat(str, Enum):
+    NESTED = "nested"
+    NORMALIZED = "normalized"
+
+class ComparisonPeriod(str, Enum):
+    PREVIOUS_PERIOD = "previous_period"
+    PREVIOUS_YEAR = "previous_year"
+    CUSTOM = "custom"
+
+class ReportJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
 class ReportBase(BaseModel):
     name: str
     type: ReportType
@@ -33,6 +48,9 @@ class ReportBase(BaseModel):
     group_by: Optional[str] = None  # project, team_member, client, date
     sort_by: Optional[str] = None
     sort_order: Optional[str] = "desc"
+    compare_to: Optional[ComparisonPeriod] = None
+    compare_start_date: Optional[date] = None
+    compare_end_date: Optional[date] = None
 
 class ReportCreate(ReportBase):
     pass
@@ -49,11 +67,42 @@ class ReportUpdate(BaseModel):
     group_by: Optional[str] = None
     sort_by: Optional[str] = None
     sort_order: Optional[str] = None
+    compare_to: Optional[ComparisonPeriod] = None
+    compare_start_date: Optional[date] = None
+    compare_end_date: Optional[date] = None
 
 class Report(ReportBase, BaseSchema):
     user_id: UUID
     last_generated: Optional[datetime] = None
     data: Optional[Dict[str, Any]] = None
+    status: Optional[ReportJobStatus] = None
+    error: Optional[str] = None
+
+class ReportJob(BaseModel):
+    """A background report job, its result is fetched separately once completed"""
+    id: UUID
+    type: ReportType
+    status: ReportJobStatus
+    error: Optional[str] = None
+    created_at: datetime
+    last_generated: Optional[datetime] = None
+
+class PeriodTotals(BaseModel):
+    total_hours: float
+    billable_hours: float
+    non_billable_hours: float
+
+class PeriodComparison(BaseModel):
+    """Totals of the comparison period and the change from them to the report period.
+
+    summary mirrors the report summary's nesting, each group holding its
+    previous totals and the delta.
+    """
+    start_date: date
+    end_date: date
+    previous: PeriodTotals
+    delta: PeriodTotals
+    summary: Dict[str, Any]
 
 class TimeTrackingReport(BaseModel):
     total_hours: float
@@ -61,6 +110,24 @@ class TimeTrackingReport(BaseModel):
     non_billable_hours: float
     entries: List[Dict[str, Any]]
     summary: Dict[str, Any]
+    comparison: Optional[PeriodComparison] = None
+
+class NormalizedTimeTrackingReport(BaseModel):
+    """Time tracking report with each task, project, client and user sent once.
+
+    Entries reference the entity dictionaries by id instead of embedding them,
+    and summary groups list entry ids instead of copies of the entries.
+    """
+    total_hours: float
+    billable_hours: float
+    non_billable_hours: float
+    entries: List[Dict[str, Any]]
+    tasks: Dict[str, Dict[str, Any]]
+    projects: Dict[str, Dict[str, Any]]
+    clients: Dict[str, Dict[str, Any]]
+    users: Dict[str, Dict[str, Any]]
+    summary: Dict[str, Any]
+    comparison: Optional[PeriodComparison] = None
 
 class ProjectStatsReport(BaseModel):
     total_projects: int
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+
+class CollectionChanges(BaseModel):
+    upserted: List[Dict[str, Any]] = []
+    deleted: List[str] = []
+
+class SyncChanges(BaseModel):
+    """Changes since a sync cursor, or whole collections when full is true"""
+    cursor: Optional[str] = None
+    full: bool
+    collections: Dict[str, CollectionChanges]
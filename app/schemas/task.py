@@ -43,7 +43,8 @@ class TaskUpdate(BaseModel):
         return value
 
 class Task(TaskBase, BaseSchema):
-    pass
+    tracked_minutes: float = 0
+    billable_minutes: float = 0
 
 class TaskWithTimeEntries(Task):
     time_entries: List["TimeEntry"] = [] 
\ No newline at end of file
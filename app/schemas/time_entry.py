@@ -22,4 +22,9 @@ class TimeEntryUpdate(BaseModel):
     duration: Optional[int] = None
 
 class TimeEntry(TimeEntryBase, BaseSchema):
-    task: Optional[Task] = None 
\ No newline at end of file
+    task: Optional[Task] = None 
+
+class CalendarTimeEntry(TimeEntryBase, BaseSchema):
+    task_title: Optional[str] = None
+    project_id: Optional[UUID] = None
+    project_name: Optional[str] = None
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+
+class TimerStart(BaseModel):
+    task_id: UUID
+    description: Optional[str] = None
+
+class Timer(BaseModel):
+    time_entry_id: str
+    task_id: UUID
+    user_id: UUID
+    description: Optional[str] = None
+    start_time: datetime
+    last_heartbeat: datetime
+    elapsed_seconds: int
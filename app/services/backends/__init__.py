@@ -0,0 +1,14 @@
+from .base import Backend, describe_query, or_filter, query_filters, query_key
+
+
+def create_backend(name: str) -> Backend:
+    """Create the storage backend selected by DATABASE_BACKEND"""
+    from ...config import settings
+
+    if name == "supabase":
+        from .supabase_backend import SupabaseBackend
+        return SupabaseBackend(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    if name == "memory":
+        from .memory import MemoryBackend
+        return MemoryBackend()
+    raise ValueError(f"Unknown DATABASE_BACKEND: {name}")
@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+OPERATIONS = {"GET": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+# PostgREST query parameters that are not filters
+MODIFIER_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+class Backend(ABC):
+    """Storage engine behind DatabaseService.
+
+    Backends expose PostgREST-style query builders: ``table(name)`` supports
+    select (with embedded resources), insert/upsert/update/delete, the usual
+    filters, order, limit and range, and ``rpc(fn, params)`` calls a stored
+    function. ``execute`` runs a built query and returns an object with a
+    ``data`` attribute, like ``postgrest.APIResponse``.
+    """
+
+    name: str = ""
+    # Storage client for file uploads, None when the backend has no storage
+    storage: Optional[Any] = None
+
+    @abstractmethod
+    def table(self, name: str) -> Any:
+        ...
+
+    @abstractmethod
+    def rpc(self, fn: str, params: Dict[str, Any]) -> Any:
+        ...
+
+    @abstractmethod
+    async def execute(self, query: Any) -> Any:
+        ...
+
+
+def or_filter(query: Any, filters: str) -> Any:
+    """Add a PostgREST ``or=(...)`` filter, postgrest-py 0.13 builders have no or_()"""
+    if hasattr(query, "or_"):
+        return query.or_(filters)
+    query.params = query.params.add("or", f"({filters})")
+    return query
+
+
+def describe_query(query: Any) -> Tuple[str, str]:
+    """(table, operation) of a built query, e.g. ("time_entries", "select")"""
+    path = getattr(query, "path", "").strip("/")
+    if path.startswith("rpc/"):
+        return path[len("rpc/"):], "rpc"
+    return path, OPERATIONS.get(getattr(query, "http_method", ""), "unknown")
+
+
+def query_filters(query: Any) -> List[Tuple[str, str, Any]]:
+    """(column, operator, value) filters of a built query, embedded columns are dotted"""
+    if hasattr(query, "filters"):
+        return [(".".join(path + (column,)), op, value) for path, column, op, value in query.filters]
+    filters = []
+    for key, value in query.params.multi_items():
+        if key.rsplit(".", 1)[-1] in MODIFIER_PARAMS:
+            continue
+        op, _, operand = value.partition(".")
+        filters.append((key, op, operand))
+    return filters
+
+
+def query_key(query: Any) -> Optional[str]:
+    """Identity of a read query, equal for queries that return the same rows; None for writes"""
+    table, operation = describe_query(query)
+    if operation != "select":
+        return None
+    if hasattr(query, "cache_key"):
+        return query.cache_key()
+    # The count option of postgrest-py selects travels in the Prefer header
+    return f"{query.path}?{query.params}|{query.headers.get('prefer', '')}"
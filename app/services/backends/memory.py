@@ -0,0 +1,717 @@
+import datetime
+import decimal
+import enum
+import re
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from postgrest.exceptions import APIError
+from .base import Backend
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+# Foreign keys used to resolve embedded selects, mirroring app/database/schema.sql
+FOREIGN_KEYS: Dict[str, Dict[str, str]] = {
+    "clients": {"user_id": "users"},
+    "projects": {"client_id": "clients", "user_id": "users"},
+    "tasks": {"project_id": "projects", "assigned_to": "users"},
+    "time_entries": {"task_id": "tasks", "user_id": "users"},
+    "time_entry_files": {"time_entry_id": "time_entries", "user_id": "users"},
+    "categories": {"user_id": "users"},
+    "team_members": {"project_id": "projects", "user_id": "users"},
+    "notifications": {"user_id": "users"},
+    "notification_preferences": {"user_id": "users"},
+    "client_files": {"client_id": "clients"},
+    "reports": {"user_id": "users"},
+    "deleted_records": {"user_id": "users"},
+}
+
+# Tables with the set_updated_at and record_deletion triggers of app/database/schema.sql,
+# mapped to how a deleted row's owner is found: a user_id column or (foreign key, table)
+SYNCED_TABLES: Dict[str, Any] = {
+    "projects": "user_id",
+    "tasks": ("project_id", "projects"),
+    "clients": "user_id",
+    "categories": "user_id",
+}
+
+# Tables with the bump_collection_version trigger of app/database/schema.sql, owners found as for SYNCED_TABLES
+VERSIONED_TABLES: Dict[str, Any] = {
+    "clients": "user_id",
+    "projects": "user_id",
+    "tasks": ("project_id", "projects"),
+    "time_entries": "user_id",
+    "team_members": "user_id",
+}
+
+# Column defaults, callables are evaluated per row
+TABLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "users": {"is_active": True},
+    "clients": {"is_active": True},
+    "projects": {"status": "active", "is_active": True, "tracked_minutes": 0, "billable_minutes": 0},
+    "tasks": {"status": "todo", "priority": "medium", "tracked_minutes": 0, "billable_minutes": 0},
+    "time_entries": {"is_billable": True},
+    "team_members": {"is_active": True},
+    "notifications": {"is_read": False, "is_archived": False},
+    "client_files": {"uploaded_at": _now},
+    "time_entry_files": {"uploaded_at": _now},
+}
+
+
+@dataclass
+class QueryResult:
+    data: Any
+    count: Optional[int] = None
+
+
+@dataclass
+class Embed:
+    name: str
+    resource: str
+    inner: bool
+    selection: "Selection"
+
+
+@dataclass
+class Selection:
+    columns: List[Tuple[str, str]] = field(default_factory=list)  # (output name, column)
+    star: bool = False
+    embeds: List[Embed] = field(default_factory=list)
+
+
+def _split_top_level(text: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current.append(char)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+@lru_cache(maxsize=512)
+def parse_select(text: str) -> Selection:
+    """Parse a PostgREST select string such as ``*, tasks!inner(title, projects(name))``"""
+    selection = Selection()
+    for item in _split_top_level(text or "*"):
+        if "(" in item:
+            head, inner = item.split("(", 1)
+            alias = None
+            if ":" in head:
+                alias, head = head.split(":", 1)
+            hint = None
+            if "!" in head:
+                head, hint = head.split("!", 1)
+            selection.embeds.append(Embed(
+                name=(alias or head).strip(),
+                resource=head.strip(),
+                inner=hint == "inner",
+                selection=parse_select(inner.rsplit(")", 1)[0])
+            ))
+        elif item == "*":
+            selection.star = True
+        else:
+            alias, _, column = item.rpartition(":")
+            selection.columns.append((alias or column, column))
+    return selection
+
+
+def _split_conditions(text: str) -> List[str]:
+    """Split a PostgREST logic tree on top-level commas, respecting quoted values"""
+    parts, depth, current, quoted, escaped = [], 0, [], False, False
+    for char in text:
+        if escaped:
+            escaped = False
+        elif char == "\\" and quoted:
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif not quoted:
+            if char == "," and depth == 0:
+                parts.append("".join(current))
+                current = []
+                continue
+            depth += char == "("
+            depth -= char == ")"
+        current.append(char)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    return value
+
+
+@lru_cache(maxsize=512)
+def parse_logic_tree(text: str, operator: str = "or") -> Tuple:
+    """Parse the conditions of ``or=(a.gt.1,and(b.eq.2,c.is.null))`` into a tree.
+
+    Nodes are ("and" | "or", negated, children) or ("cond", negated, column, op, value).
+    """
+    children = []
+    for item in _split_conditions(text):
+        negated = item.startswith("not.")
+        if negated:
+            item = item[len("not."):]
+        if item.startswith(("and(", "or(")):
+            name, inner = item.split("(", 1)
+            child = parse_logic_tree(inner.rsplit(")", 1)[0], name)
+            children.append((name, negated, child[2]))
+            continue
+        column, op, value = item.split(".", 2)
+        if op == "not":
+            negated = not negated
+            op, value = value.split(".", 1)
+        if op == "in":
+            value = [_unquote(v) for v in _split_conditions(value.strip("()"))]
+        else:
+            value = _unquote(value)
+        children.append(("cond", negated, column, op, value))
+    return (operator, False, tuple(children))
+
+
+def _jsonable(value: Any) -> Any:
+    """Store values the way they come back from PostgREST"""
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return value
+
+
+def _coerce(actual: Any, value: Any) -> Any:
+    """Convert a filter value to the type of the stored value it is compared with"""
+    value = _jsonable(value)
+    if isinstance(actual, bool):
+        return value if isinstance(value, bool) else str(value).lower() == "true"
+    if isinstance(actual, (int, float)) and isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    if isinstance(actual, str) and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+def _like(pattern: str, flags: int = 0) -> "re.Pattern":
+    regex = "".join(".*" if c in "%*" else "." if c == "_" else re.escape(c) for c in pattern)
+    return re.compile(regex, flags | re.S)
+
+
+def _matches_tree(row: Dict[str, Any], node: Tuple) -> bool:
+    if node[0] == "cond":
+        _, negated, column, op, value = node
+        return _matches(row, column, op, value) != negated
+    kind, negated, children = node
+    combine = any if kind == "or" else all
+    return combine(_matches_tree(row, child) for child in children) != negated
+
+
+def _matches(row: Dict[str, Any], column: str, op: str, value: Any) -> bool:
+    if op == "or":
+        return _matches_tree(row, value)
+    actual = row.get(column)
+    if op == "is":
+        if value is None or str(value).lower() == "null":
+            return actual is None
+        return actual is _coerce(True, value)
+    if actual is None:
+        # Comparisons with NULL are never true in SQL
+        return False
+    if op == "in":
+        return any(actual == _coerce(actual, v) for v in value)
+    if op in ("like", "ilike"):
+        return bool(_like(value, re.I if op == "ilike" else 0).fullmatch(str(actual)))
+    expected = _coerce(actual, value)
+    try:
+        if op == "eq":
+            return actual == expected
+        if op == "neq":
+            return actual != expected
+        if op == "gt":
+            return actual > expected
+        if op == "gte":
+            return actual >= expected
+        if op == "lt":
+            return actual < expected
+        if op == "lte":
+            return actual <= expected
+    except TypeError:
+        return False
+    raise APIError({"code": "PGRST100", "message": f"Unsupported operator: {op}"})
+
+
+def _is_indexable(column: str) -> bool:
+    return column == "id" or column.endswith("_id") or column in ("email", "assigned_to")
+
+
+class MemoryQuery:
+    """Query builder with the postgrest-py interface used by DatabaseService"""
+
+    def __init__(self, engine: "MemoryBackend", table: str):
+        self.engine = engine
+        self.table = table
+        self.path = f"/{table}"
+        self.http_method = "GET"
+        self.select_text = "*"
+        self.filters: List[Tuple[Tuple[str, ...], str, str, Any]] = []
+        self.orders: Dict[Tuple[str, ...], List[Tuple[str, bool, bool]]] = defaultdict(list)
+        self.limits: Dict[Tuple[str, ...], int] = {}
+        self.offset = 0
+        self.payload: Any = None
+        self.returning = "representation"
+        self.upsert_rows = False
+        self.count: Optional[str] = None
+
+    # Statements
+    def select(self, *columns: str, count: Optional[str] = None) -> "MemoryQuery":
+        self.select_text = ",".join(columns) or "*"
+        self.count = count
+        return self
+
+    def insert(self, json: Any, *, count: Optional[str] = None, returning: str = "representation",
+               upsert: bool = False) -> "MemoryQuery":
+        self.http_method = "POST"
+        self.payload = json if isinstance(json, list) else [json]
+        self.returning = returning
+        self.upsert_rows = upsert
+        self.count = count
+        return self
+
+    def upsert(self, json: Any, *, count: Optional[str] = None, returning: str = "representation",
+               ignore_duplicates: bool = False, on_conflict: str = "") -> "MemoryQuery":
+        return self.insert(json, count=count, returning=returning, upsert=True)
+
+    def update(self, json: Dict[str, Any], *, count: Optional[str] = None,
+               returning: str = "representation") -> "MemoryQuery":
+        self.http_method = "PATCH"
+        self.payload = json
+        self.returning = returning
+        self.count = count
+        return self
+
+    def delete(self, *, count: Optional[str] = None, returning: str = "representation") -> "MemoryQuery":
+        self.http_method = "DELETE"
+        self.returning = returning
+        self.count = count
+        return self
+
+    # Filters
+    def _filter(self, column: str, op: str, value: Any) -> "MemoryQuery":
+        *path, name = column.split(".")
+        self.filters.append((tuple(path), name, op, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "lte", value)
+
+    def is_(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "is", value)
+
+    def like(self, column: str, pattern: str) -> "MemoryQuery":
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "MemoryQuery":
+        return self._filter(column, "ilike", pattern)
+
+    def in_(self, column: str, values: Any) -> "MemoryQuery":
+        return self._filter(column, "in", list(values))
+
+    def or_(self, filters: str, *, reference_table: Optional[str] = None) -> "MemoryQuery":
+        path = tuple(reference_table.split(".")) if reference_table else ()
+        self.filters.append((path, "", "or", parse_logic_tree(filters)))
+        return self
+
+    # Modifiers
+    def order(self, column: str, *, desc: bool = False, nullsfirst: bool = False,
+              foreign_table: Optional[str] = None) -> "MemoryQuery":
+        path = tuple(foreign_table.split(".")) if foreign_table else ()
+        self.orders[path].append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None) -> "MemoryQuery":
+        path = tuple(foreign_table.split(".")) if foreign_table else ()
+        self.limits[path] = size
+        return self
+
+    def range(self, start: int, end: int) -> "MemoryQuery":
+        self.offset = start
+        self.limits[()] = end - start + 1
+        return self
+
+    def execute(self) -> QueryResult:
+        return self.engine.run(self)
+
+    def cache_key(self) -> str:
+        return repr((self.table, self.select_text, self.filters, sorted(self.orders.items()),
+                     sorted(self.limits.items()), self.offset, self.count))
+
+
+class MemoryRPC:
+    def __init__(self, engine: "MemoryBackend", fn: str, params: Dict[str, Any]):
+        self.engine = engine
+        self.fn = fn
+        self.params = params
+        self.table = f"rpc/{fn}"
+        self.path = f"/rpc/{fn}"
+        self.http_method = "POST"
+        self.filters: List[Tuple[Tuple[str, ...], str, str, Any]] = []
+
+    def execute(self) -> QueryResult:
+        function = self.engine.functions.get(self.fn)
+        if function is None:
+            raise APIError({"code": "PGRST202", "message": f"Could not find the function public.{self.fn}"})
+        return QueryResult(data=function(**_jsonable(self.params)))
+
+
+class MemoryBackend(Backend):
+    """In-process engine implementing the PostgREST subset DatabaseService uses.
+
+    Embedded resources are resolved through FOREIGN_KEYS the same way
+    PostgREST resolves them, including ``!inner`` joins and filters, ordering
+    and limits on embedded resources. Queries run synchronously on the event
+    loop, so every query is atomic and results are deterministic.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self._indexes: Dict[Tuple[str, str], Dict[Any, Dict[str, Dict[str, Any]]]] = {}
+        self.functions: Dict[str, Callable[..., Any]] = {
+            "apply_time_entry_deltas": self._apply_time_entry_deltas,
+            "reconcile_time_counters": self._reconcile_time_counters,
+        }
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def rpc(self, fn: str, params: Dict[str, Any]) -> MemoryRPC:
+        return MemoryRPC(self, fn, params)
+
+    async def execute(self, query: Any) -> QueryResult:
+        return query.execute()
+
+    def load(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Seed a table, e.g. with benchmark fixtures"""
+        self._insert(table, rows, upsert=True)
+
+    # Indexes
+    def _index(self, table: str, column: str) -> Dict[Any, Dict[str, Dict[str, Any]]]:
+        key = (table, column)
+        index = self._indexes.get(key)
+        if index is None:
+            index = defaultdict(dict)
+            for row_id, row in self.tables[table].items():
+                index[row.get(column)][row_id] = row
+            self._indexes[key] = index
+        return index
+
+    def _index_add(self, table: str, row: Dict[str, Any]) -> None:
+        for (indexed_table, column), index in self._indexes.items():
+            if indexed_table == table:
+                index[row.get(column)][row["id"]] = row
+
+    def _index_remove(self, table: str, row: Dict[str, Any]) -> None:
+        for (indexed_table, column), index in self._indexes.items():
+            if indexed_table == table:
+                index.get(row.get(column), {}).pop(row["id"], None)
+
+    # Reads
+    def _relationship(self, source: str, target: str) -> Tuple[str, str]:
+        for column, referenced in FOREIGN_KEYS.get(source, {}).items():
+            if referenced == target:
+                return "one", column
+        for column, referenced in FOREIGN_KEYS.get(target, {}).items():
+            if referenced == source:
+                return "many", column
+        raise APIError({
+            "code": "PGRST200",
+            "message": f"Could not find a relationship between '{source}' and '{target}' in the schema cache"
+        })
+
+    def _candidates(self, table: str, filters: List[Tuple[str, str, Any]]) -> List[Dict[str, Any]]:
+        for column, op, value in filters:
+            if not _is_indexable(column):
+                continue
+            if op == "eq" and isinstance(value, (str, uuid.UUID)):
+                if column == "id":
+                    row = self.tables[table].get(str(value))
+                    return [row] if row else []
+                return list(self._index(table, column).get(str(value), {}).values())
+            if op == "in" and all(isinstance(v, (str, uuid.UUID)) for v in value):
+                index = self._index(table, column)
+                rows: Dict[str, Dict[str, Any]] = {}
+                for v in value:
+                    rows.update(index.get(str(v), {}))
+                return list(rows.values())
+        return list(self.tables[table].values())
+
+    def _filter_rows(self, table: str, filters: List[Tuple[str, str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            row for row in self._candidates(table, filters)
+            if all(_matches(row, column, op, value) for column, op, value in filters)
+        ]
+
+    @staticmethod
+    def _sort(rows: List[Dict[str, Any]], orders: List[Tuple[str, bool, bool]]) -> List[Dict[str, Any]]:
+        for column, desc, nullsfirst in reversed(orders):
+            present = sorted((r for r in rows if r.get(column) is not None), key=lambda r: r[column], reverse=desc)
+            missing = [r for r in rows if r.get(column) is None]
+            # PostgreSQL puts NULLs last when ascending and first when descending
+            rows = missing + present if desc or nullsfirst else present + missing
+        return rows
+
+    def _project(self, table: str, row: Dict[str, Any], selection: Selection, query: MemoryQuery,
+                 path: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """Shape one row per the selection, returns None if an inner embed excludes it"""
+        result = dict(row) if selection.star else {}
+        for name, column in selection.columns:
+            result[name] = row.get(column)
+        for embed in selection.embeds:
+            embed_path = path + (embed.name,)
+            kind, column = self._relationship(table, embed.resource)
+            filters = [(c, op, v) for p, c, op, v in query.filters if p == embed_path]
+            if kind == "one":
+                target = self.tables[embed.resource].get(row.get(column)) if row.get(column) else None
+                if target is not None and all(_matches(target, c, op, v) for c, op, v in filters):
+                    value = self._project(embed.resource, target, embed.selection, query, embed_path)
+                else:
+                    value = None
+                if value is None and embed.inner:
+                    return None
+            else:
+                children = self._index(embed.resource, column).get(row["id"], {}).values()
+                children = [c for c in children if all(_matches(c, col, op, v) for col, op, v in filters)]
+                if embed_path in query.orders:
+                    children = self._sort(children, query.orders[embed_path])
+                projected = []
+                for child in children:
+                    shaped = self._project(embed.resource, child, embed.selection, query, embed_path)
+                    if shaped is not None:
+                        projected.append(shaped)
+                if embed_path in query.limits:
+                    projected = projected[:query.limits[embed_path]]
+                if not projected and embed.inner:
+                    return None
+                value = projected
+            result[embed.name] = value
+        return result
+
+    def _select(self, query: MemoryQuery) -> QueryResult:
+        selection = parse_select(query.select_text)
+        embed_names = {e.name for e in selection.embeds}
+        for path, _, _, _ in query.filters:
+            if path and path[0] not in embed_names:
+                raise APIError({
+                    "code": "PGRST108",
+                    "message": f"'{path[0]}' is not an embedded resource in this request"
+                })
+        root_filters = [(c, op, v) for p, c, op, v in query.filters if not p]
+        rows = self._sort(self._filter_rows(query.table, root_filters), query.orders.get((), []))
+
+        has_inner = any(e.inner for e in selection.embeds)
+        limit = query.limits.get(())
+        if not has_inner and query.count is None:
+            stop = query.offset + limit if limit is not None else None
+            rows = rows[query.offset:stop]
+        shaped = []
+        for row in rows:
+            result = self._project(query.table, row, selection, query, ())
+            if result is not None:
+                shaped.append(result)
+        count = len(shaped) if query.count else None
+        if has_inner or query.count is not None:
+            stop = query.offset + limit if limit is not None else None
+            shaped = shaped[query.offset:stop]
+        return QueryResult(data=shaped, count=count)
+
+    # Writes
+    def _insert(self, table: str, rows: List[Dict[str, Any]], upsert: bool) -> List[Dict[str, Any]]:
+        written = []
+        store = self.tables[table]
+        now = _now()
+        for row in rows:
+            row = _jsonable(row)
+            if "id" in row:
+                row["id"] = str(row["id"])
+            existing = store.get(row.get("id")) if row.get("id") else None
+            if existing is not None:
+                if not upsert:
+                    raise APIError({
+                        "code": "23505",
+                        "message": f'duplicate key value violates unique constraint "{table}_pkey"'
+                    })
+                self._index_remove(table, existing)
+                existing.update(row)
+                self._index_add(table, existing)
+                written.append(existing)
+                continue
+            record = {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now}
+            for column, default in TABLE_DEFAULTS.get(table, {}).items():
+                record[column] = default() if callable(default) else default
+            record.update(row)
+            store[record["id"]] = record
+            self._index_add(table, record)
+            written.append(record)
+        return written
+
+    def _check_references(self, table: str, row: Dict[str, Any]) -> None:
+        for referencing, columns in FOREIGN_KEYS.items():
+            for column, referenced in columns.items():
+                if referenced == table and self._index(referencing, column).get(row["id"]):
+                    raise APIError({
+                        "code": "23503",
+                        "message": f'update or delete on table "{table}" violates foreign key constraint '
+                                   f'"{referencing}_{column}_fkey" on table "{referencing}"'
+                    })
+
+    def run(self, query: MemoryQuery) -> QueryResult:
+        if query.http_method == "GET":
+            return self._select(query)
+
+        if query.http_method == "POST":
+            rows = self._insert(query.table, query.payload, query.upsert_rows)
+            self._bump_versions(query.table, rows)
+        else:
+            filters = [(c, op, v) for p, c, op, v in query.filters if not p]
+            rows = self._filter_rows(query.table, filters)
+            if query.http_method == "PATCH":
+                # Rows moved to another owner change the collections of both
+                self._bump_versions(query.table, rows)
+                changes = _jsonable(query.payload)
+                for row in rows:
+                    self._index_remove(query.table, row)
+                    row.update(changes)
+                    self._touch(query.table, row)
+                    self._index_add(query.table, row)
+            else:
+                for row in rows:
+                    self._check_references(query.table, row)
+                for row in rows:
+                    self._index_remove(query.table, row)
+                    del self.tables[query.table][row["id"]]
+                    self._record_deletion(query.table, row)
+            self._bump_versions(query.table, rows)
+
+        if query.returning == "minimal":
+            return QueryResult(data=[], count=len(rows) if query.count else None)
+        return QueryResult(data=[dict(row) for row in rows], count=len(rows) if query.count else None)
+
+    # Triggers from app/database/schema.sql
+    def _touch(self, table: str, row: Dict[str, Any]) -> None:
+        if table in SYNCED_TABLES:
+            row["updated_at"] = _now()
+
+    def _owner(self, owner: Any, row: Dict[str, Any]) -> Optional[str]:
+        """user_id of a row, from its own column or from the parent row (foreign key, table)"""
+        if isinstance(owner, tuple):
+            column, parent_table = owner
+            parent = self.tables[parent_table].get(row.get(column))
+            return parent.get("user_id") if parent else None
+        return row.get(owner)
+
+    def _record_deletion(self, table: str, row: Dict[str, Any]) -> None:
+        owner = SYNCED_TABLES.get(table)
+        if owner is None:
+            return
+        user_id = self._owner(owner, row)
+        if user_id is not None:
+            self._insert("deleted_records", [{
+                "table_name": table, "record_id": row["id"], "user_id": user_id, "deleted_at": _now()
+            }], upsert=False)
+
+    def _bump_versions(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        owner = VERSIONED_TABLES.get(table)
+        if owner is None:
+            return
+        for user_id in {self._owner(owner, row) for row in rows} - {None}:
+            self._bump("collection_versions", {"table_name": table, "user_id": user_id})
+        if table == "time_entries":
+            for user_id, day in {(row.get("user_id"), row.get("date")) for row in rows}:
+                if user_id is not None and day is not None:
+                    self._bump("time_entry_day_versions", {"user_id": user_id, "day": str(day)[:10]})
+
+    def _bump(self, table: str, key: Dict[str, Any]) -> None:
+        """Insert a version row for the key columns, or add one to its version"""
+        row_id = ":".join(map(str, key.values()))
+        existing = self.tables[table].get(row_id)
+        version = existing["version"] + 1 if existing else 1
+        self._insert(table, [{"id": row_id, **key, "version": version}], upsert=True)
+
+    # Stored functions from app/database/schema.sql
+    def _apply_time_entry_deltas(self, deltas: List[Dict[str, Any]]) -> None:
+        for delta in deltas:
+            task = self.tables["tasks"].get(delta["task_id"])
+            if task is None:
+                continue
+            project = self.tables["projects"].get(task["project_id"])
+            for table, row in (("tasks", task), ("projects", project)):
+                if row is None:
+                    continue
+                row["tracked_minutes"] = (row.get("tracked_minutes") or 0) + delta["minutes"]
+                row["billable_minutes"] = (row.get("billable_minutes") or 0) + delta["billable_minutes"]
+                self._touch(table, row)
+                self._bump_versions(table, [row])
+
+    def _reconcile_time_counters(self) -> int:
+        totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+        for entry in self.tables["time_entries"].values():
+            total = totals[entry["task_id"]]
+            total[0] += float(entry.get("duration") or 0)
+            if entry.get("is_billable", True):
+                total[1] += float(entry.get("duration") or 0)
+        project_totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+        repaired = 0
+        for task in self.tables["tasks"].values():
+            minutes, billable = totals[task["id"]] if task["id"] in totals else (0.0, 0.0)
+            if (task.get("tracked_minutes"), task.get("billable_minutes")) != (minutes, billable):
+                task["tracked_minutes"], task["billable_minutes"] = minutes, billable
+                self._touch("tasks", task)
+                self._bump_versions("tasks", [task])
+                repaired += 1
+            project_totals[task["project_id"]][0] += minutes
+            project_totals[task["project_id"]][1] += billable
+        for project in self.tables["projects"].values():
+            minutes, billable = project_totals[project["id"]] if project["id"] in project_totals else (0.0, 0.0)
+            if (project.get("tracked_minutes"), project.get("billable_minutes")) != (minutes, billable):
+                project["tracked_minutes"], project["billable_minutes"] = minutes, billable
+                self._touch("projects", project)
+                self._bump_versions("projects", [project])
+                repaired += 1
+        return repaired
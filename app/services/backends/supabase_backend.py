@@ -0,0 +1,26 @@
+from typing import Any, Dict
+from fastapi.concurrency import run_in_threadpool
+from supabase import create_client, Client
+from .base import Backend
+
+
+class SupabaseBackend(Backend):
+    """Supabase/PostgREST over HTTP"""
+
+    name = "supabase"
+
+    def __init__(self, url: str, key: str):
+        self.client: Client = create_client(url, key)
+        # File routes set the user's session on the storage client for RLS,
+        # so it must not be shared with the data client
+        self.storage: Client = create_client(url, key)
+
+    def table(self, name: str) -> Any:
+        return self.client.table(name)
+
+    def rpc(self, fn: str, params: Dict[str, Any]) -> Any:
+        return self.client.rpc(fn, params)
+
+    async def execute(self, query: Any) -> Any:
+        # The supabase client is synchronous, run it off the event loop
+        return await run_in_threadpool(query.execute)
@@ -0,0 +1,13 @@
+from typing import Sequence
+from .database import db
+
+
+async def collection_token(user_id: str, tables: Sequence[str]) -> str:
+    """Changes whenever one of the tables changes for the user.
+
+    Built from the collection_versions table, whose triggers bump the version
+    of the user owning every written row. Writes made by other API processes,
+    or outside the API, change it too. Reading it is one query.
+    """
+    versions = await db.get_collection_versions(user_id, tables)
+    return f"{user_id}:" + ",".join(f"{table}.{versions.get(table, 0)}" for table in tables)
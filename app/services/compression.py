@@ -0,0 +1,132 @@
+import gzip
+from typing import Dict, Optional
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is in requirements.txt, gzip covers installs without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Bodies above this size are compressed in the threadpool to keep the event loop free
+THREADPOOL_MIN_SIZE = 64 * 1024
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    """Quality of every coding listed in an Accept-Encoding header"""
+    offered = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        offered[coding] = quality
+    return offered
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, preferring br on equal quality"""
+    offered = parse_accept_encoding(accept_encoding)
+    candidates = [c for c in ("br", "gzip") if (c != "br" or brotli is not None)]
+    best = None
+    for coding in candidates:
+        quality = offered.get(coding, offered.get("*", 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (coding, quality)
+    return best[0] if best else None
+
+
+def identity_refused(accept_encoding: str) -> bool:
+    """Whether the client asked for no uncompressed bodies, with identity;q=0 or *;q=0"""
+    offered = parse_accept_encoding(accept_encoding)
+    return offered.get("identity", offered.get("*", 1.0)) == 0
+
+
+def compress(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+class CompressionMiddleware:
+    """Compresses JSON and text responses above minimum_size with br or gzip.
+
+    Only complete (non-streamed) bodies are compressed, so streamed responses
+    like the NDJSON import progress keep flushing line by line. Strong ETags
+    become weak because the bytes on the wire no longer match the hashed body.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 4, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        accept_encoding = headers.get(b"accept-encoding", b"").decode("latin-1")
+        encoding = negotiate_encoding(accept_encoding)
+        # Clients refusing identity get even small bodies compressed
+        minimum_size = 0 if identity_refused(accept_encoding) else self.minimum_size
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(raw=message["headers"])
+                if (
+                    response_headers.get("content-encoding")
+                    or not response_headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                # The body depends on Accept-Encoding whether or not this one is compressed
+                response_headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= THREADPOOL_MIN_SIZE:
+                compressed = await run_in_threadpool(compress, body, encoding, self.gzip_level, self.brotli_quality)
+            else:
+                compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            response_headers = MutableHeaders(raw=start_message["headers"])
+            response_headers["content-encoding"] = encoding
+            response_headers["content-length"] = str(len(compressed))
+            etag = response_headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                response_headers["etag"] = f"W/{etag}"
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
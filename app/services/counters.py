@@ -0,0 +1,18 @@
+import asyncio
+from .database import db
+
+
+async def run_counter_reconciliation(interval: int) -> None:
+    """Periodically repair drift in the tracked/billable minute counters.
+
+    The counters are updated incrementally by DatabaseService, so a write that
+    fails halfway or races with this job can leave them off until the next run.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            repaired = await db.reconcile_time_counters()
+            if repaired:
+                print(f"Reconciled time counters on {repaired} rows")
+        except Exception as e:
+            print("Error reconciling time counters:", e)
@@ -1,26 +1,95 @@
-from supabase import create_client, Client
+from postgrest.types import ReturnMethod
 from ..config import settings
-from typing import Optional, List, Dict, Any
+from .backends import Backend, create_backend, or_filter, query_key
+from .includes import IncludeTree, include_select, limit_includes
+from .pagination import Page
+from .request_cache import current_request_cache
+from .tracing import trace_methods
+from typing import Optional, List, Dict, Any, Callable, Sequence, Tuple
 import datetime
+import time
 import uuid
 
-supabase_storage: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+# Called with (query, seconds, error) after every backend call
+QueryHook = Callable[[Any, float, Optional[BaseException]], None]
+
+def sparse_select(columns: Optional[Sequence[str]], default: str = "*", embeds: Optional[Dict[str, str]] = None) -> str:
+    """select() for a sparse fieldset, fields built from an embed select that embed instead"""
+    if not columns:
+        return default
+    embeds = embeds or {}
+    parts = []
+    for column in columns:
+        part = embeds.get(column, column)
+        if part not in parts:
+            parts.append(part)
+    return ", ".join(parts)
 
 class DatabaseService:
-    def __init__(self):
-        self.supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    def __init__(self, backend: Optional[Backend] = None):
+        self.backend: Backend = backend or create_backend(settings.DATABASE_BACKEND)
+        self.query_hooks: List[QueryHook] = []
+
+    def add_query_hook(self, hook: QueryHook) -> None:
+        self.query_hooks.append(hook)
+
+    async def _execute(self, query):
+        """Run a query built from self.backend, sharing reads through the active request cache"""
+        cache = current_request_cache.get()
+        if cache is None:
+            return await self._run(query)
+        key = query_key(query)
+        if key is not None:
+            return await cache.read(key, lambda: self._run(query))
+        try:
+            return await self._run(query)
+        finally:
+            cache.invalidate()
+
+    async def _run(self, query):
+        if not self.query_hooks:
+            return await self.backend.execute(query)
+        error = None
+        start = time.perf_counter()
+        try:
+            return await self.backend.execute(query)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            for hook in self.query_hooks:
+                hook(query, elapsed, error)
 
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("users").select("*").eq("email", email).execute()
+        response = await self._execute(self.backend.table("users").select("*").eq("email", email))
         return response.data[0] if response.data else None
 
     async def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("users").insert(user_data).execute()
+        response = await self._execute(self.backend.table("users").insert(user_data))
         return response.data[0]
 
-    async def get_projects(self, user_id: str) -> List[Dict[str, Any]]:
+    async def get_projects(
+        self,
+        user_id: str,
+        columns: Optional[Sequence[str]] = None,
+        status: Optional[str] = None,
+        client_id: Optional[str] = None,
+        page: Optional[Page] = None,
+        updated_since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """Get all projects for a user, including client name"""
-        response = self.supabase.table("projects").select("*, clients(name)").eq("user_id", user_id).execute()
+        select = sparse_select(columns, "*, clients(name)", {"client_name": "clients(name)"})
+        query = self.backend.table("projects").select(select).eq("user_id", user_id)
+        if updated_since:
+            query = query.gt("updated_at", updated_since)
+        if status:
+            query = query.eq("status", status)
+        if client_id:
+            query = query.eq("client_id", client_id)
+        if page:
+            query = page.apply(query)
+        response = await self._execute(query)
         projects = response.data
         for project in projects:
             project["client_name"] = project["clients"]["name"] if project.get("clients") else ""
@@ -28,9 +97,10 @@ class DatabaseService:
                 del project["clients"]
         return projects
 
-    async def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
-        """Get a specific project by ID"""
-        response = self.supabase.table("projects").select("*").eq("id", project_id).execute()
+    async def get_project(self, project_id: str, include: Optional[IncludeTree] = None) -> Optional[Dict[str, Any]]:
+        """Get a specific project by ID, embedding the include= tree"""
+        query = self.backend.table("projects").select(include_select("projects", include)).eq("id", project_id)
+        response = await self._execute(limit_includes(query, "projects", include))
         return response.data[0] if response.data else None
 
     async def create_project(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -42,30 +112,70 @@ class DatabaseService:
         for key in ['start_date', 'end_date', 'created_at', 'updated_at']:
             if key in data and isinstance(data[key], datetime.datetime):
                 data[key] = data[key].isoformat()
-        response = self.supabase.table("projects").insert(data).execute()
+        response = await self._execute(self.backend.table("projects").insert(data))
         return response.data[0]
 
     async def update_project(self, project_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a project"""
         data = self.to_serializable(data)
-        response = self.supabase.table("projects").update(data).eq("id", project_id).execute()
+        response = await self._execute(self.backend.table("projects").update(data).eq("id", project_id))
         return response.data[0]
 
     async def delete_project(self, project_id: str) -> bool:
         """Delete a project"""
-        response = self.supabase.table("projects").delete().eq("id", project_id).execute()
+        response = await self._execute(self.backend.table("projects").delete().eq("id", project_id))
         return bool(response.data)
 
-    async def get_project_tasks(self, project_id: str) -> List[Dict[str, Any]]:
-        """Get all tasks for a project"""
-        response = self.supabase.table("tasks").select("*").eq("project_id", project_id).execute()
+    async def get_project_tasks(
+        self,
+        project_id: str,
+        columns: Optional[Sequence[str]] = None,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        assigned_to: Optional[str] = None,
+        due_from: Optional[str] = None,
+        due_before: Optional[str] = None,
+        page: Optional[Page] = None
+    ) -> List[Dict[str, Any]]:
+        """Get all tasks for a project, due_before is exclusive"""
+        query = self.backend.table("tasks").select(sparse_select(columns)).eq("project_id", project_id)
+        if status:
+            query = query.eq("status", status)
+        if priority:
+            query = query.eq("priority", priority)
+        if assigned_to:
+            query = query.eq("assigned_to", assigned_to)
+        if due_from:
+            query = query.gte("due_date", due_from)
+        if due_before:
+            query = query.lt("due_date", due_before)
+        if page:
+            query = page.apply(query)
+        response = await self._execute(query)
         return response.data
 
+    async def get_project_recent_time_entries(self, project_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Get the latest time entries of a project, including the task title"""
+        response = await self._execute(self.backend.table("time_entries").select(
+            "id, task_id, user_id, description, start_time, end_time, duration, tasks!inner(title, project_id)"
+        ).eq("tasks.project_id", project_id).order("start_time", desc=True).limit(limit))
+        entries = response.data
+        for entry in entries:
+            entry["task_title"] = (entry.pop("tasks", None) or {}).get("title")
+        return entries
+
     async def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific task by ID"""
-        response = self.supabase.table("tasks").select("*").eq("id", task_id).execute()
+        response = await self._execute(self.backend.table("tasks").select("*").eq("id", task_id))
         return response.data[0] if response.data else None
 
+    async def get_tasks_with_owner(self, task_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get tasks by ID along with the user_id of the owning project"""
+        if not task_ids:
+            return []
+        response = await self._execute(self.backend.table("tasks").select("id, project_id, projects(user_id)").in_("id", task_ids))
+        return response.data
+
     async def create_task(self, project_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new task"""
         task_data = {**data, "project_id": project_id}
@@ -75,163 +185,310 @@ class DatabaseService:
         for key in ['due_date', 'created_at', 'updated_at']:
             if key in task_data and isinstance(task_data[key], datetime.datetime):
                 task_data[key] = task_data[key].isoformat()
-        response = self.supabase.table("tasks").insert(task_data).execute()
+        response = await self._execute(self.backend.table("tasks").insert(task_data))
         return response.data[0]
 
     async def update_task(self, task_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a task"""
         data = self.to_serializable(data)
-        response = self.supabase.table("tasks").update(data).eq("id", task_id).execute()
+        response = await self._execute(self.backend.table("tasks").update(data).eq("id", task_id))
         return response.data[0]
 
     async def delete_task(self, task_id: str) -> bool:
         """Delete a task"""
-        response = self.supabase.table("tasks").delete().eq("id", task_id).execute()
+        response = await self._execute(self.backend.table("tasks").delete().eq("id", task_id))
         return bool(response.data)
 
-    async def get_task_time_entries(self, task_id: str) -> List[Dict[str, Any]]:
+    async def get_user_tasks(self, user_id: str, updated_since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the tasks of all of a user's projects"""
+        query = self.backend.table("tasks").select("*, projects!inner(user_id)").eq("projects.user_id", user_id)
+        if updated_since:
+            query = query.gt("updated_at", updated_since)
+        response = await self._execute(query)
+        tasks = response.data
+        for task in tasks:
+            del task["projects"]
+        return tasks
+
+    async def get_task_time_entries(self, task_id: str, columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
         """Get all time entries for a task, including their files"""
-        response = self.supabase.table("time_entries").select(
-            "*, tasks(*), time_entry_files(*)"
-        ).eq("task_id", task_id).execute()
+        response = await self._execute(self.backend.table("time_entries").select(
+            sparse_select(columns, "*, tasks(*), time_entry_files(*)", {"task": "task:tasks(*)"})
+        ).eq("task_id", task_id))
         return response.data
 
+    async def get_user_time_entries(self, user_id: str, start: str, end: str) -> List[Dict[str, Any]]:
+        """Get a user's time entries starting in [start, end), with task and project labels"""
+        response = await self._execute(self.backend.table("time_entries").select(
+            "id, task_id, user_id, description, start_time, end_time, duration, created_at, updated_at, "
+            "tasks(title, project_id, projects(name))"
+        ).eq("user_id", user_id).gte("start_time", start).lt("start_time", end).order("start_time"))
+        entries = response.data
+        for entry in entries:
+            task = entry.pop("tasks", None) or {}
+            entry["task_title"] = task.get("title")
+            entry["project_id"] = task.get("project_id")
+            entry["project_name"] = (task.get("projects") or {}).get("name")
+        return entries
+
     async def create_time_entry(self, task_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new time entry"""
         time_entry_data = {**data, "task_id": task_id}
         time_entry_data = self.to_serializable(time_entry_data)
-        response = self.supabase.table("time_entries").insert(time_entry_data).execute()
+        response = await self._execute(self.backend.table("time_entries").insert(time_entry_data))
+        await self._apply_time_entry_deltas([self._time_entry_delta(response.data[0])])
         return response.data[0]
 
+    async def create_time_entries(self, entries: List[Dict[str, Any]]) -> int:
+        """Bulk insert time entries without returning the inserted rows"""
+        entries = self.to_serializable(entries)
+        await self._execute(self.backend.table("time_entries").insert(entries, returning=ReturnMethod.minimal))
+        await self._apply_time_entry_deltas([self._time_entry_delta(entry) for entry in entries])
+        return len(entries)
+
+    async def upsert_time_entries(self, entries: List[Dict[str, Any]], return_rows: bool = False) -> List[Dict[str, Any]]:
+        """Insert or update time entries by ID in a single request"""
+        entries = self.to_serializable(entries)
+        existing = await self._execute(self.backend.table("time_entries").select(
+            "id, task_id, duration, is_billable"
+        ).in_("id", [entry["id"] for entry in entries]))
+        returning = ReturnMethod.representation if return_rows else ReturnMethod.minimal
+        response = await self._execute(self.backend.table("time_entries").upsert(entries, returning=returning))
+        # Columns an upsert leaves out, is_billable in particular, keep their stored values
+        previous = {old["id"]: old for old in existing.data}
+        await self._apply_time_entry_deltas(
+            [self._time_entry_delta(old, sign=-1) for old in existing.data] +
+            [self._time_entry_delta({**previous.get(entry["id"], {}), **entry}) for entry in entries]
+        )
+        return response.data
+
     async def update_time_entry(self, time_entry_id: str, time_entry_data: Dict[str, Any]) -> Dict[str, Any]:
         time_entry_data = self.to_serializable(time_entry_data)
-        response = self.supabase.table("time_entries").update(time_entry_data).eq("id", time_entry_id).execute()
+        existing = await self._execute(self.backend.table("time_entries").select(
+            "id, task_id, duration, is_billable"
+        ).eq("id", time_entry_id))
+        response = await self._execute(self.backend.table("time_entries").update(time_entry_data).eq("id", time_entry_id))
+        await self._apply_time_entry_deltas(
+            [self._time_entry_delta(old, sign=-1) for old in existing.data] +
+            [self._time_entry_delta(new) for new in response.data]
+        )
         return response.data[0]
 
     async def delete_time_entry(self, time_entry_id: str) -> None:
-        self.supabase.table("time_entries").delete().eq("id", time_entry_id).execute()
+        response = await self._execute(self.backend.table("time_entries").delete().eq("id", time_entry_id))
+        await self._apply_time_entry_deltas([self._time_entry_delta(old, sign=-1) for old in response.data])
+
+    @staticmethod
+    def _time_entry_delta(entry: Dict[str, Any], sign: int = 1) -> Dict[str, Any]:
+        minutes = float(entry.get("duration") or 0) * sign
+        return {
+            "task_id": entry["task_id"],
+            "minutes": minutes,
+            # is_billable defaults to true in the time_entries table
+            "billable_minutes": minutes if entry.get("is_billable", True) else 0.0
+        }
+
+    async def _apply_time_entry_deltas(self, deltas: List[Dict[str, Any]]) -> None:
+        """Keep tracked_minutes/billable_minutes on tasks and projects in step with time entry writes"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for delta in deltas:
+            total = totals.setdefault(delta["task_id"], {"task_id": delta["task_id"], "minutes": 0.0, "billable_minutes": 0.0})
+            total["minutes"] += delta["minutes"]
+            total["billable_minutes"] += delta["billable_minutes"]
+        changed = [t for t in totals.values() if t["minutes"] or t["billable_minutes"]]
+        if changed:
+            await self._execute(self.backend.rpc("apply_time_entry_deltas", {"deltas": changed}))
+
+    async def reconcile_time_counters(self) -> int:
+        """Recompute the time counters from time_entries, returns the number of rows repaired"""
+        response = await self._execute(self.backend.rpc("reconcile_time_counters", {}))
+        return response.data or 0
 
     async def get_time_entry(self, time_entry_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("time_entries").select("*").eq("id", time_entry_id).execute()
+        response = await self._execute(self.backend.table("time_entries").select("*").eq("id", time_entry_id))
         return response.data[0] if response.data else None
 
     async def get_category(self, category_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("categories").select("*").eq("id", category_id).execute()
+        response = await self._execute(self.backend.table("categories").select("*").eq("id", category_id))
         return response.data[0] if response.data else None
 
-    async def get_categories(self, user_id: str) -> List[Dict[str, Any]]:
-        response = self.supabase.table("categories").select("*").eq("user_id", user_id).execute()
+    async def get_categories(
+        self,
+        user_id: str,
+        columns: Optional[Sequence[str]] = None,
+        page: Optional[Page] = None,
+        updated_since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        query = self.backend.table("categories").select(sparse_select(columns)).eq("user_id", user_id)
+        if updated_since:
+            query = query.gt("updated_at", updated_since)
+        if page:
+            query = page.apply(query)
+        response = await self._execute(query)
         return response.data
 
     async def create_category(self, category_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("categories").insert(category_data).execute()
+        response = await self._execute(self.backend.table("categories").insert(category_data))
         return response.data[0]
 
     async def update_category(self, category_id: str, category_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("categories").update(category_data).eq("id", category_id).execute()
+        response = await self._execute(self.backend.table("categories").update(category_data).eq("id", category_id))
         return response.data[0]
 
     async def delete_category(self, category_id: str) -> None:
-        self.supabase.table("categories").delete().eq("id", category_id).execute()
+        await self._execute(self.backend.table("categories").delete().eq("id", category_id))
 
-    async def get_client(self, client_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("clients").select("*").eq("id", client_id).execute()
+    async def get_client(self, client_id: str, include: Optional[IncludeTree] = None) -> Optional[Dict[str, Any]]:
+        query = self.backend.table("clients").select(include_select("clients", include)).eq("id", client_id)
+        response = await self._execute(limit_includes(query, "clients", include))
         return response.data[0] if response.data else None
 
-    async def get_clients(self, user_id: str) -> List[Dict[str, Any]]:
-        response = self.supabase.table("clients").select("*").eq("user_id", user_id).execute()
+    async def get_clients(
+        self,
+        user_id: str,
+        columns: Optional[Sequence[str]] = None,
+        page: Optional[Page] = None,
+        updated_since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        query = self.backend.table("clients").select(sparse_select(columns)).eq("user_id", user_id)
+        if updated_since:
+            query = query.gt("updated_at", updated_since)
+        if page:
+            query = page.apply(query)
+        response = await self._execute(query)
         return response.data
 
     async def create_client(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("clients").insert(client_data).execute()
+        response = await self._execute(self.backend.table("clients").insert(client_data))
         return response.data[0]
 
     async def update_client(self, client_id: str, client_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("clients").update(client_data).eq("id", client_id).execute()
+        response = await self._execute(self.backend.table("clients").update(client_data).eq("id", client_id))
         return response.data[0]
 
     async def delete_client(self, client_id: str) -> None:
-        self.supabase.table("clients").delete().eq("id", client_id).execute()
+        await self._execute(self.backend.table("clients").delete().eq("id", client_id))
 
     async def get_client_projects(self, client_id: str) -> List[Dict[str, Any]]:
-        response = self.supabase.table("projects").select("*").eq("client_id", client_id).execute()
+        response = await self._execute(self.backend.table("projects").select("*").eq("client_id", client_id))
         return response.data
 
     async def get_team_member(self, team_member_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("team_members").select("*").eq("id", team_member_id).execute()
+        response = await self._execute(self.backend.table("team_members").select("*").eq("id", team_member_id))
         return response.data[0] if response.data else None
 
     async def get_project_team_members(self, project_id: str) -> List[Dict[str, Any]]:
-        response = self.supabase.table("team_members").select("*").eq("project_id", project_id).execute()
+        response = await self._execute(self.backend.table("team_members").select("*").eq("project_id", project_id))
         return response.data
 
     async def get_user_team_memberships(self, user_id: str) -> List[Dict[str, Any]]:
-        response = self.supabase.table("team_members").select("*").eq("user_id", user_id).execute()
+        response = await self._execute(self.backend.table("team_members").select("*").eq("user_id", user_id))
         return response.data
 
     async def create_team_member(self, team_member_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("team_members").insert(team_member_data).execute()
+        response = await self._execute(self.backend.table("team_members").insert(team_member_data))
         return response.data[0]
 
     async def update_team_member(self, team_member_id: str, team_member_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("team_members").update(team_member_data).eq("id", team_member_id).execute()
+        response = await self._execute(self.backend.table("team_members").update(team_member_data).eq("id", team_member_id))
         return response.data[0]
 
     async def delete_team_member(self, team_member_id: str) -> None:
-        self.supabase.table("team_members").delete().eq("id", team_member_id).execute()
+        await self._execute(self.backend.table("team_members").delete().eq("id", team_member_id))
 
     async def get_team_member_with_user(self, team_member_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("team_members").select("*, users(*)").eq("id", team_member_id).execute()
+        response = await self._execute(self.backend.table("team_members").select("*, users(*)").eq("id", team_member_id))
         return response.data[0] if response.data else None
 
     async def get_team_member_with_project(self, team_member_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("team_members").select("*, projects(*)").eq("id", team_member_id).execute()
+        response = await self._execute(self.backend.table("team_members").select("*, projects(*)").eq("id", team_member_id))
         return response.data[0] if response.data else None
 
     async def get_team_member_with_details(self, team_member_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("team_members").select("*, users(*), projects(*)").eq("id", team_member_id).execute()
+        response = await self._execute(self.backend.table("team_members").select("*, users(*), projects(*)").eq("id", team_member_id))
         return response.data[0] if response.data else None
 
     # Report methods
-    async def get_report(self, report_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("reports").select("*").eq("id", report_id).execute()
+    async def get_report(self, report_id: str, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        response = await self._execute(self.backend.table("reports").select(sparse_select(columns)).eq("id", report_id))
         return response.data[0] if response.data else None
 
     async def get_reports(self, user_id: str) -> List[Dict[str, Any]]:
-        response = self.supabase.table("reports").select("*").eq("user_id", user_id).execute()
+        response = await self._execute(self.backend.table("reports").select("*").eq("user_id", user_id))
         return response.data
 
     async def create_report(self, report_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("reports").insert(report_data).execute()
+        response = await self._execute(self.backend.table("reports").insert(report_data))
         return response.data[0]
 
     async def update_report(self, report_id: str, report_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("reports").update(report_data).eq("id", report_id).execute()
+        response = await self._execute(self.backend.table("reports").update(report_data).eq("id", report_id))
         return response.data[0]
 
     async def delete_report(self, report_id: str) -> None:
-        self.supabase.table("reports").delete().eq("id", report_id).execute()
+        await self._execute(self.backend.table("reports").delete().eq("id", report_id))
 
-    async def get_time_entries_for_report(
+    def _report_time_entries_query(
         self,
+        select: str,
         start_date: str,
         end_date: str,
         project_ids: Optional[List[str]] = None,
         team_member_ids: Optional[List[str]] = None,
-        client_ids: Optional[List[str]] = None
-    ) -> List[Dict[str, Any]]:
-        query = self.supabase.table("time_entries").select(
-            "*, tasks(*, projects(*, clients(*))), users(*), time_entry_files(*)"
-        ).gte("date", start_date).lte("date", end_date)
-
+        client_ids: Optional[List[str]] = None,
+        comparison_period: Optional[Tuple[str, str]] = None
+    ):
+        query = self.backend.table("time_entries").select(select)
+        if comparison_period:
+            # Both windows in one fetch, without the rows between them
+            query = or_filter(query, (
+                f"and(date.gte.{start_date},date.lte.{end_date}),"
+                f"and(date.gte.{comparison_period[0]},date.lte.{comparison_period[1]})"
+            ))
+        else:
+            query = query.gte("date", start_date).lte("date", end_date)
+
+        # Filters on embedded resources go through the embed names, and the
+        # inner joins drop entries whose task or project doesn't match
         if project_ids:
-            query = query.in_("task.project_id", project_ids)
+            query = query.in_("tasks.project_id", project_ids)
         if team_member_ids:
             query = query.in_("user_id", team_member_ids)
         if client_ids:
-            query = query.in_("task.project.client_id", client_ids)
+            query = query.in_("tasks.projects.client_id", client_ids)
+        return query
 
-        response = query.execute()
+    async def get_time_entries_for_report(
+        self,
+        start_date: str,
+        end_date: str,
+        project_ids: Optional[List[str]] = None,
+        team_member_ids: Optional[List[str]] = None,
+        client_ids: Optional[List[str]] = None,
+        comparison_period: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        response = await self._execute(self._report_time_entries_query(
+            "*, tasks!inner(*, projects!inner(*, clients(*))), users(id, email, full_name, is_active), time_entry_files(*)",
+            start_date, end_date, project_ids, team_member_ids, client_ids, comparison_period
+        ))
+        return response.data
+
+    async def get_report_time_entry_rows(
+        self,
+        start_date: str,
+        end_date: str,
+        project_ids: Optional[List[str]] = None,
+        team_member_ids: Optional[List[str]] = None,
+        client_ids: Optional[List[str]] = None,
+        comparison_period: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Time entries for a normalized report, with only the columns it needs"""
+        response = await self._execute(self._report_time_entries_query(
+            "id, task_id, user_id, description, date, start_time, end_time, duration, is_billable, "
+            "tasks!inner(id, title, status, project_id, projects!inner(id, name, status, client_id, clients(id, name))), "
+            "users(id, email, full_name)",
+            start_date, end_date, project_ids, team_member_ids, client_ids, comparison_period
+        ))
         return response.data
 
     async def get_projects_for_report(
@@ -240,7 +497,7 @@ class DatabaseService:
         client_ids: Optional[List[str]] = None,
         include_inactive: bool = False
     ) -> List[Dict[str, Any]]:
-        query = self.supabase.table("projects").select("*, clients(*), team_members(*, users(*))")
+        query = self.backend.table("projects").select("*, clients(*), team_members(*, users(id, email, full_name, is_active))")
         
         if project_ids:
             query = query.in_("id", project_ids)
@@ -249,7 +506,7 @@ class DatabaseService:
         if not include_inactive:
             query = query.eq("is_active", True)
 
-        response = query.execute()
+        response = await self._execute(query)
         return response.data
 
     async def get_team_members_for_report(
@@ -258,7 +515,7 @@ class DatabaseService:
         team_member_ids: Optional[List[str]] = None,
         include_inactive: bool = False
     ) -> List[Dict[str, Any]]:
-        query = self.supabase.table("team_members").select("*, users(*), projects(*)")
+        query = self.backend.table("team_members").select("*, users(id, email, full_name, is_active), projects(*)")
         
         if project_ids:
             query = query.in_("project_id", project_ids)
@@ -267,7 +524,7 @@ class DatabaseService:
         if not include_inactive:
             query = query.eq("is_active", True)
 
-        response = query.execute()
+        response = await self._execute(query)
         return response.data
 
     async def get_clients_for_report(
@@ -275,19 +532,42 @@ class DatabaseService:
         client_ids: Optional[List[str]] = None,
         include_inactive: bool = False
     ) -> List[Dict[str, Any]]:
-        query = self.supabase.table("clients").select("*, projects(*)")
+        query = self.backend.table("clients").select("*, projects(*)")
         
         if client_ids:
             query = query.in_("id", client_ids)
         if not include_inactive:
             query = query.eq("is_active", True)
 
-        response = query.execute()
+        response = await self._execute(query)
+        return response.data
+
+    async def get_deleted_records(
+        self, user_id: str, tables: List[str], deleted_since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Tombstones of a user's rows deleted from the given tables"""
+        query = (self.backend.table("deleted_records").select("table_name, record_id, deleted_at")
+            .eq("user_id", user_id).in_("table_name", tables))
+        if deleted_since:
+            query = query.gt("deleted_at", deleted_since)
+        response = await self._execute(query)
         return response.data
 
+    async def get_collection_versions(self, user_id: str, tables: Sequence[str]) -> Dict[str, int]:
+        """Versions of a user's collections, tables never written for the user are missing"""
+        response = await self._execute(self.backend.table("collection_versions").select("table_name, version")
+            .eq("user_id", user_id).in_("table_name", list(tables)))
+        return {row["table_name"]: row["version"] for row in response.data}
+
+    async def get_time_entry_day_versions(self, user_id: str, first: str, last: str) -> Dict[str, int]:
+        """Versions of a user's time entries dated first..last, days never written are missing"""
+        response = await self._execute(self.backend.table("time_entry_day_versions").select("day, version")
+            .eq("user_id", user_id).gte("day", first).lte("day", last))
+        return {str(row["day"]): row["version"] for row in response.data}
+
     # Notification methods
     async def get_notification(self, notification_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("notifications").select("*").eq("id", notification_id).execute()
+        response = await self._execute(self.backend.table("notifications").select("*").eq("id", notification_id))
         return response.data[0] if response.data else None
 
     async def get_user_notifications(
@@ -296,9 +576,10 @@ class DatabaseService:
         is_read: Optional[bool] = None,
         is_archived: Optional[bool] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        columns: Optional[Sequence[str]] = None
     ) -> List[Dict[str, Any]]:
-        query = self.supabase.table("notifications").select("*").eq("user_id", user_id)
+        query = self.backend.table("notifications").select(sparse_select(columns)).eq("user_id", user_id)
         
         if is_read is not None:
             query = query.eq("is_read", is_read)
@@ -306,22 +587,22 @@ class DatabaseService:
             query = query.eq("is_archived", is_archived)
         
         query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
-        response = query.execute()
+        response = await self._execute(query)
         return response.data
 
     async def create_notification(self, notification_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("notifications").insert(notification_data).execute()
+        response = await self._execute(self.backend.table("notifications").insert(notification_data))
         return response.data[0]
 
     async def update_notification(self, notification_id: str, notification_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("notifications").update(notification_data).eq("id", notification_id).execute()
+        response = await self._execute(self.backend.table("notifications").update(notification_data).eq("id", notification_id))
         return response.data[0]
 
     async def delete_notification(self, notification_id: str) -> None:
-        self.supabase.table("notifications").delete().eq("id", notification_id).execute()
+        await self._execute(self.backend.table("notifications").delete().eq("id", notification_id))
 
     async def mark_notifications_as_read(self, user_id: str, notification_ids: Optional[List[str]] = None) -> None:
-        query = self.supabase.table("notifications").update({
+        query = self.backend.table("notifications").update({
             "is_read": True,
             "read_at": datetime.datetime.now().isoformat()
         }).eq("user_id", user_id)
@@ -329,40 +610,55 @@ class DatabaseService:
         if notification_ids:
             query = query.in_("id", notification_ids)
         
-        query.execute()
+        await self._execute(query)
 
     async def archive_notifications(self, user_id: str, notification_ids: Optional[List[str]] = None) -> None:
-        query = self.supabase.table("notifications").update({
+        query = self.backend.table("notifications").update({
             "is_archived": True
         }).eq("user_id", user_id)
         
         if notification_ids:
             query = query.in_("id", notification_ids)
         
-        query.execute()
+        await self._execute(query)
 
     async def get_notification_preference(self, user_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("notification_preferences").select("*").eq("user_id", user_id).execute()
+        response = await self._execute(self.backend.table("notification_preferences").select("*").eq("user_id", user_id))
         return response.data[0] if response.data else None
 
     async def create_notification_preference(self, preference_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("notification_preferences").insert(preference_data).execute()
+        response = await self._execute(self.backend.table("notification_preferences").insert(preference_data))
         return response.data[0]
 
     async def update_notification_preference(self, user_id: str, preference_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("notification_preferences").update(preference_data).eq("user_id", user_id).execute()
+        response = await self._execute(self.backend.table("notification_preferences").update(preference_data).eq("user_id", user_id))
         return response.data[0]
 
+    async def get_time_entry_files(self, time_entry_id: str) -> List[Dict[str, Any]]:
+        response = await self._execute(self.backend.table("time_entry_files").select("*").eq("time_entry_id", time_entry_id).order("uploaded_at", desc=True))
+        return response.data
+
+    async def get_time_entry_file(self, file_id: str) -> Optional[Dict[str, Any]]:
+        response = await self._execute(self.backend.table("time_entry_files").select("*").eq("id", file_id))
+        return response.data[0] if response.data else None
+
+    async def create_time_entry_file(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._execute(self.backend.table("time_entry_files").insert(file_data))
+        return response.data[0]
+
+    async def delete_time_entry_file(self, file_id: str) -> None:
+        await self._execute(self.backend.table("time_entry_files").delete().eq("id", file_id))
+
     async def create_client_file(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.supabase.table("client_files").insert(file_data).execute()
+        response = await self._execute(self.backend.table("client_files").insert(file_data))
         return response.data[0]
 
     async def get_client_files(self, client_id: str) -> List[Dict[str, Any]]:
-        response = self.supabase.table("client_files").select("*").eq("client_id", client_id).order("uploaded_at", desc=True).execute()
+        response = await self._execute(self.backend.table("client_files").select("*").eq("client_id", client_id).order("uploaded_at", desc=True))
         return response.data
 
     async def delete_client_file(self, file_id: str) -> None:
-        self.supabase.table("client_files").delete().eq("id", file_id).execute()
+        await self._execute(self.backend.table("client_files").delete().eq("id", file_id))
 
     def to_serializable(self, data):
         """Convert data to JSON serializable format"""
@@ -376,7 +672,9 @@ class DatabaseService:
             return str(data)
         return data
 
-    async def get_active_tasks_for_projects(self, project_ids: List[str]) -> List[Dict[str, Any]]:
+    async def get_active_tasks_for_projects(
+        self, project_ids: List[str], columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Get all active tasks for a list of project IDs"""
         print("DEBUG: project_ids for active tasks:", project_ids)
         # Filter out any empty or invalid IDs
@@ -384,11 +682,14 @@ class DatabaseService:
         print("DEBUG: project_ids for active tasks:", project_ids)
         if not project_ids:
             return []
-        response = self.supabase.table("tasks").select("*") \
-            .in_("project_id", project_ids) \
-            .eq("status", "in_progress") \
-            .execute()
+        response = await self._execute(self.backend.table("tasks").select(sparse_select(columns))
+            .in_("project_id", project_ids)
+            .eq("status", "in_progress"))
         return response.data
 
 # Create a singleton instance
-db = DatabaseService() 
\ No newline at end of file
+# One span per DatabaseService call, the backend queries it runs are child spans
+trace_methods(DatabaseService, "db")
+
+db = DatabaseService()
+supabase_storage = db.backend.storage 
\ No newline at end of file
@@ -0,0 +1,62 @@
+import hashlib
+import orjson
+from typing import Any, Optional, Sequence
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from .collection_versions import collection_token
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def conditional_json_response(request: Request, content: Any) -> Response:
+    """Serialize content and answer 304 Not Modified if the client already has it"""
+    return conditional_response(request, orjson.dumps(jsonable_encoder(content)))
+
+
+def conditional_response(request: Request, body: bytes) -> Response:
+    """Answer with an already serialized JSON body, or 304 if the client has it"""
+    etag = compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def collection_etag(request: Request, user_id: str, tables: Sequence[str]) -> str:
+    """Strong ETag of a collection response, derived from the versions of the tables it reads.
+
+    Unlike compute_etag it is known before the response is built, so a match
+    skips the collection queries and the serialization. The query string is
+    part of it since filters, sparse fields and cursors change the body.
+    """
+    key = f"{await collection_token(user_id, tables)}|{request.url.path}?{request.url.query}"
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response when the client's If-None-Match has etag, else None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+        )
+    return None
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
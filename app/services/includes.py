@@ -0,0 +1,119 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import orjson
+from fastapi import HTTPException, Query, Response, status
+from ..config import settings
+from ..schemas.client import Client
+from ..schemas.project import Project
+from ..schemas.task import Task
+from ..schemas.team_member import TeamMember
+from ..schemas.time_entry import TimeEntry
+from .serialization import project_rows
+
+TRUNCATED_HEADER = "X-Include-Truncated"
+
+# resource -> include name -> (embedded table, to-many, order column, descending)
+RELATIONSHIPS: Dict[str, Dict[str, Tuple[str, bool, str, bool]]] = {
+    "clients": {
+        "projects": ("projects", True, "created_at", False),
+        "files": ("client_files", True, "uploaded_at", True),
+    },
+    "projects": {
+        "client": ("clients", False, "", False),
+        "tasks": ("tasks", True, "created_at", False),
+        "team_members": ("team_members", True, "created_at", False),
+    },
+    "tasks": {
+        "time_entries": ("time_entries", True, "start_time", True),
+    },
+    "time_entries": {
+        "files": ("time_entry_files", True, "uploaded_at", True),
+    },
+}
+# Included rows are shaped like the standalone responses, tables without a model pass through
+MODELS = {"clients": Client, "projects": Project, "tasks": Task, "team_members": TeamMember, "time_entries": TimeEntry}
+
+IncludeTree = Dict[str, "IncludeTree"]
+
+
+def parse_include(resource: str, include: Optional[str]) -> Optional[IncludeTree]:
+    """Tree of relationships from ``include=projects.tasks.time_entries,files``"""
+    if not include:
+        return None
+    tree: IncludeTree = {}
+    for item in include.split(","):
+        names = [name.strip() for name in item.split(".") if name.strip()]
+        if len(names) > settings.INCLUDE_MAX_DEPTH:
+            raise ValueError(f"{item.strip()} is nested deeper than {settings.INCLUDE_MAX_DEPTH} levels")
+        node, table = tree, resource
+        for name in names:
+            relationship = RELATIONSHIPS.get(table, {}).get(name)
+            if relationship is None:
+                raise ValueError(f"Cannot include {name} on {table}")
+            node = node.setdefault(name, {})
+            table = relationship[0]
+    return tree or None
+
+
+def include_query(resource: str) -> Callable[..., Optional[IncludeTree]]:
+    """Dependency reading the ``include`` query parameter for resource"""
+    options = ", ".join(RELATIONSHIPS[resource])
+
+    def dependency(
+        include: Optional[str] = Query(None, description=f"Related resources to embed, e.g. {options}, dotted to nest")
+    ) -> Optional[IncludeTree]:
+        try:
+            return parse_include(resource, include)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return dependency
+
+
+def include_select(resource: str, tree: Optional[IncludeTree]) -> str:
+    """PostgREST select embedding the included tables"""
+    parts = ["*"]
+    for name, subtree in (tree or {}).items():
+        table = RELATIONSHIPS[resource][name][0]
+        parts.append(f"{table}({include_select(table, subtree)})")
+    return ", ".join(parts)
+
+
+def limit_includes(query: Any, resource: str, tree: Optional[IncludeTree], path: str = "") -> Any:
+    """Order each to-many include and fetch one row over the cap, to tell when it was cut"""
+    for name, subtree in (tree or {}).items():
+        table, many, order, desc = RELATIONSHIPS[resource][name]
+        table_path = f"{path}.{table}" if path else table
+        if many:
+            query = query.order(order, desc=desc, foreign_table=table_path)
+            query = query.limit(settings.INCLUDE_MAX_ROWS + 1, foreign_table=table_path)
+        query = limit_includes(query, table, subtree, table_path)
+    return query
+
+
+def shape_included(resource: str, row: Dict[str, Any], tree: Optional[IncludeTree],
+                   truncated: List[str], path: str = "") -> Dict[str, Any]:
+    """Shape a row and its embeds under their include names, capping to-many includes"""
+    model = MODELS.get(resource)
+    shaped = project_rows(model, row) if model else dict(row)
+    for name, subtree in (tree or {}).items():
+        table, many = RELATIONSHIPS[resource][name][:2]
+        include_path = f"{path}.{name}" if path else name
+        value = row.get(table)
+        if not many:
+            shaped[name] = shape_included(table, value, subtree, truncated, include_path) if value else None
+            continue
+        value = value or []
+        if len(value) > settings.INCLUDE_MAX_ROWS:
+            value = value[:settings.INCLUDE_MAX_ROWS]
+            if include_path not in truncated:
+                truncated.append(include_path)
+        shaped[name] = [shape_included(table, child, subtree, truncated, include_path) for child in value]
+    return shaped
+
+
+def included_response(resource: str, row: Dict[str, Any], tree: Optional[IncludeTree]) -> Response:
+    """JSON response of a row with its includes, naming any capped include in X-Include-Truncated"""
+    truncated: List[str] = []
+    response = Response(orjson.dumps(shape_included(resource, row, tree, truncated)), media_type="application/json")
+    if truncated:
+        response.headers[TRUNCATED_HEADER] = ",".join(truncated)
+    return response
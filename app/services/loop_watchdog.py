@@ -0,0 +1,66 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+from ..config import settings
+from .metrics import Metrics, metrics
+
+
+class LoopWatchdog:
+    """Measures event-loop lag and reports what is blocking the loop.
+
+    A coroutine sleeps for ``interval`` in a loop and records how late it
+    wakes up. A daemon thread watches the coroutine's heartbeat; when the loop
+    has not run it for longer than ``threshold`` it captures the loop thread's
+    stack, so the blocking call shows up in the logs while it is still running.
+    """
+
+    def __init__(self, interval: float, threshold: float, registry: Metrics = metrics):
+        self.interval = interval
+        self.threshold = threshold
+        self.metrics = registry
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def run(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                scheduled = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                self._heartbeat = now
+                lag = max(0.0, now - scheduled)
+                self.metrics.event_loop_lag.observe(lag)
+                if lag > self.threshold:
+                    print(f"Event loop lag of {lag:.3f}s")
+        finally:
+            self._stop.set()
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            # Report each stall once, at the first check past the threshold
+            if blocked_for <= self.threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            self.metrics.event_loop_blocked.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "  <stack unavailable>\n"
+            print(f"Event loop blocked for {blocked_for:.3f}s, loop thread stack:\n{stack}", end="")
+
+
+loop_watchdog = LoopWatchdog(
+    interval=settings.LOOP_WATCHDOG_INTERVAL_SECONDS,
+    threshold=settings.LOOP_WATCHDOG_THRESHOLD_SECONDS,
+)
@@ -0,0 +1,187 @@
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from .backends import describe_query
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: Dict[Labels, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        self.values[tuple(sorted(labels.items()))] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # Per label set: bucket counts (non-cumulative, last slot is +Inf), sum
+        self.values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        counts, total = self.values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', '+Inf'))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {repr(total[0])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+@dataclass
+class RequestStats:
+    """Backend usage of the request being served"""
+    backend_calls: int = 0
+    backend_seconds: float = 0.0
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class Metrics:
+    """Process-wide request and backend metrics, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Request latency by method, route and status code")
+        self.requests_in_flight = Gauge("http_requests_in_flight", "Requests currently being served")
+        self.request_backend_calls = Histogram(
+            "http_request_backend_calls", "Backend calls made per request", CALL_COUNT_BUCKETS)
+        self.request_backend_duration = Histogram(
+            "http_request_backend_duration_seconds", "Time spent waiting on the backend per request")
+        self.backend_query_duration = Histogram(
+            "backend_query_duration_seconds", "Backend query latency by table and operation")
+        self.backend_errors = Counter("backend_query_errors_total", "Backend queries that raised")
+        self.event_loop_lag = Histogram(
+            "event_loop_lag_seconds", "Delay of event loop wakeups past their schedule", LAG_BUCKETS)
+        self.event_loop_blocked = Counter(
+            "event_loop_blocked_total", "Times the event loop was blocked past the watchdog threshold")
+        self.families = [
+            self.request_duration, self.requests_in_flight, self.request_backend_calls,
+            self.request_backend_duration, self.backend_query_duration, self.backend_errors,
+            self.event_loop_lag, self.event_loop_blocked,
+        ]
+
+    def record_query(self, query: Any, seconds: float, error: Optional[BaseException]) -> None:
+        """DatabaseService query hook"""
+        table, operation = describe_query(query)
+        self.backend_query_duration.observe(seconds, table=table, operation=operation)
+        if error is not None:
+            self.backend_errors.inc(table=table, operation=operation)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.backend_calls += 1
+            stats.backend_seconds += seconds
+
+    def record_request(self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats) -> None:
+        self.request_duration.observe(seconds, method=method, route=route, status=str(status_code))
+        self.request_backend_calls.observe(stats.backend_calls, method=method, route=route)
+        self.request_backend_duration.observe(stats.backend_seconds, method=method, route=route)
+
+    def render(self) -> str:
+        lines = []
+        for family in self.families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request and counting its backend calls.
+
+    Routes are labelled with their path template (``/api/projects/{project_id}``)
+    so the label set stays bounded; requests that match no route are grouped
+    under ``unmatched``.
+    """
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.metrics = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.metrics.requests_in_flight.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.requests_in_flight.dec(method=method)
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            self.metrics.record_request(method, route_path, status_code, elapsed, stats)
@@ -0,0 +1,127 @@
+import base64
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import orjson
+from fastapi import HTTPException, Query, Response, status
+from ..config import settings
+from .backends import or_filter
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _quote(value: Any) -> str:
+    """Quote a value for a PostgREST logic tree, where , . : ( ) are reserved"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def encode_cursor(sort: str, desc: bool, value: Any, row_id: str) -> str:
+    payload = orjson.dumps([sort, desc, value, row_id])
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, bool, Any, str]:
+    try:
+        sort, desc, value, row_id = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return sort, bool(desc), value, str(row_id)
+
+
+@dataclass
+class Page:
+    """Sort order and keyset position of a list request.
+
+    Rows are ordered by ``sort`` with ``id`` as the tie breaker, so a page
+    starts right after the (value, id) of the previous page's last row
+    instead of at an offset. NULLs sort the way PostgreSQL sorts them: last
+    when ascending, first when descending.
+    """
+    sort: str
+    desc: bool = False
+    limit: Optional[int] = None
+    after: Optional[Tuple[Any, str]] = None
+
+    def columns(self, fields: Optional[Tuple[str, ...]]) -> Optional[Tuple[str, ...]]:
+        """Sparse fieldset plus the sort column a next cursor is built from"""
+        if fields and self.limit is not None and self.sort not in fields:
+            return fields + (self.sort,)
+        return fields
+
+    def keyset(self) -> Optional[str]:
+        """PostgREST or=(...) conditions selecting the rows after the cursor"""
+        if self.after is None:
+            return None
+        value, row_id = self.after
+        op = "lt" if self.desc else "gt"
+        tie = f"id.{op}.{_quote(row_id)}"
+        if self.sort == "id":
+            return tie
+        column = self.sort
+        if value is None:
+            after_nulls = f"and({column}.is.null,{tie})"
+            return f"{column}.not.is.null,{after_nulls}" if self.desc else after_nulls
+        conditions = [f"{column}.{op}.{_quote(value)}", f"and({column}.eq.{_quote(value)},{tie})"]
+        if not self.desc:
+            conditions.append(f"{column}.is.null")
+        return ",".join(conditions)
+
+    def apply(self, query: Any) -> Any:
+        keyset = self.keyset()
+        if keyset:
+            query = or_filter(query, keyset)
+        query = query.order(self.sort, desc=self.desc)
+        if self.sort != "id":
+            query = query.order("id", desc=self.desc)
+        if self.limit is not None:
+            # One extra row tells whether there is a next page
+            query = query.limit(self.limit + 1)
+        return query
+
+    def split(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Rows of this page and the cursor of the next one, None on the last page"""
+        if self.limit is None or len(rows) <= self.limit:
+            return rows, None
+        rows = rows[:self.limit]
+        last = rows[-1]
+        return rows, encode_cursor(self.sort, self.desc, last.get(self.sort), last["id"])
+
+
+def page_query(sort_fields: Tuple[str, ...], default_sort: str = "created_at") -> Callable[..., Page]:
+    """Dependency reading sort, limit and cursor query parameters into a Page"""
+    def dependency(
+        sort: str = Query(default_sort, description=f"One of {', '.join(sort_fields)}, prefix with - for descending"),
+        limit: Optional[int] = Query(None, ge=1, le=settings.LIST_MAX_LIMIT),
+        cursor: Optional[str] = Query(None, description=f"{NEXT_CURSOR_HEADER} of the previous page")
+    ) -> Page:
+        desc = sort.startswith("-")
+        column = sort.lstrip("-")
+        if column not in sort_fields:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot sort by {column}, expected one of {', '.join(sort_fields)}"
+            )
+        after = None
+        if cursor:
+            try:
+                cursor_sort, cursor_desc, value, row_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            if (cursor_sort, cursor_desc) != (column, desc):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor was issued for a different sort order"
+                )
+            after = (value, row_id)
+        return Page(sort=column, desc=desc, limit=limit, after=after)
+    return dependency
+
+
+def paged_response(response: Response, cursor: Optional[str]) -> Response:
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return response
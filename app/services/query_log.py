@@ -0,0 +1,112 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional, Tuple
+from .backends import describe_query, query_filters
+
+
+@dataclass
+class QueryRecord:
+    table: str
+    operation: str
+    filters: List[Tuple[str, str, Any]]
+    seconds: float
+
+    @property
+    def shape(self) -> Tuple[str, str, Tuple[Tuple[str, str], ...]]:
+        """Identifies queries that differ only in their filter values"""
+        return self.table, self.operation, tuple(sorted((column, op) for column, op, _ in self.filters))
+
+    def __str__(self) -> str:
+        filters = ", ".join(f"{column} {op} {value!r}" for column, op, value in self.filters)
+        return f"{self.operation} {self.table}" + (f" where {filters}" if filters else "")
+
+
+@dataclass
+class QueryLog:
+    """Backend calls made while the log is active"""
+    records: List[QueryRecord] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def repeated(self, threshold: int) -> List[Tuple[Tuple[str, str, Tuple[Tuple[str, str], ...]], int]]:
+        """Query shapes issued more than threshold times, the usual sign of an N+1 loop"""
+        counts = Counter(record.shape for record in self.records)
+        return [(shape, count) for shape, count in counts.most_common() if count > threshold]
+
+    def summary(self) -> str:
+        return "\n".join(f"  {record}" for record in self.records)
+
+
+current_query_log: ContextVar[Optional[QueryLog]] = ContextVar("current_query_log", default=None)
+# Logs opened by capture_queries(), which also see queries run on other threads
+_captures: List[QueryLog] = []
+
+
+def record_query(query: Any, seconds: float, error: Optional[BaseException]) -> None:
+    """DatabaseService query hook"""
+    request_log = current_query_log.get()
+    if request_log is None and not _captures:
+        return
+    table, operation = describe_query(query)
+    record = QueryRecord(table, operation, query_filters(query), seconds)
+    if request_log is not None:
+        request_log.records.append(record)
+    for log in _captures:
+        if log is not request_log:
+            log.records.append(record)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryLog]:
+    """Collect every backend call made until the block exits"""
+    log = QueryLog()
+    _captures.append(log)
+    try:
+        yield log
+    finally:
+        _captures.remove(log)
+
+
+def format_repeated(log: QueryLog, threshold: int) -> str:
+    lines = []
+    for (table, operation, filters), count in log.repeated(threshold):
+        columns = ", ".join(f"{column} {op}" for column, op in filters) or "no filters"
+        lines.append(f"{count}x {operation} {table} ({columns})")
+    return "\n".join(lines)
+
+
+class QueryLogMiddleware:
+    """Debug middleware logging every backend call per request and flagging N+1 patterns.
+
+    Enabled with QUERY_DEBUG=true. Responses carry an ``X-Backend-Calls``
+    header, and requests that repeat a query shape more than
+    ``repeat_threshold`` times print a warning with the offending shapes.
+    """
+
+    def __init__(self, app, repeat_threshold: int):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = current_query_log.set(log)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-backend-calls", str(len(log)).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_log.reset(token)
+            repeated = format_repeated(log, self.repeat_threshold)
+            if repeated:
+                print(f"Possible N+1 in {scope['method']} {scope['path']}: {len(log)} backend calls\n{repeated}")
@@ -0,0 +1,218 @@
+import copy
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from itertools import compress, count
+from operator import itemgetter, methodcaller
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy
+except ImportError:  # numpy is in requirements.txt, the pure Python pass covers installs without it
+    numpy = None
+
+# Where report rows (nested or normalized select) keep each group_by dimension,
+# any other name groups by that time entry column, when present
+DIMENSIONS: Dict[str, Tuple[str, ...]] = {
+    "project": ("tasks", "project_id"),
+    "client": ("tasks", "projects", "client_id"),
+    "team_member": ("user_id",),
+    "users": ("user_id",),
+    "tasks": ("task_id",),
+    "date": ("date",),
+}
+
+
+def parse_group_by(group_by: Optional[str]) -> Tuple[str, ...]:
+    """Dimensions of a group_by parameter, e.g. ``project,team_member,date``"""
+    if not group_by:
+        return ()
+    return tuple(name.strip() for name in group_by.split(",") if name.strip())
+
+
+def first_rows(values: Iterable[Any], length: int) -> Any:
+    """numpy array of the index of the row where each value first appears"""
+    return numpy.fromiter(map({}.setdefault, values, count()), dtype=numpy.intp, count=length)
+
+
+def column(rows: Sequence[Dict[str, Any]], path: Tuple[str, ...], optional: bool = False) -> List[Any]:
+    """Values at path in every row, with optional None where the last key is missing"""
+    values: Iterable[Any] = rows
+    for key in path[:-1]:
+        values = map(itemgetter(key), values)
+    return list(map(methodcaller("get", path[-1]) if optional else itemgetter(path[-1]), values))
+
+
+@dataclass
+class Group:
+    # Key per dimension, "unknown" for missing values
+    keys: Tuple[str, ...]
+    total_hours: float
+    billable_hours: float
+    rows: List[Dict[str, Any]]
+
+
+class EntryColumns:
+    """Time entry rows loaded once into compact columns.
+
+    Durations and billable flags go to typed arrays and the group keys of
+    each dimension to one list per dimension, all read with C-level passes
+    over the rows. Totals are reductions over the arrays. Grouping numbers
+    each row's group from the row where its keys first appear and sums the
+    group totals with numpy bincounts; without numpy it is a single Python
+    pass over the zipped columns.
+    """
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], dimensions: Iterable[Tuple[str, Tuple[str, ...], bool]] = ()):
+        self.rows = rows
+        try:
+            self.durations = array("d", column(rows, ("duration",)))
+            self.billable = array("b", column(rows, ("is_billable",)))
+        except TypeError:
+            # Entries without a duration or billable flag count as 0 and non-billable
+            self.durations = array("d", [row.get("duration") or 0 for row in rows])
+            self.billable = array("b", [bool(row.get("is_billable")) for row in rows])
+        self.dimensions: List[str] = []
+        self.keys: List[List[Any]] = []
+        for name, path, optional in dimensions:
+            self.dimensions.append(name)
+            self.keys.append(column(rows, path, optional))
+
+    @classmethod
+    def for_report(cls, rows: Sequence[Dict[str, Any]], group_by: Optional[str]) -> "EntryColumns":
+        return cls(rows, [
+            (name, DIMENSIONS[name], False) if name in DIMENSIONS else (name, (name,), True)
+            for name in parse_group_by(group_by)
+        ])
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    def totals(self) -> Tuple[float, float]:
+        """(total, billable) duration"""
+        return sum(self.durations), sum(compress(self.durations, self.billable))
+
+    def where(self, mask: Sequence[bool]) -> "EntryColumns":
+        """The columns of the rows selected by mask"""
+        selected = copy.copy(self)
+        selected.rows = list(compress(self.rows, mask))
+        selected.durations = array("d", compress(self.durations, mask))
+        selected.billable = array("b", compress(self.billable, mask))
+        selected.keys = [list(compress(keys, mask)) for keys in self.keys]
+        return selected
+
+    def split(self, first: str, last: str) -> Tuple["EntryColumns", "EntryColumns"]:
+        """(rows dated first..last, the other rows), bucketing a fetch that covers several periods"""
+        inside = [first <= day <= last for day in column(self.rows, ("date",))]
+        return self.where(inside), self.where([not selected for selected in inside])
+
+    def groups(self, with_rows: bool = True) -> List[Group]:
+        """Totals of every combination of the dimensions present in the rows.
+
+        Groups come in order of first appearance, rows within a group keep
+        their order. Without with_rows the groups only carry totals.
+        """
+        if not self.dimensions or not self.rows:
+            return []
+        if numpy is None:
+            return self._grouped_rows(with_rows)
+        return self._grouped_arrays(with_rows)
+
+    def _group_keys(self, row: int) -> Tuple[str, ...]:
+        return tuple("unknown" if keys[row] is None else str(keys[row]) for keys in self.keys)
+
+    def _grouped_arrays(self, with_rows: bool) -> List[Group]:
+        keys: Iterable[Any] = self.keys[0] if len(self.keys) == 1 else zip(*self.keys)
+        # Sorted first rows are the groups in order of first appearance, codes number each row's group
+        first, codes = numpy.unique(first_rows(keys, len(self)), return_inverse=True)
+        durations = numpy.frombuffer(self.durations, dtype=numpy.float64)
+        billable = durations * numpy.frombuffer(self.billable, dtype=numpy.int8)
+        totals = numpy.bincount(codes, weights=durations).tolist()
+        billable_totals = numpy.bincount(codes, weights=billable).tolist()
+        group_keys = [self._group_keys(row) for row in first.tolist()]
+        groups = [Group(key, total, billable, []) for key, total, billable in zip(group_keys, totals, billable_totals)]
+        if with_rows:
+            # Rows are appended in their own order, keeping it within groups and reading them sequentially
+            members = [group.rows for group in groups]
+            deque(map(list.append, map(members.__getitem__, codes.tolist()), self.rows), maxlen=0)
+        return groups
+
+    def _grouped_rows(self, with_rows: bool) -> List[Group]:
+        keys: Iterable[Any] = self.keys[0] if len(self.keys) == 1 else zip(*self.keys)
+        # key -> [total, billable, rows]
+        totals: Dict[Any, list] = {}
+        for key, duration, billable, row in zip(keys, self.durations, self.billable, self.rows):
+            group = totals.get(key)
+            if group is None:
+                group = totals[key] = [0.0, 0.0, []]
+            group[0] += duration
+            if billable:
+                group[1] += duration
+            if with_rows:
+                group[2].append(row)
+        groups = []
+        for key, (total, billable, rows) in totals.items():
+            if len(self.keys) == 1:
+                key = (key,)
+            groups.append(Group(
+                keys=tuple("unknown" if value is None else str(value) for value in key),
+                total_hours=total,
+                billable_hours=billable,
+                rows=rows
+            ))
+        return groups
+
+
+def group_summary(groups: Iterable[Group], members: Callable[[List[Dict[str, Any]]], Tuple[str, Any]]) -> Dict[str, Any]:
+    """Report summary nested one level per dimension, e.g. summary[project][user][date].
+
+    members turns a group's rows into the (name, value) listing them,
+    entries for nested reports and entry ids for normalized ones.
+    """
+    summary: Dict[str, Any] = {}
+    for group in groups:
+        node = summary
+        for key in group.keys[:-1]:
+            node = node.setdefault(key, {})
+        name, value = members(group.rows)
+        node[group.keys[-1]] = {
+            "total_hours": group.total_hours,
+            "billable_hours": group.billable_hours,
+            "non_billable_hours": group.total_hours - group.billable_hours,
+            name: value
+        }
+    return summary
+
+
+def period_totals(total: float, billable: float) -> Dict[str, float]:
+    return {"total_hours": total, "billable_hours": billable, "non_billable_hours": total - billable}
+
+
+def compare_periods(current: EntryColumns, previous: EntryColumns, first: str, last: str) -> Dict[str, Any]:
+    """Comparison block of a report: previous totals and deltas, overall and per group.
+
+    Groups only present in one period compare against zero.
+    """
+    total, billable = current.totals()
+    previous_total, previous_billable = previous.totals()
+    current_groups = {group.keys: group for group in current.groups(with_rows=False)}
+    previous_groups = {group.keys: group for group in previous.groups(with_rows=False)}
+    summary: Dict[str, Any] = {}
+    for keys in dict.fromkeys([*current_groups, *previous_groups]):
+        now, before = current_groups.get(keys), previous_groups.get(keys)
+        now_totals = (now.total_hours, now.billable_hours) if now else (0, 0)
+        before_totals = (before.total_hours, before.billable_hours) if before else (0, 0)
+        node = summary
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+        node[keys[-1]] = {
+            "previous": period_totals(*before_totals),
+            "delta": period_totals(now_totals[0] - before_totals[0], now_totals[1] - before_totals[1])
+        }
+    return {
+        "start_date": first,
+        "end_date": last,
+        "previous": period_totals(previous_total, previous_billable),
+        "delta": period_totals(total - previous_total, billable - previous_billable),
+        "summary": summary
+    }
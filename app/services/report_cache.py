@@ -0,0 +1,93 @@
+import asyncio
+import json
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from ..config import settings
+from .collection_versions import collection_token
+from .request_cache import current_request_cache
+
+# Tables read by the report generators, a write to any of them starts a new result for the writer
+REPORT_TABLES = ("time_entries", "tasks", "projects", "clients", "team_members")
+
+
+def report_params(report: Any) -> Dict[str, Any]:
+    """The ReportCreate parameters that shape a report, in a canonical form"""
+    params = report.model_dump(mode="json", exclude={"name"})
+    for name in ("project_ids", "team_member_ids", "client_ids"):
+        if params.get(name):
+            params[name] = sorted(params[name])
+    return params
+
+
+async def report_key(kind: str, user_id: str, report: Any, *variant: Any) -> str:
+    """Coalescing key: the report kind, the user's scope and the parameters that shape the result"""
+    params = report_params(report)
+    # Preset time ranges move with the calendar
+    params["today"] = date.today().isoformat()
+    scope = await collection_token(user_id, REPORT_TABLES)
+    return json.dumps([kind, scope, params, *variant], sort_keys=True, default=str)
+
+
+class ReportCache:
+    """Single-flight report computations with briefly kept results.
+
+    Concurrent requests for the same key share one computation, which keeps
+    running if the request that started it goes away. Results are served as
+    is for REPORT_CACHE_FRESH_SECONDS, then for REPORT_CACHE_STALE_SECONDS
+    more while one background computation refreshes them. Results are local
+    to the process, like the timer registry.
+    """
+
+    def __init__(self):
+        self.inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self.results: Dict[str, Tuple[float, Any]] = {}
+        self.coalesced = 0
+
+    async def get(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self.results.get(key)
+        if cached is not None:
+            age = time.monotonic() - cached[0]
+            if age < settings.REPORT_CACHE_FRESH_SECONDS:
+                return cached[1]
+            if age < settings.REPORT_CACHE_FRESH_SECONDS + settings.REPORT_CACHE_STALE_SECONDS:
+                self._start(key, compute)
+                return cached[1]
+        if key in self.inflight:
+            self.coalesced += 1
+        return await asyncio.shield(self._start(key, compute))
+
+    def _start(self, key: str, compute: Callable[[], Awaitable[Any]]) -> "asyncio.Future[Any]":
+        future = self.inflight.get(key)
+        if future is None:
+            future = self.inflight[key] = asyncio.ensure_future(self._run(key, compute))
+            future.add_done_callback(self._done)
+        return future
+
+    async def _run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        # Shared by every waiter, so it mustn't read through one request's cache
+        current_request_cache.set(None)
+        try:
+            value = await compute()
+            self._prune()
+            self.results[key] = (time.monotonic(), value)
+            return value
+        finally:
+            del self.inflight[key]
+
+    def _prune(self) -> None:
+        expired = time.monotonic() - settings.REPORT_CACHE_FRESH_SECONDS - settings.REPORT_CACHE_STALE_SECONDS
+        for key in [key for key, (stored, _) in self.results.items() if stored < expired]:
+            del self.results[key]
+
+    @staticmethod
+    def _done(future: "asyncio.Future[Any]") -> None:
+        # Background refreshes have no waiter to raise to
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Report computation failed: {future.exception()!r}")
+
+    def clear(self) -> None:
+        self.results.clear()
+
+
+report_cache = ReportCache()
@@ -0,0 +1,75 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from ..config import settings
+from .database import db
+
+# Computes a job's result as JSON-ready data
+ReportRunner = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class ReportJobQueue:
+    """Bounded worker pool for reports too big to compute within a request.
+
+    Jobs are rows of the reports table: submitting inserts a queued row, a
+    worker marks it running and stores the result in data once completed,
+    or the error once failed. Each user has at most max_per_user jobs queued
+    or running. The queue is local to the process, like the timer registry,
+    so jobs queued when it stops stay queued.
+    """
+
+    def __init__(self, workers: int, max_per_user: int):
+        self.workers = workers
+        self.max_per_user = max_per_user
+        self.queue: "asyncio.Queue[Tuple[str, str, ReportRunner]]" = asyncio.Queue()
+        self.active: Dict[str, int] = defaultdict(int)
+
+    async def submit(self, user_id: str, row: Dict[str, Any], run: ReportRunner) -> Dict[str, Any]:
+        """Insert the job row and queue run, raises ValueError when the user has too many jobs"""
+        if self.active[user_id] >= self.max_per_user:
+            raise ValueError(f"At most {self.max_per_user} report jobs can be queued or running at once")
+        self.active[user_id] += 1
+        try:
+            job = await db.create_report({**row, "user_id": user_id, "status": "queued"})
+        except BaseException:
+            self._release(user_id)
+            raise
+        self.queue.put_nowait((user_id, job["id"], run))
+        return job
+
+    def _release(self, user_id: str) -> None:
+        self.active[user_id] -= 1
+        if not self.active[user_id]:
+            del self.active[user_id]
+
+    async def execute(self, job_id: str, run: ReportRunner) -> None:
+        await db.update_report(job_id, {"status": "running"})
+        try:
+            data = await run()
+        except Exception as e:
+            print(f"Report job {job_id} failed: {e!r}")
+            await db.update_report(job_id, {"status": "failed", "error": getattr(e, "detail", None) or str(e)})
+            return
+        await db.update_report(job_id, {
+            "status": "completed",
+            "data": data,
+            "last_generated": datetime.now(timezone.utc).isoformat()
+        })
+
+    async def _work(self) -> None:
+        while True:
+            user_id, job_id, run = await self.queue.get()
+            try:
+                await self.execute(job_id, run)
+            except Exception as e:
+                print(f"Error running report job {job_id}: {e}")
+            finally:
+                self._release(user_id)
+                self.queue.task_done()
+
+    async def run(self) -> None:
+        await asyncio.gather(*(self._work() for _ in range(self.workers)))
+
+
+report_jobs = ReportJobQueue(settings.REPORT_JOB_WORKERS, settings.REPORT_JOB_MAX_PER_USER)
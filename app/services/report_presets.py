@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from ..config import settings
+from .collection_versions import collection_token
+from .database import db
+from .report_cache import REPORT_TABLES, report_params
+from .request_cache import current_request_cache
+
+# (first, last) ISO dates covered by a report
+DateRange = Tuple[str, str]
+
+
+def preset_key(kind: str, user_id: str, report: Any, *variant: Any) -> str:
+    """Key of a preset time range report, explicit dates are ignored since the preset decides the range"""
+    params = report_params(report)
+    params.pop("start_date", None)
+    params.pop("end_date", None)
+    return json.dumps(["preset", kind, user_id, params, *variant], sort_keys=True, default=str)
+
+
+async def preset_versions(user_id: str, covered: DateRange) -> Tuple[str, Dict[str, int]]:
+    """Versions of what a preset report reads: the other report tables and the time entries in its range"""
+    tables = tuple(table for table in REPORT_TABLES if table != "time_entries")
+    return await collection_token(user_id, tables), await db.get_time_entry_day_versions(user_id, *covered)
+
+
+def seconds_until_hour(hour: int, now: Optional[datetime] = None) -> float:
+    """Seconds from now until the next time the UTC clock reaches hour:00"""
+    now = now or datetime.now(timezone.utc)
+    start = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if start <= now:
+        start += timedelta(days=1)
+    return (start - now).total_seconds()
+
+
+@dataclass
+class PresetReport:
+    # Date range the report covers today
+    covered: Callable[[], DateRange]
+    compute: Callable[[], Awaitable[Any]]
+    # Versions of the data read for a range, see preset_versions
+    versions: Callable[[DateRange], Awaitable[Any]]
+    requested_at: float = 0.0
+    result: Any = None
+    # Range of the stored result, None while there is none
+    range: Optional[DateRange] = None
+    # Versions read before the stored result was computed
+    computed_versions: Any = None
+    computed_at: float = 0.0
+
+    async def current(self, now: float) -> bool:
+        """Whether the stored result can be served"""
+        if self.range is None or now - self.computed_at >= settings.REPORT_PRESET_MAX_AGE_SECONDS:
+            return False
+        covered = self.covered()
+        return self.range == covered and await self.versions(covered) == self.computed_versions
+
+
+class PresetReports:
+    """Preset time range reports, precomputed off-peak and served until invalidated.
+
+    Every preset report requested in the last REPORT_PRESET_RETENTION_DAYS
+    is recomputed daily at REPORT_PRECOMPUTE_HOUR (UTC), so the new week or
+    month is ready before anyone asks. A stored result is served while the
+    shared versions of what it read are unchanged: the time entries dated
+    inside its range and the other report tables, since a renamed project or
+    a changed rate shows up in every report. The versions are bumped by
+    database triggers, so writes from any process invalidate it. A result is
+    also recomputed when its preset rolls over to a new range or once
+    REPORT_PRESET_MAX_AGE_SECONDS old. At most REPORT_PRESET_MAX_REPORTS
+    presets are kept, the least recently requested are dropped first.
+    """
+
+    def __init__(self):
+        # Least recently requested first
+        self.reports: "OrderedDict[str, PresetReport]" = OrderedDict()
+        self.inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self.hits = 0
+
+    async def get(
+        self,
+        key: str,
+        covered: Callable[[], DateRange],
+        compute: Callable[[], Awaitable[Any]],
+        versions: Callable[[DateRange], Awaitable[Any]]
+    ) -> Any:
+        preset = self.reports.get(key)
+        if preset is None:
+            preset = self.reports[key] = PresetReport(covered, compute, versions)
+            while len(self.reports) > settings.REPORT_PRESET_MAX_REPORTS:
+                self.reports.popitem(last=False)
+        else:
+            self.reports.move_to_end(key)
+        preset.requested_at = time.time()
+        if await preset.current(preset.requested_at):
+            self.hits += 1
+            return preset.result
+        return await asyncio.shield(self._start(key, preset))
+
+    def _start(self, key: str, preset: PresetReport) -> "asyncio.Future[Any]":
+        future = self.inflight.get(key)
+        if future is None:
+            future = self.inflight[key] = asyncio.ensure_future(self._compute(key, preset))
+        return future
+
+    async def _compute(self, key: str, preset: PresetReport) -> Any:
+        # Shared by every waiter, so it mustn't read through one request's cache
+        current_request_cache.set(None)
+        covered = preset.covered()
+        try:
+            # Read first, so writes made during the computation invalidate the result
+            versions = await preset.versions(covered)
+            result = await preset.compute()
+        finally:
+            del self.inflight[key]
+        preset.result, preset.range, preset.computed_versions = result, covered, versions
+        preset.computed_at = time.time()
+        return result
+
+    def clear(self) -> None:
+        """Forget every preset report, requested or stored"""
+        self.reports.clear()
+
+    async def precompute(self) -> int:
+        """Compute the recently requested presets without a current result, returns how many were"""
+        now = time.time()
+        cutoff = now - settings.REPORT_PRESET_RETENTION_DAYS * 86400
+        for key in [key for key, preset in self.reports.items() if preset.requested_at < cutoff]:
+            del self.reports[key]
+        computed = 0
+        for key, preset in list(self.reports.items()):
+            try:
+                if await preset.current(now):
+                    continue
+                await self._start(key, preset)
+                computed += 1
+            except Exception as e:
+                print(f"Error precomputing report {key}: {e!r}")
+        return computed
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(seconds_until_hour(settings.REPORT_PRECOMPUTE_HOUR))
+            try:
+                computed = await self.precompute()
+                if computed:
+                    print(f"Precomputed {computed} preset reports")
+            except Exception as e:
+                print("Error precomputing preset reports:", e)
+
+
+report_presets = PresetReports()
@@ -0,0 +1,52 @@
+import asyncio
+import copy
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+
+class RequestCache:
+    """Backend read results shared by everything running inside one request.
+
+    Identical reads are run once, concurrent ones included, and any write
+    clears the cache so later reads see it. Each caller gets its own copy of
+    the rows, since DatabaseService methods reshape the rows they return.
+    """
+
+    def __init__(self):
+        self.reads: Dict[str, "asyncio.Future[Any]"] = {}
+        self.hits = 0
+
+    async def read(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        future = self.reads.get(key)
+        if future is None:
+            future = self.reads[key] = asyncio.ensure_future(fetch())
+        else:
+            self.hits += 1
+        try:
+            response = await asyncio.shield(future)
+        except BaseException:
+            if self.reads.get(key) is future:
+                del self.reads[key]
+            raise
+        shared = copy.copy(response)
+        if isinstance(response.data, list):
+            shared.data = [dict(row) if isinstance(row, dict) else row for row in response.data]
+        return shared
+
+    def invalidate(self) -> None:
+        self.reads.clear()
+
+
+current_request_cache: ContextVar[Optional[RequestCache]] = ContextVar("current_request_cache", default=None)
+
+
+@contextmanager
+def request_cache() -> Iterator[RequestCache]:
+    """Share DatabaseService reads until the block exits"""
+    cache = RequestCache()
+    token = current_request_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        current_request_cache.reset(token)
@@ -0,0 +1,171 @@
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple, Union, get_args, get_origin
+import orjson
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel, TypeAdapter, create_model
+from pydantic_core import PydanticUndefined
+from ..config import settings
+
+# (field name, default factory, nested plan, nested value is a list, scalar conversion)
+Plan = Tuple[Tuple[str, Callable[[], Any], Optional["Plan"], bool, Optional[Callable[[Any], Any]]], ...]
+
+
+def _json_datetime(value: Any) -> str:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    text = value.isoformat()
+    # pydantic writes UTC as Z
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def _json_date(value: Any) -> str:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def _json_int(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    number = Decimal(value) if isinstance(value, str) else value
+    integral = int(number)
+    # Like the model's validation, a fractional value is an error rather than truncated
+    if integral != number:
+        raise ValueError(f"Expected an integer, got {value!r}")
+    return integral
+
+
+# Field types the database returns in another form than the model's JSON output:
+# timestamps with +00:00 offsets, numeric columns as floats or ints
+CONVERSIONS = {datetime: _json_datetime, date: _json_date, int: _json_int, float: float}
+
+
+def _conversion(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Conversion for a scalar or Optional[scalar] annotation, None when values pass through"""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        annotation = args[0] if len(args) == 1 else None
+    return CONVERSIONS.get(annotation)
+
+
+def _nested_model(annotation: Any) -> Tuple[Optional[type], bool]:
+    """The BaseModel inside Optional[Model] / List[Model] annotations"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    origin = get_origin(annotation)
+    if origin is dict:
+        # Mappings are passed through as they are
+        return None, False
+    for arg in get_args(annotation):
+        model, is_list = _nested_model(arg)
+        if model is not None:
+            return model, is_list or origin in (list, List)
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def projection_plan(model: type) -> Plan:
+    plan = []
+    for name, field in model.model_fields.items():
+        if field.default_factory is not None:
+            default = field.default_factory
+        else:
+            value = None if field.default is PydanticUndefined else field.default
+            default = lambda value=value: value
+        nested, is_list = _nested_model(field.annotation)
+        plan.append((name, default, projection_plan(nested) if nested else None, is_list, _conversion(field.annotation)))
+    return tuple(plan)
+
+
+def _project(row: dict, plan: Plan) -> dict:
+    result = {}
+    for name, default, nested, is_list, convert in plan:
+        if name in row:
+            value = row[name]
+            if nested is not None and value is not None:
+                value = [_project(v, nested) for v in value] if is_list else _project(value, nested)
+        else:
+            value = default()
+        if convert is not None and value is not None:
+            value = convert(value)
+        result[name] = value
+    return result
+
+
+def project_rows(model: type, rows: Any) -> Any:
+    """Shape trusted rows like model would, without validating them.
+
+    Keeps exactly the model's fields (dropping embeds and internal columns),
+    fills defaults and recurses into nested models. Timestamps and numbers
+    are converted to the model's JSON form, other values pass through as the
+    database returned them.
+    """
+    plan = projection_plan(model)
+    if isinstance(rows, list):
+        return [_project(row, plan) for row in rows]
+    return _project(rows, plan)
+
+
+@lru_cache(maxsize=None)
+def sparse_model(model: type, fields: Tuple[str, ...]) -> type:
+    """model trimmed to fields, all optional since only the selected columns are fetched"""
+    definitions = {name: (Optional[model.model_fields[name].annotation], None) for name in fields}
+    return create_model(f"{model.__name__}Fields", **definitions)
+
+
+def parse_fields(model: type, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Field names from a ``fields=id,name,status`` parameter, id always included"""
+    if not fields:
+        return None
+    names = ["id"]
+    for name in fields.split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    unknown = [name for name in names if name not in model.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(names)
+
+
+def fields_query(model: type) -> Callable[..., Optional[Tuple[str, ...]]]:
+    """Dependency reading a sparse fieldset for model from the ``fields`` query parameter"""
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma separated {model.__name__} fields to return")
+    ) -> Optional[Tuple[str, ...]]:
+        try:
+            return parse_fields(model, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return dependency
+
+
+@lru_cache(maxsize=None)
+def type_adapter(model: type, many: bool) -> TypeAdapter:
+    return TypeAdapter(List[model] if many else model)
+
+
+def trusted_json(model: type, rows: Any, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    """Serialize DatabaseService rows for a response_model of model (or List[model]).
+
+    With TRUSTED_SERIALIZATION off the rows are validated through a cached
+    TypeAdapter instead, which is still cheaper than FastAPI's per-request
+    response_model validation and catches schema drift while debugging.
+    A sparse fieldset serializes against the model trimmed to those fields.
+    """
+    if fields:
+        model = sparse_model(model, fields)
+    if settings.TRUSTED_SERIALIZATION:
+        return orjson.dumps(project_rows(model, rows))
+    adapter = type_adapter(model, isinstance(rows, list))
+    return adapter.dump_json(adapter.validate_python(rows))
+
+
+def trusted_response(
+    model: type, rows: Any, status_code: int = 200, fields: Optional[Tuple[str, ...]] = None
+) -> Response:
+    return Response(trusted_json(model, rows, fields), status_code=status_code, media_type="application/json")
@@ -0,0 +1,121 @@
+import csv
+import io
+import itertools
+import json
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from ..schemas.time_entry import TimeEntryCreate
+from .database import db
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Guess the import format from the upload's file name or content type"""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def _iter_rows(stream: io.BufferedIOBase, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Lazily yield (line number, raw row) pairs from an uploaded file"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Empty CSV cells mean "not provided", not an empty string
+            yield reader.line_num, {k: (v if v != "" else None) for k, v in row.items() if k}
+    else:
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as e:
+                yield line_number, e
+
+
+def _validate_row(raw: Any, user_id: str) -> TimeEntryCreate:
+    if isinstance(raw, ValueError):
+        raise raw
+    if not isinstance(raw, dict):
+        raise ValueError("Expected a JSON object")
+    # Entries are always imported for the uploading user
+    return TimeEntryCreate(**{**raw, "user_id": user_id})
+
+
+def _error_detail(error: Exception) -> Any:
+    if isinstance(error, ValidationError):
+        return [{"loc": list(e["loc"]), "msg": e["msg"]} for e in error.errors()]
+    return str(error)
+
+
+async def import_time_entries(
+    stream: io.BufferedIOBase,
+    fmt: str,
+    user_id: str,
+    chunk_size: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """Validate and insert time entries chunk by chunk, yielding progress events.
+
+    Only one chunk of rows is held in memory at a time, task access is
+    resolved with one batched lookup per chunk and each chunk is written
+    with a single bulk insert.
+    """
+    rows = _iter_rows(stream, fmt)
+    processed = imported = failed = 0
+
+    while True:
+        # File reads may hit the disk once the upload has been spooled
+        chunk = await run_in_threadpool(list, itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        valid: List[Tuple[int, TimeEntryCreate]] = []
+        for line_number, raw in chunk:
+            try:
+                valid.append((line_number, _validate_row(raw, user_id)))
+            except (ValidationError, ValueError, TypeError) as e:
+                failed += 1
+                yield {"event": "error", "line": line_number, "detail": _error_detail(e)}
+
+        # Resolved again for every chunk so memory stays bounded by the chunk size
+        allowed_tasks: Set[str] = set()
+        task_ids = {str(entry.task_id) for _, entry in valid}
+        if task_ids:
+            for task in await db.get_tasks_with_owner(list(task_ids)):
+                owner = (task.get("projects") or {}).get("user_id")
+                if owner == user_id:
+                    allowed_tasks.add(task["id"])
+
+        to_insert = []
+        for line_number, entry in valid:
+            if str(entry.task_id) not in allowed_tasks:
+                failed += 1
+                yield {"event": "error", "line": line_number, "detail": "Task not found or not enough permissions"}
+                continue
+            to_insert.append(entry.dict())
+
+        if to_insert:
+            try:
+                await db.create_time_entries(to_insert)
+                imported += len(to_insert)
+            except Exception as e:
+                first, last = chunk[0][0], chunk[-1][0]
+                # The backend error may describe the schema, so it is only logged
+                print(f"Error importing lines {first}-{last} for user {user_id}: {e!r}")
+                failed += len(to_insert)
+                yield {
+                    "event": "error",
+                    "lines": [first, last],
+                    "detail": f"Failed to insert lines {first}-{last}"
+                }
+
+        processed += len(chunk)
+        yield {"event": "progress", "processed": processed, "imported": imported, "failed": failed}
+
+    yield {"event": "done", "processed": processed, "imported": imported, "failed": failed}
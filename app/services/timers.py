@@ -0,0 +1,152 @@
+import asyncio
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Any
+from ..config import settings
+from .database import db
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class ActiveTimer:
+    time_entry_id: str
+    user_id: str
+    task_id: str
+    description: Optional[str]
+    start_time: datetime
+    last_heartbeat: datetime = field(default_factory=_now)
+    # Duration (minutes) last written to time_entries, None until the first checkpoint
+    flushed_duration: Optional[int] = None
+
+    def duration(self, until: datetime) -> int:
+        return int((until - self.start_time).total_seconds() // 60)
+
+    def to_row(self, end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        until = end_time or _now()
+        return {
+            "id": self.time_entry_id,
+            "task_id": self.task_id,
+            "user_id": self.user_id,
+            "description": self.description,
+            "start_time": self.start_time.isoformat(),
+            "end_time": end_time.isoformat() if end_time else None,
+            "duration": self.duration(until),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "time_entry_id": self.time_entry_id,
+            "task_id": self.task_id,
+            "user_id": self.user_id,
+            "description": self.description,
+            "start_time": self.start_time,
+            "last_heartbeat": self.last_heartbeat,
+            "elapsed_seconds": int((_now() - self.start_time).total_seconds()),
+        }
+
+
+class TimerRegistry:
+    """In-memory registry of running timers, one per user.
+
+    Heartbeats only touch memory. Running timers are written to time_entries
+    in one bulk upsert per checkpoint, and timers whose heartbeats stop are
+    closed at their last heartbeat. The registry is local to the process.
+    """
+
+    def __init__(self, heartbeat_timeout: int, checkpoint_interval: int):
+        self.heartbeat_timeout = heartbeat_timeout
+        self.checkpoint_interval = checkpoint_interval
+        self._timers: Dict[str, ActiveTimer] = {}
+        self._write_lock = asyncio.Lock()
+
+    def get(self, user_id: str) -> Optional[ActiveTimer]:
+        return self._timers.get(user_id)
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def start(self, user_id: str, task_id: str, description: Optional[str] = None) -> ActiveTimer:
+        if user_id in self._timers:
+            raise ValueError("A timer is already running")
+        now = _now()
+        timer = ActiveTimer(
+            time_entry_id=str(uuid.uuid4()),
+            user_id=user_id,
+            task_id=task_id,
+            description=description,
+            start_time=now,
+            last_heartbeat=now,
+        )
+        self._timers[user_id] = timer
+        return timer
+
+    def heartbeat(self, user_id: str) -> Optional[ActiveTimer]:
+        timer = self._timers.get(user_id)
+        if timer:
+            timer.last_heartbeat = _now()
+        return timer
+
+    async def stop(self, user_id: str) -> Optional[Dict[str, Any]]:
+        timer = self._timers.pop(user_id, None)
+        if timer is None:
+            return None
+        try:
+            async with self._write_lock:
+                rows = await db.upsert_time_entries([timer.to_row(end_time=_now())], return_rows=True)
+        except Exception:
+            # Keep the timer running so the stop can be retried
+            self._timers.setdefault(user_id, timer)
+            raise
+        return rows[0]
+
+    async def checkpoint(self) -> int:
+        """Flush running timers and close stale ones, returns the number of rows written"""
+        now = _now()
+        rows: List[Dict[str, Any]] = []
+        closed: Dict[str, ActiveTimer] = {}
+        # (timer, flushed_duration before this checkpoint)
+        flushed: List[Tuple[ActiveTimer, Optional[int]]] = []
+        for user_id, timer in list(self._timers.items()):
+            if (now - timer.last_heartbeat).total_seconds() > self.heartbeat_timeout:
+                closed[user_id] = self._timers.pop(user_id)
+                rows.append(timer.to_row(end_time=timer.last_heartbeat))
+            elif timer.duration(now) != timer.flushed_duration:
+                flushed.append((timer, timer.flushed_duration))
+                timer.flushed_duration = timer.duration(now)
+                rows.append(timer.to_row())
+        if rows:
+            try:
+                async with self._write_lock:
+                    await db.upsert_time_entries(rows)
+            except Exception:
+                # Nothing was written, the next checkpoint closes and flushes these timers again
+                for user_id, timer in closed.items():
+                    self._timers.setdefault(user_id, timer)
+                for timer, duration in flushed:
+                    timer.flushed_duration = duration
+                raise
+        return len(rows)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                print("Error checkpointing timers:", e)
+
+    async def flush_all(self) -> None:
+        """Write every running timer, used on shutdown"""
+        for timer in self._timers.values():
+            timer.flushed_duration = None
+        await self.checkpoint()
+
+
+timer_registry = TimerRegistry(
+    heartbeat_timeout=settings.TIMER_HEARTBEAT_TIMEOUT_SECONDS,
+    checkpoint_interval=settings.TIMER_CHECKPOINT_SECONDS,
+)
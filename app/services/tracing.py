@@ -0,0 +1,317 @@
+import asyncio
+import functools
+import inspect
+import json
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from ..config import settings
+from .backends import describe_query
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    # "server" for the root span of an incoming request
+    kind: str = "internal"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_ns": self.start_ns,
+            "end_time_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# The active span, or False inside a trace that was not sampled
+current_span: ContextVar[Any] = ContextVar("current_span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple]:
+    """(trace_id, parent_id, sampled) from a W3C traceparent header"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class SpanScope:
+    """Context manager opening a span, a no-op when the trace is not sampled"""
+
+    __slots__ = ("tracer", "name", "attributes", "remote_parent", "span", "token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any], remote_parent: Optional[tuple] = None):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.remote_parent = remote_parent
+        self.span: Optional[Span] = None
+
+    def __enter__(self) -> Optional[Span]:
+        parent = current_span.get()
+        if parent is False:
+            return None
+        if parent is None:
+            if self.remote_parent:
+                trace_id, parent_id, sampled = self.remote_parent
+            else:
+                trace_id, parent_id, sampled = _new_id(128), None, random.random() < self.tracer.sample_rate
+            if not sampled:
+                self.token = current_span.set(False)
+                return None
+        else:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        self.span = Span(trace_id, _new_id(64), parent_id, self.name, time.time_ns(), attributes=self.attributes)
+        self.token = current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not hasattr(self, "token"):
+            return
+        current_span.reset(self.token)
+        if self.span is not None:
+            if exc is not None and not isinstance(exc, asyncio.CancelledError):
+                self.span.error = f"{exc_type.__name__}: {exc}"
+            self.tracer.finish(self.span)
+
+
+class NoopScope:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+NOOP_SCOPE = NoopScope()
+
+
+class JsonLinesExporter:
+    """Appends one JSON object per span to a local file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+OTLP_SPAN_KINDS = {"internal": 1, "server": 2}
+
+
+class OTLPExporter:
+    """Sends spans to an OpenTelemetry collector over OTLP/HTTP with a JSON body"""
+
+    def __init__(self, endpoint: str, service_name: str):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+
+    def payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": _otlp_value(self.service_name)}]},
+            "scopeSpans": [{
+                "scope": {"name": "app.services.tracing"},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                        "name": span.name,
+                        "kind": OTLP_SPAN_KINDS[span.kind],
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+                        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                    }
+                    for span in spans
+                ],
+            }],
+        }]}
+
+    def export(self, spans: List[Span]) -> None:
+        httpx.post(self.url, json=self.payload(spans), timeout=10).raise_for_status()
+
+
+class Tracer:
+    """Collects finished spans and exports them in batches from a background task"""
+
+    def __init__(self, exporter: Optional[Any], sample_rate: float, max_queue: int = 10000):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.max_queue = max_queue
+        self.pending: List[Span] = []
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None and self.sample_rate > 0
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        if not self.enabled:
+            return NOOP_SCOPE
+        return SpanScope(self, name, attributes)
+
+    def finish(self, span: Span) -> None:
+        if span.end_ns is None:
+            span.end_ns = time.time_ns()
+        if len(self.pending) >= self.max_queue:
+            self.dropped += 1
+            return
+        self.pending.append(span)
+
+    def record_query(self, query: Any, seconds: float, error: Optional[BaseException]) -> None:
+        """DatabaseService query hook, adds a finished span for the backend call"""
+        parent = current_span.get()
+        if not parent:
+            return
+        table, operation = describe_query(query)
+        end_ns = time.time_ns()
+        self.finish(Span(
+            parent.trace_id, _new_id(64), parent.span_id, f"backend.{operation} {table}",
+            end_ns - int(seconds * 1e9), end_ns, {"db.table": table, "db.operation": operation},
+            repr(error) if error else None,
+        ))
+
+    async def flush(self) -> None:
+        if not self.pending:
+            return
+        spans, self.pending = self.pending, []
+        try:
+            await run_in_threadpool(self.exporter.export, spans)
+        except Exception as e:
+            print(f"Error exporting {len(spans)} spans:", e)
+
+    async def run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+
+def trace_methods(cls: type, prefix: str) -> type:
+    """Wrap every public coroutine method of cls in a span named prefix.method, when tracing is enabled"""
+    if not tracer.enabled:
+        return cls
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, traced(f"{prefix}.{name}")(method))
+    return cls
+
+
+def traced(name: str) -> Callable:
+    """Decorator opening a span around a coroutine function"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_response_serialization() -> None:
+    """Open a span around FastAPI's response_model validation and encoding, when tracing is enabled.
+
+    serialize_response is private to FastAPI, versions without it go uninstrumented.
+    """
+    from fastapi import routing
+
+    original = getattr(routing, "serialize_response", None)
+    if not tracer.enabled or original is None or getattr(original, "__wrapped__", None):
+        return
+    routing.serialize_response = traced("response.serialize")(original)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span of every HTTP request.
+
+    An incoming W3C ``traceparent`` header continues the caller's trace and
+    sampling decision; otherwise a new trace is sampled at the tracer's rate.
+    """
+
+    def __init__(self, app, tracer: "Tracer"):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        remote_parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        scope_ = SpanScope(self.tracer, f"{scope['method']} {scope['path']}",
+                           {"http.method": scope["method"], "http.target": scope["path"]}, remote_parent)
+        with scope_ as span:
+            await self.app(scope, receive, send_wrapper)
+            if span is not None:
+                span.kind = "server"
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
+                span.set_attribute("http.status_code", status_code)
+
+
+def create_exporter(name: str) -> Optional[Any]:
+    if name == "jsonl":
+        return JsonLinesExporter(settings.TRACING_JSONL_PATH)
+    if name == "otlp":
+        return OTLPExporter(settings.OTLP_ENDPOINT, settings.TRACING_SERVICE_NAME)
+    if name in ("", "none"):
+        return None
+    raise ValueError(f"Unknown TRACING_EXPORTER: {name}")
+
+
+tracer = Tracer(create_exporter(settings.TRACING_EXPORTER), settings.TRACING_SAMPLE_RATE)
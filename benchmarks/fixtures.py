@@ -0,0 +1,153 @@
+"""Seed data for the benchmark suite.
+
+Rows are generated deterministically and loaded straight into a
+MemoryBackend. Every USERS-th row belongs to the benchmark user, so the
+endpoints under test see a realistic slice of a much larger dataset.
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List
+
+from app.services.auth import get_password_hash
+from app.services.backends.memory import MemoryBackend
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+
+# Row counts at scale 1.0
+VOLUMES = {
+    "users": 50,
+    "clients": 2000,
+    "projects": 5000,
+    "tasks": 20000,
+    "time_entries": 60000,
+    "team_members": 10000,
+    "notifications": 5000,
+}
+
+PERIOD_START = date(2024, 1, 1)
+PERIOD_DAYS = 90
+TASK_STATUSES = ["todo", "in_progress", "done"]
+
+
+@dataclass
+class Dataset:
+    """Ids of the benchmark user's rows, used to build request paths"""
+    user_id: str
+    client_ids: List[str] = field(default_factory=list)
+    project_ids: List[str] = field(default_factory=list)
+    task_ids: List[str] = field(default_factory=list)
+    time_entry_ids: List[str] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+
+def _id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def seed(backend: MemoryBackend, scale: float = 1.0, seed: int = 42) -> Dataset:
+    rng = random.Random(seed)
+    counts = {table: max(1, int(count * scale)) for table, count in VOLUMES.items()}
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+
+    users = [
+        {
+            "id": _id(rng),
+            "email": BENCH_EMAIL if i == 0 else f"user{i}@example.com",
+            "full_name": f"User {i}",
+            "hashed_password": hashed_password,
+        }
+        for i in range(counts["users"])
+    ]
+    clients = [
+        {
+            "id": _id(rng),
+            "name": f"Client {i}",
+            "email": f"client{i}@example.com",
+            "user_id": users[i % len(users)]["id"],
+            "hourly_rate": rng.choice([50, 75, 100, 150]),
+        }
+        for i in range(counts["clients"])
+    ]
+    projects = []
+    for i in range(counts["projects"]):
+        client = clients[i % len(clients)]
+        projects.append({
+            "id": _id(rng),
+            "name": f"Project {i}",
+            "client_id": client["id"],
+            "user_id": client["user_id"],
+            "status": rng.choice(["active", "active", "completed"]),
+            "hourly_rate": client["hourly_rate"],
+        })
+    tasks = []
+    for i in range(counts["tasks"]):
+        project = projects[i % len(projects)]
+        due = datetime.combine(PERIOD_START, datetime.min.time(), timezone.utc) + timedelta(days=rng.randrange(PERIOD_DAYS))
+        tasks.append({
+            "id": _id(rng),
+            "project_id": project["id"],
+            "title": f"Task {i}",
+            "status": rng.choice(TASK_STATUSES),
+            "assigned_to": project["user_id"],
+            "due_date": due.isoformat(),
+        })
+    time_entries = []
+    for i in range(counts["time_entries"]):
+        task = tasks[i % len(tasks)]
+        day = PERIOD_START + timedelta(days=rng.randrange(PERIOD_DAYS))
+        start = datetime.combine(day, datetime.min.time(), timezone.utc) + timedelta(hours=rng.randrange(8, 18))
+        duration = rng.randrange(15, 240, 15)
+        is_billable = rng.random() < 0.8
+        time_entries.append({
+            "id": _id(rng),
+            "task_id": task["id"],
+            "user_id": task["assigned_to"],
+            "description": f"Work on {task['title']}",
+            "date": day.isoformat(),
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(minutes=duration)).isoformat(),
+            "duration": duration,
+            "is_billable": is_billable,
+        })
+    team_members = [
+        {
+            "id": _id(rng),
+            "project_id": projects[i % len(projects)]["id"],
+            "user_id": users[rng.randrange(len(users))]["id"],
+            "role": rng.choice(["admin", "manager", "member", "viewer"]),
+        }
+        for i in range(counts["team_members"])
+    ]
+    notifications = [
+        {
+            "id": _id(rng),
+            "user_id": users[i % len(users)]["id"],
+            "type": "task_assigned",
+            "title": f"Notification {i}",
+            "message": "You have been assigned a task",
+            "priority": "medium",
+            "channel": "in_app",
+            "is_read": rng.random() < 0.5,
+        }
+        for i in range(counts["notifications"])
+    ]
+
+    for table, rows in [
+        ("users", users), ("clients", clients), ("projects", projects), ("tasks", tasks),
+        ("time_entries", time_entries), ("team_members", team_members), ("notifications", notifications),
+    ]:
+        backend.load(table, rows)
+    backend.functions["reconcile_time_counters"]()
+
+    user_id = users[0]["id"]
+    return Dataset(
+        user_id=user_id,
+        client_ids=[c["id"] for c in clients if c["user_id"] == user_id],
+        project_ids=[p["id"] for p in projects if p["user_id"] == user_id],
+        task_ids=[t["id"] for t in tasks if t["assigned_to"] == user_id],
+        time_entry_ids=[e["id"] for e in time_entries if e["user_id"] == user_id],
+        counts=counts,
+    )
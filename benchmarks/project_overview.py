@@ -0,0 +1,110 @@
+"""Latency benchmark for GET /api/projects/{project_id}/overview.
+
+DatabaseService._execute is replaced by a blocking sleep of DB_LATENCY_MS,
+which is how the synchronous supabase client behaves on a real network. The
+overview endpoint is compared against the sequential calls a project page
+made before it existed, and the run fails if the overview p95 misses
+P95_TARGET_MS.
+
+    python -m benchmarks.project_overview
+"""
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+
+from app.main import app
+from app.routes.auth import get_current_user
+from app.schemas.user import User
+from app.services.database import db
+from benchmarks import percentile
+
+DB_LATENCY_MS = 20
+# Five sub-queries run concurrently, so the overview must stay well under the
+# five round trips they would cost sequentially.
+P95_TARGET_MS = 4 * DB_LATENCY_MS
+WARMUP_REQUESTS = 10
+REQUESTS = 100
+CONCURRENCY = 1
+TASKS_PER_PROJECT = 50
+
+USER_ID = str(uuid.uuid4())
+PROJECT_ID = str(uuid.uuid4())
+TASK_IDS = [str(uuid.uuid4()) for _ in range(TASKS_PER_PROJECT)]
+
+FIXTURES = {
+    "projects": [{"id": PROJECT_ID, "name": "Website", "client_id": str(uuid.uuid4()), "user_id": USER_ID, "status": "active"}],
+    "tasks": [{"id": tid, "title": f"Task {i}", "project_id": PROJECT_ID} for i, tid in enumerate(TASK_IDS)],
+    "team_members": [{"id": str(uuid.uuid4()), "project_id": PROJECT_ID, "user_id": USER_ID, "role": "admin"}],
+    "time_entries": [
+        {
+            "id": str(uuid.uuid4()),
+            "task_id": TASK_IDS[i % TASKS_PER_PROJECT],
+            "user_id": USER_ID,
+            "start_time": "2024-01-01T09:00:00+00:00",
+            "duration": 30,
+            "tasks": {"title": "Task", "project_id": PROJECT_ID},
+        }
+        for i in range(500)
+    ],
+}
+
+
+def fake_execute(query):
+    time.sleep(DB_LATENCY_MS / 1000)
+    return SimpleNamespace(data=[dict(row) for row in FIXTURES[query.path.strip("/")]])
+
+
+async def patched_execute(query):
+    return await run_in_threadpool(fake_execute, query)
+
+
+async def measure(client, paths, requests=REQUESTS):
+    latencies = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            for path in paths:
+                response = await client.get(path)
+                assert response.status_code == 200, response.text
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def report(name, latencies):
+    print(f"{name:<12} p50={statistics.median(latencies):7.1f}ms  p95={percentile(latencies, 95):7.1f}ms  "
+          f"p99={percentile(latencies, 99):7.1f}ms")
+
+
+async def main() -> int:
+    db._execute = patched_execute
+    app.dependency_overrides[get_current_user] = lambda: User(id=USER_ID, email="bench@example.com", full_name="Bench")
+    legacy_paths = [f"/api/projects/{PROJECT_ID}", f"/api/tasks/project/{PROJECT_ID}"]
+    legacy_paths += [f"/api/time-entries/task/{tid}" for tid in TASK_IDS[:5]]
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        await measure(client, [f"/api/projects/{PROJECT_ID}/overview"], WARMUP_REQUESTS)
+        overview = await measure(client, [f"/api/projects/{PROJECT_ID}/overview"])
+        legacy = await measure(client, legacy_paths, REQUESTS // 4)
+
+    report("overview", overview)
+    report("sequential", legacy)
+    p95 = percentile(overview, 95)
+    if p95 > P95_TARGET_MS:
+        print(f"FAIL: overview p95 {p95:.1f}ms exceeds target {P95_TARGET_MS}ms")
+        return 1
+    print(f"OK: overview p95 {p95:.1f}ms within target {P95_TARGET_MS}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,113 @@
+"""CPU cost of time tracking report aggregation over synthetic report rows.
+
+Compares, per group_by:
+  rows       the old path: a Python loop over the row dicts appending each
+             entry to its group's list (it only knew embed ids, so project
+             put every entry in one "unknown" group)
+  columnar   EntryColumns: rows loaded once into arrays, totals reduced over
+             them and the groups numbered and summed with numpy
+  python     EntryColumns without numpy: the same columns grouped in one
+             Python pass
+
+    python -m benchmarks.report_aggregation [--rows 100000] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+from app.services import report_aggregation
+from app.services.report_aggregation import EntryColumns, group_summary
+
+START = date(2024, 1, 1)
+GROUP_BYS = ("tasks", "project", "project,team_member,date")
+
+
+def report_rows(count):
+    users = [str(uuid.uuid4()) for _ in range(20)]
+    projects = [str(uuid.uuid4()) for _ in range(200)]
+    tasks = [{"id": str(uuid.uuid4()), "project_id": projects[i % len(projects)]} for i in range(2000)]
+    rows = []
+    for i in range(count):
+        task = tasks[(i * 7) % len(tasks)]
+        rows.append({
+            "id": str(uuid.uuid4()), "task_id": task["id"], "user_id": users[i % len(users)],
+            "date": (START + timedelta(days=i % 90)).isoformat(), "duration": 15 + i % 120,
+            "is_billable": i % 3 != 0, "tasks": {**task, "projects": {"id": task["project_id"]}},
+        })
+    return rows
+
+
+def row_path(rows, group_by):
+    """The loop generate_time_tracking_report used, for single dimensions"""
+    def run():
+        total_hours = sum(entry["duration"] for entry in rows)
+        billable_hours = sum(entry["duration"] for entry in rows if entry["is_billable"])
+        grouped_entries = {}
+        for entry in rows:
+            key = str(entry.get(group_by, {}).get("id", "unknown"))
+            if key not in grouped_entries:
+                grouped_entries[key] = {"total_hours": 0, "billable_hours": 0, "non_billable_hours": 0, "entries": []}
+            grouped_entries[key]["total_hours"] += entry["duration"]
+            if entry["is_billable"]:
+                grouped_entries[key]["billable_hours"] += entry["duration"]
+            else:
+                grouped_entries[key]["non_billable_hours"] += entry["duration"]
+            grouped_entries[key]["entries"].append(entry)
+        return total_hours, billable_hours, grouped_entries
+    return run
+
+
+def columnar_path(rows, group_by):
+    def run():
+        columns = EntryColumns.for_report(rows, group_by)
+        total_hours, billable_hours = columns.totals()
+        return total_hours, billable_hours, group_summary(columns.groups(), lambda members: ("entries", members))
+    return run
+
+
+def without_numpy(func):
+    def run():
+        numpy, report_aggregation.numpy = report_aggregation.numpy, None
+        try:
+            return func()
+        finally:
+            report_aggregation.numpy = numpy
+    return run
+
+
+def best_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        func()
+        timings.append((time.process_time() - start) * 1000)
+    return min(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rows = report_rows(args.rows)
+    print(f"{'group_by':<28}{'rows':>8}{'rows ms':>10}{'python ms':>11}{'columnar ms':>13}{'speedup':>9}")
+    for group_by in GROUP_BYS:
+        columnar_ms = best_ms(columnar_path(rows, group_by), args.repeat)
+        python_ms = best_ms(without_numpy(columnar_path(rows, group_by)), args.repeat)
+        # The old loop only grouped by the id of an embed, one dimension at a time
+        if "," in group_by:
+            print(f"{group_by:<28}{args.rows:>8}{'-':>10}{python_ms:>11.1f}{columnar_ms:>13.1f}{'-':>9}")
+            continue
+        rows_ms = best_ms(row_path(rows, group_by), args.repeat)
+        print(
+            f"{group_by:<28}{args.rows:>8}{rows_ms:>10.1f}{python_ms:>11.1f}{columnar_ms:>13.1f}"
+            f"{rows_ms / columnar_ms:>8.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
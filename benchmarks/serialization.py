@@ -0,0 +1,81 @@
+"""Serialization CPU and bytes on the wire for the large report responses.
+
+Each payload is fetched once through the app on the seeded memory backend,
+then rendered repeatedly with the stdlib JSONResponse FastAPI used before and
+the ORJSONResponse now set as the default response class, and compressed at
+the levels CompressionMiddleware uses.
+
+    python -m benchmarks.serialization [--scale 0.25] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+# The backend is chosen when app.services.database is imported
+os.environ["DATABASE_BACKEND"] = "memory"
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.services.auth import create_access_token
+from app.services.compression import brotli, compress
+from app.services.database import db
+from benchmarks.fixtures import BENCH_EMAIL, PERIOD_START, seed
+
+
+def cpu_ms(func, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - start) * 1000 / repeat
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=0.25, help="multiplier for the fixture volumes")
+    parser.add_argument("--repeat", type=int, default=20, help="renders per measurement")
+    args = parser.parse_args(argv)
+
+    data = seed(db.backend, args.scale)
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {create_access_token({'sub': BENCH_EMAIL})}"
+    report = {"name": "bench", "type": "time_tracking", "time_range": "custom",
+              "start_date": PERIOD_START.isoformat(), "end_date": "2024-03-31"}
+    requests = {
+        "time-tracking": ("POST", "/api/reports/generate/time-tracking", {"json": {**report, "project_ids": data.project_ids}}),
+        "time-tracking (norm.)": ("POST", "/api/reports/generate/time-tracking",
+                                  {"params": {"format": "normalized"}, "json": {**report, "project_ids": data.project_ids}}),
+        "client-billing": ("POST", "/api/reports/generate/client-billing", {"json": {**report, "client_ids": data.client_ids[:10]}}),
+        "clients-full-report": ("GET", "/api/reports/clients-full-report", {}),
+        "projects": ("GET", "/api/projects/", {}),
+    }
+
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    header = f"{'endpoint':<22}{'bytes':>11}{'json ms':>10}{'orjson ms':>11}{'speedup':>9}"
+    header += "".join(f"{enc + ' bytes':>12}{enc + ' ms':>9}" for enc in encodings)
+    print(header)
+    for name, (method, path, kwargs) in requests.items():
+        response = client.request(method, path, headers={"Accept-Encoding": "identity"}, **kwargs)
+        assert response.status_code == 200, response.text
+        payload = response.json()
+        body = ORJSONResponse(payload).body
+
+        json_ms = cpu_ms(lambda: JSONResponse(payload), args.repeat)
+        orjson_ms = cpu_ms(lambda: ORJSONResponse(payload), args.repeat)
+        line = f"{name:<22}{len(body):>11,}{json_ms:>10.2f}{orjson_ms:>11.2f}{json_ms / orjson_ms:>8.1f}x"
+        for encoding in encodings:
+            compressed = compress(body, encoding, settings.COMPRESSION_GZIP_LEVEL, settings.COMPRESSION_BROTLI_QUALITY)
+            ms = cpu_ms(lambda: compress(body, encoding, settings.COMPRESSION_GZIP_LEVEL,
+                                         settings.COMPRESSION_BROTLI_QUALITY), max(1, args.repeat // 4))
+            line += f"{len(compressed):>12,}{ms:>9.2f}"
+        print(line)
+    if brotli is None:
+        print("brotli is not installed, only gzip was measured")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
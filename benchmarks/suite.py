@@ -0,0 +1,226 @@
+"""End-to-end benchmark suite for the hot API endpoints.
+
+The app runs in-process on the memory backend, seeded by benchmarks.fixtures
+with thousands of clients, projects, tasks and time entries. Each scenario
+issues real HTTP requests through the full middleware and auth stack and
+reports throughput, p50/p95/p99 latency and the number of backend calls per
+request. Results are compared against benchmarks/baseline.json and the run
+fails when a scenario's p95 regresses by more than P95_TOLERANCE (and at
+least P95_MIN_REGRESSION_MS) or it makes more backend calls than the
+baseline.
+
+    python -m benchmarks.suite [--scale 0.1] [--only reports] [--update-baseline]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# The backend is chosen when app.services.database is imported
+os.environ["DATABASE_BACKEND"] = "memory"
+
+import httpx
+
+from app.main import app
+from app.services.database import db
+from app.services.report_cache import report_cache
+from app.services.report_presets import report_presets
+from benchmarks import percentile
+from benchmarks.fixtures import BENCH_EMAIL, BENCH_PASSWORD, PERIOD_DAYS, PERIOD_START, Dataset, seed
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+P95_TOLERANCE = 0.25
+# Millisecond-scale routes jitter by more than P95_TOLERANCE between runs
+P95_MIN_REGRESSION_MS = 1.0
+WARMUP_REQUESTS = 3
+REQUESTS = 50
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Builds (path, request kwargs) for the i-th request
+    build: Callable[[Dataset, int], tuple]
+    requests: int = REQUESTS
+    expected_status: int = 200
+    # Runs before every request, e.g. to drop cached results
+    before: Optional[Callable[[], None]] = None
+
+
+def _uncached_reports() -> None:
+    """Make every report request run its generator instead of reading a cached result"""
+    report_cache.clear()
+    report_presets.clear()
+
+
+def _report_body(data: Dataset, **extra: Any) -> Dict[str, Any]:
+    return {
+        "name": "bench",
+        "type": "time_tracking",
+        "time_range": "custom",
+        "start_date": PERIOD_START.isoformat(),
+        "end_date": (PERIOD_START + timedelta(days=PERIOD_DAYS // 3)).isoformat(),
+        **extra,
+    }
+
+
+def _time_entry_body(data: Dataset, i: int) -> Dict[str, Any]:
+    return {
+        "task_id": data.task_ids[i % len(data.task_ids)],
+        "user_id": data.user_id,
+        "description": "Benchmark entry",
+        "start_time": f"{PERIOD_START.isoformat()}T09:00:00+00:00",
+        "duration": 30,
+    }
+
+
+# Entries created by time_entries.create, then updated and deleted in turn
+created_ids: List[str] = []
+
+
+def _created(i: int) -> str:
+    return created_ids[i % len(created_ids)]
+
+
+SCENARIOS = [
+    Scenario("auth.login", "POST", lambda d, i: (
+        "/api/auth/token", {"data": {"username": BENCH_EMAIL, "password": BENCH_PASSWORD}}
+    ), requests=10),
+    Scenario("auth.me", "GET", lambda d, i: ("/api/auth/me", {})),
+    Scenario("time_entries.create", "POST", lambda d, i: (
+        f"/api/time-entries/task/{d.task_ids[i % len(d.task_ids)]}", {"json": _time_entry_body(d, i)}
+    )),
+    Scenario("time_entries.list_task", "GET", lambda d, i: (
+        f"/api/time-entries/task/{d.task_ids[i % len(d.task_ids)]}", {}
+    )),
+    Scenario("time_entries.update", "PUT", lambda d, i: (
+        f"/api/time-entries/{_created(i)}", {"json": {"description": "Updated", "duration": 45}}
+    )),
+    Scenario("time_entries.delete", "DELETE", lambda d, i: (
+        f"/api/time-entries/{created_ids.pop()}", {}
+    ), expected_status=204),
+    Scenario("tasks.active", "GET", lambda d, i: ("/api/tasks/active", {})),
+    Scenario("notifications.list", "GET", lambda d, i: ("/api/notifications/?limit=50", {})),
+    Scenario("reports.time_tracking", "POST", lambda d, i: (
+        "/api/reports/generate/time-tracking", {"json": _report_body(d, project_ids=d.project_ids[:10])}
+    ), requests=10, before=_uncached_reports),
+    Scenario("reports.project_stats", "POST", lambda d, i: (
+        "/api/reports/generate/project-stats", {"json": _report_body(d, project_ids=d.project_ids[:10])}
+    ), requests=10, before=_uncached_reports),
+    Scenario("reports.team_productivity", "POST", lambda d, i: (
+        "/api/reports/generate/team-productivity", {"json": _report_body(d, project_ids=d.project_ids[:10])}
+    ), requests=10, before=_uncached_reports),
+    Scenario("reports.client_billing", "POST", lambda d, i: (
+        "/api/reports/generate/client-billing", {"json": _report_body(d, client_ids=d.client_ids[:5])}
+    ), requests=10, before=_uncached_reports),
+    Scenario("reports.clients_full", "GET", lambda d, i: ("/api/reports/clients-full-report", {}), requests=10),
+]
+
+
+class CallCounter:
+    """Counts queries reaching the storage backend"""
+
+    def __init__(self, backend):
+        self.calls = 0
+        self._execute = backend.execute
+        backend.execute = self.execute
+
+    async def execute(self, query):
+        self.calls += 1
+        return await self._execute(query)
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, data: Dataset, counter: CallCounter,
+                       requests: Optional[int] = None) -> Dict[str, float]:
+    requests = requests or scenario.requests
+    latencies = []
+    calls_before = counter.calls
+    started = time.perf_counter()
+    for i in range(requests):
+        path, kwargs = scenario.build(data, i)
+        if scenario.before:
+            scenario.before()
+        start = time.perf_counter()
+        response = await client.request(scenario.method, path, **kwargs)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code != scenario.expected_status:
+            raise RuntimeError(f"{scenario.name}: {response.status_code} {response.text[:200]}")
+        if scenario.name == "time_entries.create":
+            created_ids.append(response.json()["id"])
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "throughput": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "backend_calls": round((counter.calls - calls_before) / requests, 1),
+    }
+
+
+def compare(name: str, result: Dict[str, float], baseline: Optional[Dict[str, float]]) -> List[str]:
+    line = (f"{name:<28} {result['throughput']:8.1f} req/s  p50={result['p50_ms']:8.2f}ms  "
+            f"p95={result['p95_ms']:8.2f}ms  p99={result['p99_ms']:8.2f}ms  calls={result['backend_calls']:6.1f}")
+    if baseline is None:
+        print(line + "  (no baseline)")
+        return []
+    p95_change = (result["p95_ms"] - baseline["p95_ms"]) / baseline["p95_ms"] if baseline["p95_ms"] else 0
+    print(line + f"  p95 {p95_change:+.0%}  calls {result['backend_calls'] - baseline['backend_calls']:+.1f}")
+    failures = []
+    if p95_change > P95_TOLERANCE and result["p95_ms"] - baseline["p95_ms"] > P95_MIN_REGRESSION_MS:
+        failures.append(f"{name}: p95 {result['p95_ms']}ms vs baseline {baseline['p95_ms']}ms")
+    if result["backend_calls"] > baseline["backend_calls"]:
+        failures.append(f"{name}: {result['backend_calls']} backend calls vs baseline {baseline['backend_calls']}")
+    return failures
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the fixture volumes")
+    parser.add_argument("--requests", type=int, help="override the per-scenario request count")
+    parser.add_argument("--only", help="run scenarios whose name starts with this prefix")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    data = seed(db.backend, args.scale)
+    print(f"Seeded {data.counts} in {time.perf_counter() - started:.1f}s")
+    counter = CallCounter(db.backend)
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    scenarios = [s for s in SCENARIOS if not args.only or s.name.startswith(args.only)]
+
+    results = {}
+    failures = []
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        response = await client.post("/api/auth/token", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD})
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        for scenario in scenarios:
+            # The routes print debugging output, keep it out of the results
+            with contextlib.redirect_stdout(io.StringIO()):
+                if scenario.name not in ("time_entries.create", "time_entries.delete"):
+                    await run_scenario(client, scenario, data, counter, WARMUP_REQUESTS)
+                results[scenario.name] = await run_scenario(client, scenario, data, counter, args.requests)
+            failures += compare(scenario.name, results[scenario.name], baseline.get(scenario.name))
+
+    if args.update_baseline:
+        baseline.update(results)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,119 @@
+"""Serialization cost of list endpoints with 10k trusted database rows.
+
+Compares, per response model:
+  fastapi    the old path: fromisoformat loops, FastAPI response_model
+             validation and serialization, then rendering
+  adapter    validation through a cached TypeAdapter (TRUSTED_SERIALIZATION=false)
+  trusted    projection of the rows onto the model fields (the default)
+
+    python -m benchmarks.trusted_serialization [--rows 10000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.config import settings
+from app.schemas.project import Project
+from app.schemas.task import Task
+from app.schemas.time_entry import TimeEntry
+from app.services.serialization import trusted_json
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def project_row(i):
+    return {
+        "id": str(uuid.uuid4()), "created_at": START.isoformat(), "updated_at": START.isoformat(),
+        "name": f"Project {i}", "description": "A project", "client_id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()), "status": "active", "start_date": START.isoformat(),
+        "end_date": (START + timedelta(days=90)).isoformat(), "client_name": "Client",
+        "tracked_minutes": 120, "billable_minutes": 90,
+    }
+
+
+def task_row(i):
+    return {
+        "id": str(uuid.uuid4()), "created_at": START.isoformat(), "updated_at": START.isoformat(),
+        "title": f"Task {i}", "description": None, "project_id": str(uuid.uuid4()), "status": "in_progress",
+        "priority": "medium", "assigned_to": str(uuid.uuid4()), "due_date": (START + timedelta(days=i % 90)).isoformat(),
+        "category_id": None, "tracked_minutes": 60, "billable_minutes": 30,
+    }
+
+
+def time_entry_row(i):
+    start = START + timedelta(minutes=30 * i)
+    return {
+        "id": str(uuid.uuid4()), "created_at": START.isoformat(), "updated_at": START.isoformat(),
+        "task_id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()), "description": "Work",
+        "start_time": start.isoformat(), "end_time": (start + timedelta(minutes=30)).isoformat(), "duration": 30,
+        "is_billable": True, "tasks": {"title": "Task"}, "time_entry_files": [],
+    }
+
+
+CASES = [
+    ("projects", Project, project_row, ("start_date", "end_date")),
+    ("tasks", Task, task_row, ("due_date",)),
+    ("time_entries", TimeEntry, time_entry_row, ()),
+]
+
+
+def fastapi_path(model, rows, date_fields):
+    field = create_response_field(name="Response", type_=List[model])
+
+    def run():
+        # Handlers used to re-parse dates in place before returning the rows
+        rows_ = [dict(row) for row in rows]
+        for row in rows_:
+            for name in date_fields:
+                if isinstance(row.get(name), str):
+                    row[name] = datetime.fromisoformat(row[name])
+        content = asyncio.run(serialize_response(field=field, response_content=rows_))
+        return ORJSONResponse(content).body
+    return run
+
+
+def trusted_path(model, rows, trusted):
+    def run():
+        settings.TRUSTED_SERIALIZATION = trusted
+        return trusted_json(model, rows)
+    return run
+
+
+def best_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    trusted_setting = settings.TRUSTED_SERIALIZATION
+    print(f"{'model':<14}{'rows':>7}{'fastapi ms':>12}{'adapter ms':>12}{'trusted ms':>12}{'speedup':>9}")
+    for name, model, make_row, date_fields in CASES:
+        rows = [make_row(i) for i in range(args.rows)]
+        fastapi_ms = best_ms(fastapi_path(model, rows, date_fields), args.repeat)
+        adapter_ms = best_ms(trusted_path(model, rows, False), args.repeat)
+        trusted_ms = best_ms(trusted_path(model, rows, True), args.repeat)
+        print(f"{name:<14}{args.rows:>7}{fastapi_ms:>12.1f}{adapter_ms:>12.1f}{trusted_ms:>12.1f}"
+              f"{fastapi_ms / trusted_ms:>8.1f}x")
+    settings.TRUSTED_SERIALIZATION = trusted_setting
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import os
+import uuid
+from contextlib import contextmanager
+
+# The backend is chosen when app.services.database is imported
+os.environ["DATABASE_BACKEND"] = "memory"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.auth import create_access_token
+from app.services.backends.memory import MemoryBackend
+from app.services.database import db
+from app.services.query_log import capture_queries
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Fresh in-memory backend behind the shared DatabaseService"""
+    backend = MemoryBackend()
+    monkeypatch.setattr(db, "backend", backend)
+    return backend
+
+
+@pytest.fixture
+def user(backend):
+    row = {"id": str(uuid.uuid4()), "email": "test@example.com", "full_name": "Test User", "hashed_password": "x"}
+    backend.load("users", [row])
+    return row
+
+
+@pytest.fixture
+def client(user):
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {create_access_token({'sub': user['email']})}"
+    return client
+
+
+@pytest.fixture
+def make_project(backend, user):
+    """Factory loading a client of the user, a project of it and the project's tasks and time entries.
+
+    tasks and entries are counts or lists of column overrides, entries go to
+    the tasks round robin. The returned project row carries its client,
+    tasks and entries:
+
+        project = make_project(tasks=[{"title": "Design"}], entries=1, status="active")
+        project["client"], project["tasks"][0], project["entries"][0]
+    """
+    def make(tasks=1, entries=0, client=None, **columns):
+        client = {"id": str(uuid.uuid4()), "name": "Acme", "user_id": user["id"], **(client or {})}
+        project = {"id": str(uuid.uuid4()), "name": "Website", "client_id": client["id"], "user_id": user["id"], **columns}
+        tasks = [
+            {"id": str(uuid.uuid4()), "project_id": project["id"], "title": f"Task {i}", "status": "in_progress", **overrides}
+            for i, overrides in enumerate([{}] * tasks if isinstance(tasks, int) else tasks)
+        ]
+        entries = [
+            {
+                "id": str(uuid.uuid4()),
+                "task_id": tasks[i % len(tasks)]["id"],
+                "user_id": user["id"],
+                "date": "2024-01-01",
+                "start_time": "2024-01-01T09:00:00+00:00",
+                "duration": 30,
+                **overrides,
+            }
+            for i, overrides in enumerate([{}] * entries if isinstance(entries, int) else entries)
+        ]
+        backend.load("clients", [client])
+        backend.load("projects", [project])
+        backend.load("tasks", tasks)
+        backend.load("time_entries", entries)
+        return {**project, "client": client, "tasks": tasks, "entries": entries}
+
+    return make
+
+
+@pytest.fixture
+def project(make_project):
+    """A project with one task and no time entries"""
+    return make_project()
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager failing the test when the block makes more than max_calls backend calls.
+
+        with query_budget(2):
+            client.get("/api/projects/")
+    """
+    @contextmanager
+    def budget(max_calls):
+        with capture_queries() as log:
+            yield log
+        assert len(log) <= max_calls, f"{len(log)} backend calls, budget is {max_calls}:\n{log.summary()}"
+
+    return budget
@@ -0,0 +1,60 @@
+import uuid
+
+import pytest
+
+from app.services.query_log import capture_queries
+
+
+@pytest.fixture
+def project(make_project):
+    return make_project(tasks=[{"title": "Design"}])
+
+
+def test_batch_returns_every_response(client, project):
+    with capture_queries() as log:
+        response = client.post("/api/batch", json={"requests": [
+            {"id": "me", "path": "/api/auth/me"},
+            {"id": "projects", "path": "/api/projects/?fields=name"},
+            {"id": "active", "path": "/api/tasks/active"},
+            {"id": "clients", "path": "/api/clients/"},
+            {"id": "missing", "path": f"/api/projects/{uuid.uuid4()}"},
+        ]})
+    assert response.status_code == 200
+    responses = {r["id"]: r for r in response.json()["responses"]}
+    assert [r["id"] for r in response.json()["responses"]] == ["me", "projects", "active", "clients", "missing"]
+    assert responses["me"]["body"]["email"] == "test@example.com"
+    assert responses["projects"]["body"] == [{"id": project["id"], "name": "Website"}]
+    assert "etag" in responses["projects"]["headers"]
+    assert [t["title"] for t in responses["active"]["body"]] == ["Design"]
+    assert responses["missing"]["status"] == 404
+
+    # One user lookup for the whole batch
+    assert [record.table for record in log.records].count("users") == 1
+
+
+def test_identical_reads_run_once(client, project):
+    with capture_queries() as log:
+        response = client.post("/api/batch", json={"requests": [{"path": "/api/clients/"}] * 3})
+    assert [r["status"] for r in response.json()["responses"]] == [200] * 3
+    assert [record.table for record in log.records] == ["users", "collection_versions", "clients"]
+
+
+def test_writes_apply_in_order(client, project):
+    task_id = project["tasks"][0]["id"]
+    response = client.post("/api/batch", json={"requests": [
+        {"id": "before", "path": f"/api/tasks/{task_id}"},
+        {"id": "rename", "method": "PUT", "path": f"/api/tasks/{task_id}", "body": {"title": "Redesign"}},
+        {"id": "after", "path": f"/api/tasks/{task_id}"},
+    ]})
+    responses = {r["id"]: r for r in response.json()["responses"]}
+    assert responses["before"]["body"]["title"] == "Design"
+    assert responses["rename"]["status"] == 200
+    assert responses["after"]["body"]["title"] == "Redesign"
+
+
+def test_batch_validation(client, project):
+    assert client.post("/api/batch", json={"requests": [{"path": "/api/batch"}]}).status_code == 400
+    too_many = [{"path": "/api/auth/me"}] * 21
+    assert client.post("/api/batch", json={"requests": too_many}).status_code == 400
+    client.headers.pop("Authorization")
+    assert client.post("/api/batch", json={"requests": [{"path": "/api/auth/me"}]}).status_code == 401
@@ -0,0 +1,104 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.services import compression
+from app.services.compression import CompressionMiddleware, identity_refused, negotiate_encoding
+
+BODY = b'{"rows": "' + b"x" * 4000 + b'"}'
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/big")
+    def big():
+        return Response(BODY, media_type="application/json", headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    def small():
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(BODY), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/image")
+    def image():
+        return Response(BODY, media_type="image/png")
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip; level=1; q=0.8, br; q=0.9", "br"),
+    ("*", "br"),
+    ("*;q=0.5, gzip;q=0", "br"),
+    ("deflate", None),
+    ("gzip;q=0", None),
+    ("gzip;q=oops", None),
+    ("", None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_negotiate_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate_encoding("br, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("br") is None
+
+
+def test_identity_refused():
+    assert identity_refused("gzip, identity;q=0")
+    assert identity_refused("gzip, *;q=0")
+    assert not identity_refused("gzip, *;q=0, identity")
+    assert not identity_refused("gzip")
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_large_json_is_compressed(client, encoding):
+    response = client.get("/big", headers={"Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"abc"'
+    assert int(response.headers["content-length"]) < len(BODY)
+    # Decoded by the test client
+    assert response.content == BODY
+
+
+def test_small_bodies_stay_uncompressed_unless_identity_is_refused(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    # Another Accept-Encoding could still get a compressed body
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    response = client.get("/small", headers={"Accept-Encoding": "gzip, identity;q=0"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == {"ok": True}
+
+
+def test_encoded_and_binary_responses_pass_through(client):
+    response = client.get("/encoded", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == BODY
+    assert "vary" not in response.headers
+
+    response = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == BODY
+
+
+def test_clients_without_compression_get_the_plain_body(client):
+    response = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"abc"'
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == BODY
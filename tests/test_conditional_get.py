@@ -0,0 +1,58 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services.database import db
+from app.services.query_log import capture_queries
+
+
+@pytest.mark.parametrize("path", ["/api/projects/", "/api/tasks/active", "/api/clients/"])
+def test_unchanged_collection_is_not_modified(client, project, path):
+    first = client.get(path)
+    etag = first.headers["ETag"]
+    with capture_queries() as log:
+        response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    # Only the current user and the collection versions, no collection queries
+    assert [record.table for record in log.records] == ["users", "collection_versions"]
+
+
+def test_writes_change_the_etag(client, project):
+    etags = {path: client.get(path).headers["ETag"] for path in ("/api/projects/", "/api/tasks/active")}
+
+    assert client.put(f"/api/tasks/{project['tasks'][0]['id']}", json={"title": "Redesign"}).status_code == 200
+    response = client.get("/api/tasks/active", headers={"If-None-Match": etags["/api/tasks/active"]})
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Redesign"
+
+    # Projects embed the client name
+    assert client.put(f"/api/clients/{project['client']['id']}", json={"name": "Acme Inc"}).status_code == 200
+    response = client.get("/api/projects/", headers={"If-None-Match": etags["/api/projects/"]})
+    assert response.status_code == 200
+    assert response.json()[0]["client_name"] == "Acme Inc"
+
+
+def test_only_the_owners_writes_change_the_etag(client, project):
+    etag = client.get("/api/clients/").headers["ETag"]
+    asyncio.run(db.create_client({"name": "Elsewhere", "user_id": str(uuid.uuid4())}))
+    assert client.get("/api/clients/", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.post("/api/clients/", json={"name": "Mine"}).status_code == 200
+    assert client.get("/api/clients/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_writes_from_other_processes_change_the_etag(client, backend, project):
+    etag = client.get("/api/tasks/active").headers["ETag"]
+    # Straight to the backend, skipping this process's DatabaseService
+    update = backend.table("tasks").update({"title": "Renamed elsewhere"}).eq("id", project["tasks"][0]["id"])
+    asyncio.run(backend.execute(update))
+    response = client.get("/api/tasks/active", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Renamed elsewhere"
+
+
+def test_query_string_is_part_of_the_etag(client, project):
+    etag = client.get("/api/projects/").headers["ETag"]
+    assert client.get("/api/projects/", params={"fields": "name"}, headers={"If-None-Match": etag}).status_code == 200
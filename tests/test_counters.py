@@ -0,0 +1,49 @@
+import asyncio
+
+from app.services.database import db
+
+
+def counters(backend, project):
+    rows = [backend.tables["projects"][project["id"]]] + [backend.tables["tasks"][t["id"]] for t in project["tasks"]]
+    return [(row["tracked_minutes"], row["billable_minutes"]) for row in rows]
+
+
+def assert_counters_match_recompute(backend, project):
+    incremental = counters(backend, project)
+    assert asyncio.run(db.reconcile_time_counters()) == 0
+    assert counters(backend, project) == incremental
+
+
+def test_counters_follow_time_entry_writes(client, user, make_project, backend):
+    project = make_project(tasks=2)
+    task_id = project["tasks"][0]["id"]
+    entry = {"task_id": task_id, "user_id": user["id"], "start_time": "2024-01-02T09:00:00+00:00", "duration": 30}
+    entry_id = client.post(f"/api/time-entries/task/{task_id}", json=entry).json()["id"]
+    assert counters(backend, project) == [(30, 30), (30, 30), (0, 0)]
+    assert_counters_match_recompute(backend, project)
+
+    assert client.put(f"/api/time-entries/{entry_id}", json={"duration": 45}).status_code == 200
+    assert counters(backend, project)[0] == (45, 45)
+    assert_counters_match_recompute(backend, project)
+
+    # Flipping billable moves the minutes out of the billable counter
+    asyncio.run(db.update_time_entry(entry_id, {"is_billable": False}))
+    assert counters(backend, project)[0] == (45, 0)
+    assert_counters_match_recompute(backend, project)
+
+    # Upserts without is_billable keep the stored flag
+    asyncio.run(db.upsert_time_entries([{"id": entry_id, "task_id": task_id, "user_id": user["id"], "duration": 60}]))
+    assert counters(backend, project)[0] == (60, 0)
+    assert_counters_match_recompute(backend, project)
+
+    assert client.delete(f"/api/time-entries/{entry_id}").status_code in (200, 204)
+    assert counters(backend, project) == [(0, 0), (0, 0), (0, 0)]
+    assert_counters_match_recompute(backend, project)
+
+
+def test_reconciliation_repairs_drift(make_project, backend):
+    project = make_project(entries=[{"duration": 20}, {"duration": 40, "is_billable": False}])
+    # Loaded rows bypass the incremental counters
+    assert asyncio.run(db.reconcile_time_counters()) == 2
+    assert counters(backend, project) == [(60, 20), (60, 20)]
+    assert_counters_match_recompute(backend, project)
@@ -0,0 +1,44 @@
+import pytest
+
+
+@pytest.fixture
+def project(make_project):
+    return make_project(
+        tasks=[{"title": "Design"}], entries=1,
+        client={"email": "billing@acme.test"}, description="Relaunch", status="active",
+    )
+
+
+def test_projects_return_only_requested_fields(client, project, backend, monkeypatch):
+    selects = []
+    execute = backend.execute
+
+    async def spy(query):
+        selects.append(query.select_text)
+        return await execute(query)
+
+    monkeypatch.setattr(backend, "execute", spy)
+    response = client.get("/api/projects/", params={"fields": "name,status,client_name"})
+    assert response.status_code == 200
+    assert response.json() == [{"id": project["id"], "name": "Website", "status": "active", "client_name": "Acme"}]
+    assert selects[-1] == "id, name, status, clients(name)"
+
+
+def test_list_endpoints_accept_fields(client, project):
+    task_id = project["tasks"][0]["id"]
+    cases = {
+        "/api/clients/": ["id", "name"],
+        f"/api/tasks/project/{project['id']}": ["id", "title"],
+        "/api/tasks/active": ["id", "title"],
+        f"/api/time-entries/task/{task_id}": ["id", "duration"],
+    }
+    for path, fields in cases.items():
+        response = client.get(path, params={"fields": ",".join(fields[1:])})
+        assert response.status_code == 200, path
+        assert [sorted(row) for row in response.json()] == [sorted(fields)], path
+
+
+def test_unknown_field_is_rejected(client, project):
+    response = client.get("/api/projects/", params={"fields": "name,hashed_password"})
+    assert response.status_code == 400
+    assert "hashed_password" in response.json()["detail"]
@@ -0,0 +1,59 @@
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.schemas.project import Project
+from app.services.includes import TRUNCATED_HEADER
+
+
+@pytest.fixture
+def client_tree(make_project, backend):
+    project = make_project(tasks=[{"created_at": f"2024-01-0{i + 1}T00:00:00+00:00"} for i in range(3)], entries=1)
+    backend.load("client_files", [{"id": str(uuid.uuid4()), "client_id": project["client"]["id"], "file_name": "brief.pdf"}])
+    return {"client": project["client"], "project": project, "tasks": project["tasks"], "entry": project["entries"][0]}
+
+
+def test_client_detail_in_one_query(client, client_tree, query_budget):
+    client_id = client_tree["client"]["id"]
+    # The current user lookup and the client with its includes
+    with query_budget(2):
+        response = client.get(f"/api/clients/{client_id}", params={"include": "projects.tasks.time_entries,files"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "Acme"
+    assert [f["file_name"] for f in body["files"]] == ["brief.pdf"]
+    [project] = body["projects"]
+    assert project["name"] == "Website"
+    assert [t["title"] for t in project["tasks"]] == ["Task 0", "Task 1", "Task 2"]
+    assert [e["id"] for e in project["tasks"][0]["time_entries"]] == [client_tree["entry"]["id"]]
+    # Included rows are shaped like their own endpoints
+    assert set(project) == set(Project.model_fields) | {"tasks"}
+    assert TRUNCATED_HEADER not in response.headers
+
+
+def test_project_includes_its_client(client, client_tree):
+    project_id = client_tree["project"]["id"]
+    body = client.get(f"/api/projects/{project_id}", params={"include": "client,team_members"}).json()
+    assert body["client"]["name"] == "Acme"
+    assert body["team_members"] == []
+    assert "tasks" not in body
+
+
+def test_include_is_capped(client, client_tree, monkeypatch):
+    monkeypatch.setattr(settings, "INCLUDE_MAX_ROWS", 2)
+    project_id = client_tree["project"]["id"]
+    response = client.get(f"/api/projects/{project_id}", params={"include": "tasks"})
+    assert [t["title"] for t in response.json()["tasks"]] == ["Task 0", "Task 1"]
+    assert response.headers[TRUNCATED_HEADER] == "tasks"
+
+
+def test_without_include_the_detail_is_unchanged(client, client_tree):
+    body = client.get(f"/api/clients/{client_tree['client']['id']}").json()
+    assert "projects" not in body and "files" not in body
+
+
+@pytest.mark.parametrize("include", ["invoices", "projects.owner", "projects.tasks.time_entries.files"])
+def test_unknown_or_deep_includes_are_rejected(client, client_tree, include):
+    response = client.get(f"/api/clients/{client_tree['client']['id']}", params={"include": include})
+    assert response.status_code == 400
@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+from app.services.loop_watchdog import LoopWatchdog
+from app.services.metrics import Metrics
+
+
+def blocking_handler():
+    time.sleep(0.3)
+
+
+def test_blocked_loop_is_reported_with_its_stack(capsys):
+    registry = Metrics()
+    watchdog = LoopWatchdog(interval=0.01, threshold=0.1, registry=registry)
+
+    async def run():
+        task = asyncio.create_task(watchdog.run())
+        await asyncio.sleep(0.05)
+        blocking_handler()
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+
+    assert sum(registry.event_loop_blocked.values.values()) == 1
+    [(counts, total)] = registry.event_loop_lag.values.values()
+    # Most wakeups are on time, the one after the stall is late by about its length
+    assert sum(counts) > 2 and total[0] >= 0.2
+    out = capsys.readouterr().out
+    assert "Event loop blocked for" in out
+    assert "in blocking_handler" in out
+    assert "Event loop lag of" in out
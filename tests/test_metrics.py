@@ -0,0 +1,51 @@
+import re
+
+from app.services.metrics import Histogram, Metrics, RequestStats
+
+
+def sample(client, name, **labels):
+    """Value of one /metrics sample, 0 when it has not been recorded yet"""
+    body = client.get("/metrics").text
+    label_text = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    match = re.search(rf"^{re.escape(name)}{{{re.escape(label_text)}}} (\S+)$", body, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_routes_report_latency_and_backend_calls(client, project):
+    route = {"method": "GET", "route": "/api/projects/{project_id}"}
+    requests = sample(client, "http_request_duration_seconds_count", status="200", **route)
+    calls = sample(client, "http_request_backend_calls_sum", **route)
+    missing = sample(client, "http_request_duration_seconds_count", status="404", **route)
+
+    assert client.get(f"/api/projects/{project['id']}").status_code == 200
+    assert client.get("/api/projects/00000000-0000-0000-0000-000000000000").status_code == 404
+
+    # Labelled with the route template, not the project id
+    assert sample(client, "http_request_duration_seconds_count", status="200", **route) == requests + 1
+    assert sample(client, "http_request_duration_seconds_count", status="404", **route) == missing + 1
+    # The user lookup and the project, for each of the two requests
+    assert sample(client, "http_request_backend_calls_sum", **route) == calls + 4
+    assert sample(client, "backend_query_duration_seconds_count", operation="select", table="projects") > 0
+    assert sample(client, "http_requests_in_flight", method="GET") == 1
+
+
+def test_histogram_rendering():
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, route="/a")
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_request_stats_count_backend_calls():
+    registry = Metrics()
+    stats = RequestStats(backend_calls=3, backend_seconds=0.02)
+    registry.record_request("GET", "/api/clients/", 200, 0.03, stats)
+    rendered = registry.render()
+    assert 'http_request_backend_calls_bucket{method="GET",route="/api/clients/",le="3"} 1' in rendered
+    assert 'http_request_backend_calls_bucket{method="GET",route="/api/clients/",le="2"} 0' in rendered
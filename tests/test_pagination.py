@@ -0,0 +1,82 @@
+import pytest
+
+from app.services.backends.memory import parse_logic_tree
+
+
+@pytest.fixture
+def project(make_project):
+    return make_project(tasks=[
+        {
+            "title": f"Task {i:02d}",
+            "status": "done" if i % 4 == 0 else "in_progress",
+            "priority": "high" if i % 2 else "low",
+            # Every third task has no due date, and due dates repeat to exercise the id tie breaker
+            "due_date": None if i % 3 == 0 else f"2024-01-{1 + i % 5:02d}T12:00:00+00:00",
+            "created_at": f"2024-01-01T00:00:{i:02d}+00:00",
+        }
+        for i in range(23)
+    ])
+
+
+def walk(client, path, **params):
+    """Follow X-Next-Cursor through every page, returning the pages' rows"""
+    pages, cursor = [], None
+    while True:
+        response = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def expected_order(tasks, column, desc):
+    present = sorted((t for t in tasks if t[column] is not None), key=lambda t: (t[column], t["id"]), reverse=desc)
+    missing = sorted((t for t in tasks if t[column] is None), key=lambda t: t["id"], reverse=desc)
+    return [t["id"] for t in (missing + present if desc else present + missing)]
+
+
+@pytest.mark.parametrize("sort", ["due_date", "-due_date", "title", "-created_at"])
+def test_keyset_pages_cover_every_task_once(client, project, sort):
+    pages = walk(client, f"/api/tasks/project/{project['id']}", sort=sort, limit=5, fields="title")
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    ids = [task["id"] for page in pages for task in page]
+    assert ids == expected_order(project["tasks"], sort.lstrip("-"), sort.startswith("-"))
+    assert all(sorted(task) == ["id", "title"] for page in pages for task in page)
+
+
+def test_task_filters(client, project):
+    response = client.get(f"/api/tasks/project/{project['id']}", params={
+        "status": "in_progress", "priority": "high", "due_from": "2024-01-02", "due_to": "2024-01-03",
+    })
+    expected = {
+        t["id"] for t in project["tasks"]
+        if t["status"] == "in_progress" and t["priority"] == "high"
+        and t["due_date"] and "2024-01-02" <= t["due_date"][:10] <= "2024-01-03"
+    }
+    assert expected and {t["id"] for t in response.json()} == expected
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_invalid_sort_and_cursor(client, project):
+    path = f"/api/tasks/project/{project['id']}"
+    assert client.get(path, params={"sort": "hashed_password"}).status_code == 400
+    assert client.get(path, params={"cursor": "not-a-cursor"}).status_code == 400
+    cursor = client.get(path, params={"sort": "title", "limit": 2}).headers["X-Next-Cursor"]
+    assert client.get(path, params={"sort": "-title", "cursor": cursor}).status_code == 400
+
+
+def test_projects_and_clients_paginate(client, project):
+    response = client.get("/api/projects/", params={"status": "active", "limit": 1})
+    assert [p["id"] for p in response.json()] == [project["id"]]
+    assert "X-Next-Cursor" not in response.headers
+    assert client.get("/api/clients/", params={"sort": "-name", "limit": 10}).status_code == 200
+
+
+def test_logic_tree_quoting():
+    tree = parse_logic_tree('title.gt."a,b.(c)",and(title.eq."say \\"hi\\"",id.not.in.(1,2)),due_date.is.null')
+    assert tree == ("or", False, (
+        ("cond", False, "title", "gt", "a,b.(c)"),
+        ("and", False, (("cond", False, "title", "eq", 'say "hi"'), ("cond", True, "id", "in", ["1", "2"]))),
+        ("cond", False, "due_date", "is", "null"),
+    ))
@@ -0,0 +1,86 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.database import db
+from app.services.query_log import QueryLogMiddleware, capture_queries
+
+
+@pytest.fixture
+def project(make_project):
+    return make_project(tasks=10, entries=10)
+
+
+def test_current_user(client, query_budget):
+    with query_budget(1):
+        assert client.get("/api/auth/me").status_code == 200
+
+
+def test_project_list(client, project, query_budget):
+    with query_budget(3):
+        response = client.get("/api/projects/")
+    assert [p["id"] for p in response.json()] == [project["id"]]
+
+
+def test_project_overview(client, project, query_budget):
+    with query_budget(5):
+        response = client.get(f"/api/projects/{project['id']}/overview")
+    assert response.status_code == 200
+    assert len(response.json()["tasks"]) == 10
+
+
+def test_foreign_project_overview_loads_nothing_else(client, backend):
+    project_id = str(uuid.uuid4())
+    backend.load("projects", [{"id": project_id, "name": "Theirs", "user_id": str(uuid.uuid4())}])
+    with capture_queries() as log:
+        response = client.get(f"/api/projects/{project_id}/overview")
+    assert response.status_code == 403
+    assert [record.table for record in log.records] == ["users", "projects"]
+
+
+def test_active_tasks(client, project, query_budget):
+    with query_budget(4):
+        response = client.get("/api/tasks/active")
+    assert len(response.json()) == 10
+
+
+def test_calendar(client, project, query_budget):
+    with query_budget(2):
+        response = client.get("/api/time-entries/", params={"start_date": "2024-01-01", "end_date": "2024-01-31"})
+    assert len(response.json()) == 10
+
+
+def test_create_time_entry(client, user, project, query_budget):
+    task_id = project["tasks"][0]["id"]
+    entry = {"task_id": task_id, "user_id": user["id"], "start_time": "2024-01-02T09:00:00+00:00", "duration": 15}
+    with query_budget(5):
+        response = client.post(f"/api/time-entries/task/{task_id}", json=entry)
+    assert response.status_code == 200
+
+
+def test_repeated_query_shapes_are_flagged(project):
+    async def load_each_task():
+        for task in project["tasks"]:
+            await db.get_task_time_entries(task["id"])
+
+    with capture_queries() as log:
+        asyncio.run(load_each_task())
+
+    assert log.repeated(threshold=5) == [(("time_entries", "select", (("task_id", "eq"),)), 10)]
+    assert log.repeated(threshold=10) == []
+
+
+def test_debug_middleware_flags_n_plus_one(project, capsys):
+    app = FastAPI()
+    app.add_middleware(QueryLogMiddleware, repeat_threshold=5)
+
+    @app.get("/entries")
+    async def entries():
+        return [len(await db.get_task_time_entries(task["id"])) for task in project["tasks"]]
+
+    response = TestClient(app).get("/entries")
+    assert response.headers["X-Backend-Calls"] == "10"
+    assert "Possible N+1 in GET /entries: 10 backend calls\n10x select time_entries (task_id eq)" in capsys.readouterr().out
@@ -0,0 +1,401 @@
+import asyncio
+import uuid
+from datetime import date, datetime, timezone
+from functools import partial
+
+import pytest
+
+from app.config import settings
+from app.routes import reports
+from app.services import report_aggregation, report_presets
+from app.schemas.report import ReportCreate
+from app.services.query_log import capture_queries
+from app.services.report_aggregation import EntryColumns, group_summary
+from app.services.report_cache import ReportCache
+from app.services.report_jobs import ReportJobQueue
+from app.services.report_presets import PresetReports, seconds_until_hour
+
+
+@pytest.fixture
+def report_data(backend, user):
+    client = {"id": str(uuid.uuid4()), "name": "Acme", "user_id": user["id"]}
+    projects = [
+        {"id": str(uuid.uuid4()), "name": f"Project {i}", "client_id": client["id"], "user_id": user["id"]}
+        for i in range(2)
+    ]
+    tasks = [
+        {"id": str(uuid.uuid4()), "project_id": projects[i % 2]["id"], "title": f"Task {i}", "status": "in_progress"}
+        for i in range(4)
+    ]
+    entries = [
+        {
+            "id": str(uuid.uuid4()),
+            "task_id": tasks[i % 4]["id"],
+            "user_id": user["id"],
+            "date": "2024-01-02",
+            "start_time": "2024-01-02T09:00:00+00:00",
+            "duration": 30,
+            "is_billable": i % 3 != 0,
+        }
+        for i in range(12)
+    ]
+    backend.load("clients", [client])
+    backend.load("projects", projects)
+    backend.load("tasks", tasks)
+    backend.load("time_entries", entries)
+    return {"client": client, "projects": projects, "tasks": tasks, "entries": entries}
+
+
+REPORT = {
+    "name": "January", "type": "time_tracking", "time_range": "custom",
+    "start_date": "2024-01-01", "end_date": "2024-01-31", "group_by": "project",
+}
+
+
+def test_normalized_report_matches_nested(client, report_data):
+    nested = client.post("/api/reports/generate/time-tracking", json=REPORT).json()
+    normalized = client.post("/api/reports/generate/time-tracking?format=normalized", json=REPORT).json()
+
+    for key in ("total_hours", "billable_hours", "non_billable_hours"):
+        assert normalized[key] == nested[key]
+    assert len(normalized["entries"]) == len(nested["entries"]) == 12
+    assert set(normalized["tasks"]) == {task["id"] for task in report_data["tasks"]}
+    assert set(normalized["projects"]) == {project["id"] for project in report_data["projects"]}
+    assert set(normalized["clients"]) == {report_data["client"]["id"]}
+    for entry in normalized["entries"]:
+        assert "tasks" not in entry and "users" not in entry
+        assert entry["task_id"] in normalized["tasks"]
+        assert entry["user_id"] in normalized["users"]
+
+    groups = normalized["summary"]
+    assert set(groups) == set(normalized["projects"])
+    assert sum(len(group["entry_ids"]) for group in groups.values()) == 12
+    assert sum(group["billable_hours"] for group in groups.values()) == normalized["billable_hours"]
+
+
+
+
+
+def test_concurrent_identical_requests_share_one_computation():
+    cache, calls = ReportCache(), []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"total_hours": len(calls)}
+
+    async def run():
+        return await asyncio.gather(*(cache.get("key", compute) for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"total_hours": 1}] * 5
+    assert len(calls) == 1
+    assert cache.coalesced == 4
+
+
+def test_stale_result_is_served_while_refreshing(monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_CACHE_FRESH_SECONDS", 0)
+    cache, calls = ReportCache(), []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    async def run():
+        first = await cache.get("key", compute)
+        stale = await cache.get("key", compute)
+        await asyncio.sleep(0)
+        return first, stale, await cache.get("key", compute)
+
+    assert asyncio.run(run()) == (1, 1, 2)
+
+
+def test_repeated_report_is_served_from_cache(client, report_data):
+    first = client.post("/api/reports/generate/time-tracking", json=REPORT).json()
+    with capture_queries() as log:
+        again = client.post("/api/reports/generate/time-tracking", json={**REPORT, "name": "Other name"}).json()
+    assert again == first
+    assert [record.table for record in log.records] == ["users", "collection_versions"]
+
+
+def test_own_writes_start_a_new_report(client, report_data):
+    before = client.post("/api/reports/generate/time-tracking", json=REPORT).json()
+    entry = report_data["entries"][0]
+    assert client.put(f"/api/time-entries/{entry['id']}", json={"duration": 90}).status_code == 200
+    after = client.post("/api/reports/generate/time-tracking", json=REPORT).json()
+    assert after["total_hours"] == before["total_hours"] + 60
+
+
+def run_queued_jobs(queue):
+    async def drain():
+        worker = asyncio.ensure_future(queue.run())
+        await queue.queue.join()
+        worker.cancel()
+    asyncio.run(drain())
+
+
+def test_report_job_lifecycle(client, report_data, monkeypatch):
+    queue = ReportJobQueue(workers=1, max_per_user=1)
+    monkeypatch.setattr(reports, "report_jobs", queue)
+
+    submitted = client.post("/api/reports/jobs", json=REPORT)
+    assert submitted.status_code == 202
+    job = submitted.json()
+    assert job["status"] == "queued"
+    assert client.get(f"/api/reports/jobs/{job['id']}/result").status_code == 409
+    # The user's one job slot is taken
+    assert client.post("/api/reports/jobs", json=REPORT).status_code == 429
+
+    run_queued_jobs(queue)
+    assert client.get(f"/api/reports/jobs/{job['id']}").json()["status"] == "completed"
+    result = client.get(f"/api/reports/jobs/{job['id']}/result").json()
+    assert result == client.post("/api/reports/generate/time-tracking", json=REPORT).json()
+    assert client.post("/api/reports/jobs", json=REPORT).status_code == 202
+
+
+def test_report_does_not_expose_password_hashes(client, backend, user, report_data, monkeypatch):
+    backend.load("team_members", [
+        {"id": str(uuid.uuid4()), "project_id": project["id"], "user_id": user["id"], "is_active": True}
+        for project in report_data["projects"]
+    ])
+    for path in ("/api/reports/generate/time-tracking", "/api/reports/generate/time-tracking?format=normalized"):
+        assert "hashed_password" not in client.post(path, json=REPORT).text
+    for kind, report_type in (("project-stats", "project_stats"), ("team-productivity", "team_productivity")):
+        response = client.post(f"/api/reports/generate/{kind}", json={**REPORT, "type": report_type, "include_inactive": True})
+        assert user["email"] in response.text
+        assert "hashed_password" not in response.text
+
+    # Job results are stored in the reports table
+    queue = ReportJobQueue(workers=1, max_per_user=1)
+    monkeypatch.setattr(reports, "report_jobs", queue)
+    body = {**REPORT, "type": "project_stats", "include_inactive": True}
+    job = client.post("/api/reports/jobs", json=body).json()
+    run_queued_jobs(queue)
+    assert "hashed_password" not in str(backend.tables["reports"])
+    result = client.get(f"/api/reports/jobs/{job['id']}/result")
+    assert user["email"] in result.text
+    assert "hashed_password" not in result.text
+
+
+def test_failed_report_job_keeps_the_error(client, user, monkeypatch):
+    queue = ReportJobQueue(workers=1, max_per_user=1)
+    monkeypatch.setattr(reports, "report_jobs", queue)
+    # Invalid parameters are rejected up front
+    assert client.post("/api/reports/jobs", json={**REPORT, "start_date": None}).status_code == 400
+
+    async def unavailable(report, response_format):
+        raise RuntimeError("database unavailable")
+    monkeypatch.setattr(reports, "time_tracking_report", unavailable)
+    job = client.post("/api/reports/jobs", json=REPORT).json()
+    run_queued_jobs(queue)
+    assert client.get(f"/api/reports/jobs/{job['id']}").json()["status"] == "failed"
+    response = client.get(f"/api/reports/jobs/{job['id']}/result")
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Report job is failed: database unavailable"
+
+
+def test_preset_report_is_served_until_its_entries_change(client, backend, report_data):
+    entry = {"id": str(uuid.uuid4()), "task_id": report_data["tasks"][0]["id"], "user_id": report_data["client"]["user_id"],
+             "date": date.today().isoformat(), "start_time": f"{date.today().isoformat()}T09:00:00+00:00",
+             "duration": 30, "is_billable": True}
+    backend.load("time_entries", [entry])
+    today = {**REPORT, "time_range": "today", "start_date": None, "end_date": None}
+
+    assert client.post("/api/reports/generate/time-tracking", json=today).json()["total_hours"] == 30
+    with capture_queries() as log:
+        assert client.post("/api/reports/generate/time-tracking", json=today).json()["total_hours"] == 30
+    # Only the versions of what the report read
+    assert [record.table for record in log.records] == ["users", "collection_versions", "time_entry_day_versions"]
+
+    assert client.put(f"/api/time-entries/{entry['id']}", json={"duration": 90}).status_code == 200
+    assert client.post("/api/reports/generate/time-tracking", json=today).json()["total_hours"] == 90
+
+    # Written by another process, straight to the backend
+    update = backend.table("time_entries").update({"duration": 60}).eq("id", entry["id"])
+    asyncio.run(backend.execute(update))
+    assert client.post("/api/reports/generate/time-tracking", json=today).json()["total_hours"] == 60
+
+
+def test_time_entry_writes_invalidate_the_presets_covering_them(backend, user):
+    presets = PresetReports()
+    ranges = {"january": ("2024-01-01", "2024-01-31"), "february": ("2024-02-01", "2024-02-29")}
+    versions = partial(report_presets.preset_versions, user["id"])
+    computed = []
+
+    async def compute(key):
+        computed.append(key)
+        return key
+
+    async def request_all():
+        for key, covered in ranges.items():
+            await presets.get(key, lambda covered=covered: covered, partial(compute, key), versions)
+
+    def write(table, row):
+        asyncio.run(backend.execute(backend.table(table).insert(row)))
+
+    asyncio.run(request_all())
+    assert asyncio.run(presets.precompute()) == 0
+
+    write("time_entries", {"user_id": user["id"], "task_id": str(uuid.uuid4()), "date": "2024-02-10", "duration": 5})
+    assert asyncio.run(presets.precompute()) == 1
+    assert computed == ["january", "february", "february"]
+    # Renames show up in every report
+    write("projects", {"user_id": user["id"], "name": "Renamed"})
+    assert asyncio.run(presets.precompute()) == 2
+    assert {key: preset.result for key, preset in presets.reports.items()} == {"january": "january", "february": "february"}
+
+
+def test_preset_results_expire_and_least_recently_requested_are_evicted(monkeypatch):
+    presets = PresetReports()
+    now = [1000.0]
+    monkeypatch.setattr(report_presets.time, "time", lambda: now[0])
+    monkeypatch.setattr(settings, "REPORT_PRESET_MAX_AGE_SECONDS", 60)
+    monkeypatch.setattr(settings, "REPORT_PRESET_MAX_REPORTS", 2)
+    computed = []
+
+    async def request(key):
+        async def compute():
+            computed.append(key)
+            return key
+        return await presets.get(key, lambda: ("2024-01-01", "2024-01-31"), compute, partial(asyncio.sleep, 0))
+
+    asyncio.run(request("a"))
+    asyncio.run(request("a"))
+    assert computed == ["a"]
+    # Too old to serve, even though nothing it read changed
+    now[0] += 61
+    asyncio.run(request("a"))
+    assert computed == ["a", "a"]
+
+    asyncio.run(request("b"))
+    now[0] += 1
+    asyncio.run(request("a"))
+    asyncio.run(request("c"))
+    assert list(presets.reports) == ["a", "c"]
+
+
+def test_precompute_runs_at_the_next_off_peak_hour():
+    assert seconds_until_hour(3, datetime(2024, 1, 1, 2, 30, tzinfo=timezone.utc)) == 30 * 60
+    assert seconds_until_hour(3, datetime(2024, 1, 1, 4, tzinfo=timezone.utc)) == 23 * 3600
+
+
+ENTRY_ROWS = [
+    {"id": "1", "task_id": "t1", "user_id": "u1", "date": "2024-01-01", "duration": 30, "is_billable": True},
+    {"id": "2", "task_id": "t2", "user_id": "u1", "date": "2024-01-01", "duration": 15, "is_billable": False},
+    {"id": "3", "task_id": "t1", "user_id": "u2", "date": "2024-01-02", "duration": 45, "is_billable": True},
+    {"id": "4", "task_id": "t1", "user_id": "u1", "date": "2024-01-01", "duration": 10, "is_billable": False},
+    {"id": "5", "task_id": "t1", "user_id": "u1", "date": None, "duration": None, "is_billable": True},
+]
+
+
+# Grouping runs on numpy when it is installed and falls back to a Python pass
+@pytest.fixture(params=["numpy", "python"])
+def grouping(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(report_aggregation, "numpy", None)
+    elif report_aggregation.numpy is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+def test_entry_columns_group_by_several_dimensions_at_once(grouping):
+    columns = EntryColumns.for_report(ENTRY_ROWS, "tasks, users,date")
+    assert columns.totals() == (100, 75)
+    groups = [(group.keys, group.total_hours, group.billable_hours, [row["id"] for row in group.rows])
+              for group in columns.groups()]
+    assert groups == [
+        (("t1", "u1", "2024-01-01"), 40, 30, ["1", "4"]),
+        (("t2", "u1", "2024-01-01"), 15, 0, ["2"]),
+        (("t1", "u2", "2024-01-02"), 45, 45, ["3"]),
+        (("t1", "u1", "unknown"), 0, 0, ["5"]),
+    ]
+    summary = group_summary(columns.groups(), lambda members: ("entry_ids", [row["id"] for row in members]))
+    assert summary["t1"]["u1"]["2024-01-01"] == {
+        "total_hours": 40, "billable_hours": 30, "non_billable_hours": 10, "entry_ids": ["1", "4"]
+    }
+
+
+def test_entry_columns_group_totals_without_rows(grouping):
+    columns = EntryColumns.for_report(ENTRY_ROWS, "tasks")
+    groups = [(group.keys, group.total_hours, group.billable_hours, group.rows) for group in columns.groups()]
+    assert [(keys, total, billable) for keys, total, billable, _ in groups] == [(("t1",), 85, 75), (("t2",), 15, 0)]
+    assert [[row["id"] for row in rows] for *_, rows in groups] == [["1", "3", "4", "5"], ["2"]]
+    assert [(group.keys, group.total_hours, group.billable_hours, group.rows)
+            for group in columns.groups(with_rows=False)] == [(("t1",), 85, 75, []), (("t2",), 15, 0, [])]
+    assert EntryColumns.for_report([], "tasks").groups() == []
+
+
+def test_report_grouped_by_project_user_and_date(client, report_data):
+    body = {**REPORT, "group_by": "project,team_member,date"}
+    nested = client.post("/api/reports/generate/time-tracking", json=body).json()
+    normalized = client.post("/api/reports/generate/time-tracking?format=normalized", json=body).json()
+    user_id = report_data["client"]["user_id"]
+    for project in report_data["projects"]:
+        nested_group = nested["summary"][project["id"]][user_id]["2024-01-02"]
+        normalized_group = normalized["summary"][project["id"]][user_id]["2024-01-02"]
+        assert len(nested_group["entries"]) == len(normalized_group["entry_ids"]) == 6
+        assert nested_group["total_hours"] == normalized_group["total_hours"] == 180
+
+
+def test_comparison_comes_from_one_fetch(client, backend, report_data):
+    user_id = report_data["client"]["user_id"]
+    tasks = report_data["tasks"]
+    backend.load("time_entries", [
+        # December is the period before January, November is outside both
+        {"id": str(uuid.uuid4()), "task_id": tasks[0]["id"], "user_id": user_id, "date": "2023-12-15",
+         "start_time": "2023-12-15T09:00:00+00:00", "duration": 60, "is_billable": True},
+        {"id": str(uuid.uuid4()), "task_id": tasks[0]["id"], "user_id": user_id, "date": "2023-11-15",
+         "start_time": "2023-11-15T09:00:00+00:00", "duration": 600, "is_billable": True},
+    ])
+    body = {**REPORT, "compare_to": "previous_period"}
+    with capture_queries() as log:
+        nested = client.post("/api/reports/generate/time-tracking", json=body).json()
+    assert [record.table for record in log.records] == ["users", "collection_versions", "time_entries"]
+    normalized = client.post("/api/reports/generate/time-tracking?format=normalized", json=body).json()
+
+    for report in (nested, normalized):
+        assert report["total_hours"] == 360
+        assert len(report["entries"]) == 12
+        comparison = report["comparison"]
+        assert (comparison["start_date"], comparison["end_date"]) == ("2023-12-01", "2023-12-31")
+        assert comparison["previous"]["total_hours"] == 60
+        assert comparison["delta"]["total_hours"] == 300
+        first, second = (project["id"] for project in report_data["projects"])
+        assert comparison["summary"][first]["previous"]["total_hours"] == 60
+        assert comparison["summary"][first]["delta"]["total_hours"] == 120
+        assert comparison["summary"][second]["previous"]["total_hours"] == 0
+
+
+@pytest.mark.parametrize("body, expected", [
+    ({"time_range": "custom", "start_date": "2024-03-01", "end_date": "2024-03-31"}, ("2024-02-01", "2024-02-29")),
+    ({"time_range": "custom", "start_date": "2024-01-01", "end_date": "2024-03-31"}, ("2023-10-01", "2023-12-31")),
+    ({"time_range": "custom", "start_date": "2024-01-08", "end_date": "2024-01-14"}, ("2024-01-01", "2024-01-07")),
+    ({"time_range": "custom", "start_date": "2024-02-29", "end_date": "2024-02-29", "compare_to": "previous_year"},
+     ("2023-02-28", "2023-02-28")),
+])
+def test_comparison_ranges(body, expected):
+    report = ReportCreate(**{**REPORT, "compare_to": "previous_period", **body})
+    start_date, end_date = reports.get_date_range(report.time_range, report.start_date, report.end_date)
+    compare_start, compare_end = reports.get_comparison_range(report, start_date, end_date)
+    assert (compare_start.isoformat(), compare_end.isoformat()) == expected
+
+
+def test_overlapping_comparison_is_rejected(client, report_data):
+    body = {**REPORT, "compare_to": "custom", "compare_start_date": "2024-01-15", "compare_end_date": "2024-02-15"}
+    assert client.post("/api/reports/generate/time-tracking", json=body).status_code == 400
+    assert client.post("/api/reports/jobs", json=body).status_code == 400
+
+
+@pytest.mark.parametrize("kind, report_type", [
+    ("project-stats", "project_stats"),
+    ("team-productivity", "team_productivity"),
+    ("client-billing", "client_billing"),
+])
+def test_comparison_is_rejected_for_reports_that_cannot_compare(client, report_data, kind, report_type):
+    body = {**REPORT, "type": report_type, "compare_to": "previous_period"}
+    response = client.post(f"/api/reports/generate/{kind}", json=body)
+    assert response.status_code == 400
+    assert "time tracking" in response.json()["detail"]
+    assert client.post("/api/reports/jobs", json=body).status_code == 400
+
+    del body["compare_to"]
+    assert client.post(f"/api/reports/generate/{kind}", json=body).status_code == 200
@@ -0,0 +1,96 @@
+import orjson
+import pytest
+
+from app.schemas.category import Category
+from app.schemas.client import Client
+from app.schemas.notification import Notification
+from app.schemas.project import Project
+from app.schemas.task import Task
+from app.schemas.time_entry import CalendarTimeEntry, TimeEntry
+from app.services.serialization import project_rows, trusted_json, type_adapter
+
+IDS = {
+    "id": "6f1c3c1e-52d4-4d43-9a4b-62a1f1d4b0a1",
+    "created_at": "2024-01-01T09:00:00.123+00:00",
+    "updated_at": "2024-01-02T10:30:00+00:00",
+}
+TASK = {
+    **IDS, "title": "Design", "project_id": "0b7f2f8e-3d2b-4f3c-8b7e-2a9c1d3e4f5a",
+    "due_date": "2024-02-01T17:00:00+02:00", "tracked_minutes": 90, "billable_minutes": 45.5,
+}
+# Rows as the database returns them, one per list endpoint model
+DATABASE_ROWS = {
+    Project: {
+        **IDS, "name": "Website", "client_id": "0b7f2f8e-3d2b-4f3c-8b7e-2a9c1d3e4f5a", "clients": {"name": "Acme"},
+        "client_name": "Acme", "start_date": "2024-01-01T00:00:00+00:00", "end_date": "2024-03-01",
+        "tracked_minutes": 90, "billable_minutes": 0,
+    },
+    Task: {**TASK, "projects": {"user_id": "1c2d3e4f-5a6b-4c7d-8e9f-0a1b2c3d4e5f"}},
+    Client: {**IDS, "name": "Acme", "email": "billing@acme.com", "user_id": "1c2d3e4f-5a6b-4c7d-8e9f-0a1b2c3d4e5f"},
+    Category: {**IDS, "name": "Design", "color": "#ff0000"},
+    Notification: {
+        **IDS, "type": "task_assigned", "title": "Assigned", "message": "You have a task", "priority": "high",
+        "data": {"task_id": "t1", "minutes": 1.5}, "user_id": "1c2d3e4f-5a6b-4c7d-8e9f-0a1b2c3d4e5f",
+        "channel": "in_app", "is_read": True, "read_at": "2024-01-03T08:00:00.5+00:00",
+    },
+    TimeEntry: {
+        **IDS, "task_id": TASK["id"], "user_id": "1c2d3e4f-5a6b-4c7d-8e9f-0a1b2c3d4e5f",
+        "start_time": "2024-01-01T09:00:00+00:00", "end_time": "2024-01-01T09:30:00+00:00", "duration": 30.0,
+        "is_billable": True, "task": TASK,
+    },
+    CalendarTimeEntry: {
+        **IDS, "task_id": TASK["id"], "user_id": "1c2d3e4f-5a6b-4c7d-8e9f-0a1b2c3d4e5f",
+        "start_time": "2024-01-01T09:00:00+00:00", "duration": 30.0, "task_title": "Design",
+        "project_id": TASK["project_id"], "project_name": "Website",
+    },
+}
+
+
+@pytest.mark.parametrize("model", list(DATABASE_ROWS), ids=lambda model: model.__name__)
+def test_trusted_output_matches_the_response_model(model):
+    rows = [DATABASE_ROWS[model], {**DATABASE_ROWS[model], "updated_at": None}]
+    expected = [model.model_validate(row).model_dump(mode="json") for row in rows]
+    assert project_rows(model, rows) == expected
+    assert orjson.loads(trusted_json(model, rows)) == expected
+
+
+def test_projection_matches_validated_output():
+    rows = [{
+        "id": "6f1c3c1e-52d4-4d43-9a4b-62a1f1d4b0a1",
+        "name": "Website",
+        "client_id": "0b7f2f8e-3d2b-4f3c-8b7e-2a9c1d3e4f5a",
+        "user_id": "1c2d3e4f-5a6b-4c7d-8e9f-0a1b2c3d4e5f",
+        "clients": {"name": "Acme"},
+        "client_name": "Acme",
+        "tracked_minutes": 90.0,
+    }]
+    validated = orjson.loads(type_adapter(Project, True).dump_json(type_adapter(Project, True).validate_python(rows)))
+    assert project_rows(Project, rows) == validated
+
+
+def test_projection_drops_embeds_and_projects_nested_models():
+    row = {
+        "id": "e1",
+        "task_id": "t1",
+        "user_id": "u1",
+        "start_time": "2024-01-01T09:00:00+00:00",
+        "tasks": {"title": "Embedded"},
+        "task": {"title": "Design", "project_id": "p1", "hashed_password": "secret"},
+    }
+    projected = orjson.loads(trusted_json(TimeEntry, row))
+    assert "tasks" not in projected
+    assert projected["start_time"] == "2024-01-01T09:00:00Z"
+    assert projected["task"]["title"] == "Design"
+    assert "hashed_password" not in projected["task"]
+    assert projected["task"]["status"] == "todo"
+
+
+def test_integral_numbers_convert_and_fractions_are_rejected():
+    row = DATABASE_ROWS[TimeEntry]
+    assert orjson.loads(trusted_json(TimeEntry, {**row, "duration": "30"}))["duration"] == 30
+    # A fractional duration fails like model validation does instead of being truncated
+    for duration in (30.5, "30.5"):
+        with pytest.raises(ValueError):
+            trusted_json(TimeEntry, {**row, "duration": duration})
+        with pytest.raises(ValueError):
+            TimeEntry.model_validate({**row, "duration": duration})
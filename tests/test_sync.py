@@ -0,0 +1,49 @@
+import uuid
+
+import pytest
+
+from app.config import settings
+
+
+@pytest.fixture(autouse=True)
+def no_overlap(monkeypatch):
+    # Rows written in the same test are microseconds apart
+    monkeypatch.setattr(settings, "SYNC_OVERLAP_SECONDS", 0)
+
+
+@pytest.fixture
+def project(make_project, backend):
+    backend.load("clients", [{"id": str(uuid.uuid4()), "name": "Other", "user_id": str(uuid.uuid4())}])
+    return make_project(tasks=3)
+
+
+def test_full_then_incremental_sync(client, project):
+    full = client.get("/api/sync/").json()
+    assert full["full"] is True
+    assert [p["id"] for p in full["collections"]["projects"]["upserted"]] == [project["id"]]
+    assert full["collections"]["projects"]["upserted"][0]["client_name"] == "Acme"
+    assert len(full["collections"]["tasks"]["upserted"]) == 3
+    assert [c["name"] for c in full["collections"]["clients"]["upserted"]] == ["Acme"]
+
+    unchanged = client.get("/api/sync/", params={"since": full["cursor"]}).json()
+    assert unchanged["full"] is False
+    assert all(not c["upserted"] and not c["deleted"] for c in unchanged["collections"].values())
+    assert unchanged["cursor"] == full["cursor"]
+
+    renamed, deleted = project["tasks"][0]["id"], project["tasks"][1]["id"]
+    assert client.put(f"/api/tasks/{renamed}", json={"title": "Renamed"}).status_code == 200
+    assert client.delete(f"/api/tasks/{deleted}").status_code in (200, 204)
+
+    changes = client.get("/api/sync/", params={"since": unchanged["cursor"], "collections": "tasks"}).json()
+    assert list(changes["collections"]) == ["tasks"]
+    assert [t["title"] for t in changes["collections"]["tasks"]["upserted"]] == ["Renamed"]
+    assert changes["collections"]["tasks"]["deleted"] == [deleted]
+    assert changes["cursor"] > unchanged["cursor"]
+
+    caught_up = client.get("/api/sync/", params={"since": changes["cursor"], "collections": "tasks"}).json()
+    assert caught_up["collections"]["tasks"] == {"upserted": [], "deleted": []}
+
+
+def test_invalid_sync_parameters(client, project):
+    assert client.get("/api/sync/", params={"collections": "users"}).status_code == 400
+    assert client.get("/api/sync/", params={"since": "yesterday"}).status_code == 400
@@ -0,0 +1,75 @@
+import json
+import uuid
+
+from app.services.query_log import capture_queries
+
+
+def import_file(client, name, content, **params):
+    response = client.post("/api/time-entries/import", params=params, files={"file": (name, content)})
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_csv_import_in_chunks(client, project, backend):
+    task_id = project["tasks"][0]["id"]
+    lines = ["task_id,start_time,duration,description"]
+    lines += [f"{task_id},2024-01-0{1 + i % 5}T09:00:00+00:00,{15 * (i + 1)},Entry {i}" for i in range(5)]
+    with capture_queries() as log:
+        events = import_file(client, "entries.csv", "\n".join(lines), chunk_size=2)
+
+    progress = [e for e in events if e["event"] == "progress"]
+    assert [e["processed"] for e in progress] == [2, 4, 5]
+    assert events[-1] == {"event": "done", "processed": 5, "imported": 5, "failed": 0}
+    # One task lookup and one bulk insert per chunk
+    assert [r.operation for r in log.records if r.table == "tasks"].count("select") == 3
+    assert [r.operation for r in log.records if r.table == "time_entries"].count("insert") == 3
+    entries = backend.tables["time_entries"].values()
+    assert sorted(e["duration"] for e in entries) == [15, 30, 45, 60, 75]
+    assert {e["user_id"] for e in entries} == {project["user_id"]}
+
+
+def test_invalid_rows_and_denied_tasks_fail_alone(client, project, backend):
+    task_id = project["tasks"][0]["id"]
+    # A task of someone else's project
+    other_project, other_task = str(uuid.uuid4()), str(uuid.uuid4())
+    backend.load("projects", [{"id": other_project, "name": "Other", "user_id": str(uuid.uuid4())}])
+    backend.load("tasks", [{"id": other_task, "project_id": other_project, "title": "Theirs"}])
+    rows = [
+        {"task_id": task_id, "start_time": "2024-01-01T09:00:00+00:00", "duration": 30},
+        {"task_id": task_id, "start_time": "not a time"},
+        {"task_id": other_task, "start_time": "2024-01-01T09:00:00+00:00"},
+        {"task_id": str(uuid.uuid4()), "start_time": "2024-01-01T09:00:00+00:00"},
+    ]
+    content = "\n".join(json.dumps(row) for row in rows) + "\n{broken\n"
+    events = import_file(client, "entries.ndjson", content, chunk_size=3)
+
+    errors = {e["line"]: e["detail"] for e in events if e["event"] == "error"}
+    assert set(errors) == {2, 3, 4, 5}
+    assert errors[2][0]["loc"] == ["start_time"]
+    assert errors[3] == errors[4] == "Task not found or not enough permissions"
+    assert events[-1] == {"event": "done", "processed": 5, "imported": 1, "failed": 4}
+    assert [e["task_id"] for e in backend.tables["time_entries"].values()] == [task_id]
+
+
+def test_unsupported_format(client, project):
+    response = client.post("/api/time-entries/import", files={"file": ("entries.xlsx", b"")})
+    assert response.status_code == 400
+
+
+def test_failed_insert_hides_the_backend_error(client, project, backend, monkeypatch, capsys):
+    execute = backend.execute
+
+    async def failing_execute(query):
+        if getattr(query, "table", None) == "time_entries":
+            raise RuntimeError('duplicate key value violates unique constraint "time_entries_pkey"')
+        return await execute(query)
+
+    monkeypatch.setattr(backend, "execute", failing_execute)
+    rows = [{"task_id": project["tasks"][0]["id"], "start_time": "2024-01-01T09:00:00+00:00"}] * 2
+    events = import_file(client, "entries.ndjson", "\n".join(json.dumps(row) for row in rows))
+
+    assert [e for e in events if e["event"] == "error"] == [
+        {"event": "error", "lines": [1, 2], "detail": "Failed to insert lines 1-2"}
+    ]
+    assert events[-1] == {"event": "done", "processed": 2, "imported": 0, "failed": 2}
+    assert "time_entries_pkey" in capsys.readouterr().out
@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services import timers
+from app.services.timers import TimerRegistry
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen timer clock, advanced with clock.advance(minutes=...)"""
+    class Clock:
+        now = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc)
+
+        def advance(self, **delta):
+            self.now += timedelta(**delta)
+
+    clock = Clock()
+    monkeypatch.setattr(timers, "_now", lambda: clock.now)
+    return clock
+
+
+@pytest.fixture
+def registry(backend):
+    return TimerRegistry(heartbeat_timeout=300, checkpoint_interval=30)
+
+
+def test_checkpoint_writes_changed_timers_and_closes_stale_ones(registry, project, backend, clock, user):
+    timer = registry.start(user["id"], project["tasks"][0]["id"], "Design")
+    clock.advance(minutes=2)
+    registry.heartbeat(user["id"])
+
+    assert asyncio.run(registry.checkpoint()) == 1
+    row = backend.tables["time_entries"][timer.time_entry_id]
+    assert row["duration"] == 2 and row["end_time"] is None
+    # Nothing changed since the last checkpoint
+    assert asyncio.run(registry.checkpoint()) == 0
+
+    clock.advance(minutes=10)
+    assert asyncio.run(registry.checkpoint()) == 1
+    assert registry.get(user["id"]) is None
+    row = backend.tables["time_entries"][timer.time_entry_id]
+    # Closed at the last heartbeat, not at the time the timeout was noticed
+    assert row["duration"] == 2
+    assert row["end_time"] == "2024-01-01T09:02:00+00:00"
+
+
+def test_stop_during_checkpoint_keeps_the_end_time(registry, project, backend, clock, user, monkeypatch):
+    timer = registry.start(user["id"], project["tasks"][0]["id"])
+    clock.advance(minutes=5)
+    execute = backend.execute
+
+    async def run():
+        release = asyncio.Event()
+
+        async def slow_execute(query):
+            await release.wait()
+            return await execute(query)
+
+        monkeypatch.setattr(backend, "execute", slow_execute)
+        checkpoint = asyncio.create_task(registry.checkpoint())
+        await asyncio.sleep(0)
+        stop = asyncio.create_task(registry.stop(user["id"]))
+        await asyncio.sleep(0)
+        release.set()
+        return await checkpoint, await stop
+
+    written, stopped = asyncio.run(run())
+    assert written == 1
+    assert stopped["end_time"] == "2024-01-01T09:05:00+00:00"
+    row = backend.tables["time_entries"][timer.time_entry_id]
+    assert row["end_time"] == "2024-01-01T09:05:00+00:00" and row["duration"] == 5
+    assert len(registry) == 0
+
+
+def test_flush_all_writes_every_running_timer(registry, project, backend, clock, user):
+    timer = registry.start(user["id"], project["tasks"][0]["id"])
+    clock.advance(minutes=1)
+    asyncio.run(registry.checkpoint())
+    # Rewritten on shutdown even though the duration did not change
+    backend.tables["time_entries"][timer.time_entry_id]["duration"] = 0
+    asyncio.run(registry.flush_all())
+    assert backend.tables["time_entries"][timer.time_entry_id]["duration"] == 1
+    assert registry.get(user["id"]) is timer
+
+
+def test_failed_writes_keep_the_timers(registry, project, backend, clock, user, monkeypatch):
+    timer = registry.start(user["id"], project["tasks"][0]["id"])
+    clock.advance(minutes=3)
+    execute = backend.execute
+
+    async def failing_execute(query):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(backend, "execute", failing_execute)
+    with pytest.raises(ConnectionError):
+        asyncio.run(registry.checkpoint())
+    assert timer.flushed_duration is None
+    with pytest.raises(ConnectionError):
+        asyncio.run(registry.stop(user["id"]))
+    assert registry.get(user["id"]) is timer
+
+    # A stale timer stays registered until its closing row is written
+    clock.advance(minutes=10)
+    with pytest.raises(ConnectionError):
+        asyncio.run(registry.checkpoint())
+    assert registry.get(user["id"]) is timer
+
+    monkeypatch.setattr(backend, "execute", execute)
+    assert asyncio.run(registry.checkpoint()) == 1
+    assert registry.get(user["id"]) is None
+    row = backend.tables["time_entries"][timer.time_entry_id]
+    assert row["end_time"] == "2024-01-01T09:00:00+00:00"
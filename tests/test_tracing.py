@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import tracing
+from app.services.tracing import JsonLinesExporter, OTLPExporter, Tracer, TracingMiddleware, trace_methods
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+def traced_app(tracer):
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        with tracer.span("load", item=item_id):
+            with tracer.span("load.query"):
+                pass
+        return {"id": item_id}
+
+    return app
+
+
+def test_request_spans_nest_under_the_server_span():
+    exporter = ListExporter()
+    tracer = Tracer(exporter, sample_rate=1.0)
+    TestClient(traced_app(tracer)).get("/items/42")
+    # Spans are exported in batches
+    assert not exporter.spans
+    asyncio.run(tracer.flush())
+
+    spans = {span.name: span for span in exporter.spans}
+    assert set(spans) == {"GET /items/{item_id}", "load", "load.query"}
+    root = spans["GET /items/{item_id}"]
+    assert root.kind == "server" and root.parent_id is None
+    assert root.attributes["http.status_code"] == 200
+    assert spans["load"].parent_id == root.span_id
+    assert spans["load.query"].parent_id == spans["load"].span_id
+    assert spans["load"].attributes == {"item": "42"}
+    assert {span.trace_id for span in exporter.spans} == {root.trace_id}
+
+
+def test_traceparent_continues_the_callers_trace():
+    # Incoming traceparent headers decide sampling, whatever the local rate
+    tracer = Tracer(ListExporter(), sample_rate=0.01)
+    client = TestClient(traced_app(tracer))
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    client.get("/items/1", headers={"traceparent": f"00-{trace_id}-{parent_id}-01"})
+    # Not sampled by the caller, so no spans at all
+    client.get("/items/2", headers={"traceparent": f"00-{trace_id}-{parent_id}-00"})
+    assert len(tracer.pending) == 3
+    root = next(span for span in tracer.pending if span.kind == "server")
+    assert root.trace_id == trace_id and root.parent_id == parent_id
+
+
+def test_exporters(tmp_path):
+    tracer = Tracer(ListExporter(), sample_rate=1.0)
+    with tracer.span("outer"):
+        with tracer.span("inner", rows=3):
+            pass
+    inner, outer = tracer.pending
+
+    path = tmp_path / "traces.jsonl"
+    JsonLinesExporter(str(path)).export([outer, inner])
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["outer", "inner"]
+    assert lines[1]["parent_id"] == lines[0]["span_id"]
+
+    payload = OTLPExporter("http://collector:4318/", "tracker").payload([outer, inner])
+    [resource] = payload["resourceSpans"]
+    assert resource["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "tracker"}}]
+    otlp_outer, otlp_inner = resource["scopeSpans"][0]["spans"]
+    assert "parentSpanId" not in otlp_outer
+    assert otlp_inner["parentSpanId"] == otlp_outer["spanId"]
+    assert otlp_inner["attributes"] == [{"key": "rows", "value": {"intValue": "3"}}]
+
+
+def test_methods_are_only_wrapped_when_tracing_is_enabled(monkeypatch):
+    class Service:
+        async def load(self):
+            return "loaded"
+
+    original = Service.load
+    monkeypatch.setattr(tracing, "tracer", Tracer(None, sample_rate=1.0))
+    trace_methods(Service, "service")
+    assert Service.load is original
+
+    monkeypatch.setattr(tracing, "tracer", Tracer(ListExporter(), sample_rate=1.0))
+    trace_methods(Service, "service")
+    assert Service.load.__wrapped__ is original